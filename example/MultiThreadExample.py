@@ -16,6 +16,7 @@ sys.path.insert(0, '../')
 
 from nebula2.gclient.net import ConnectionPool
 from nebula2.Config import Config
+from nebula2.data.InsertBuilder import InsertBuilder
 from FormatResp import print_resp
 
 
@@ -38,23 +39,18 @@ def main_test():
 
         time.sleep(6)
 
-        # Insert vertexes
-        client.execute('INSERT VERTEX person(name, age) VALUES '
-                       '\'Bob\':(\'Bob\', 10), '
-                       '\'Lily\':(\'Lily\', 9), '
-                       '\'Tom\':(\'Tom\', 10), '
-                       '\'Jerry\':(\'Jerry\', 13), '
-                       '\'John\':(\'John\', 11)')
-
-        assert resp.is_succeeded(), resp.error_msg()
+        # Insert vertexes, the values are escaped and split into statements by the builder
+        builder = InsertBuilder(max_rows=100)
+        vertices = [('Bob', 'Bob', 10), ('Lily', 'Lily', 9), ('Tom', 'Tom', 10),
+                    ('Jerry', 'Jerry', 13), ('John', 'John', 11)]
+        for resp in client.execute_many(builder.insert_vertices('person', ['name', 'age'], vertices)):
+            assert resp.is_succeeded(), resp.error_msg()
 
         # Insert edges
-        client.execute('INSERT EDGE like(likeness) VALUES '
-                       '\'Bob\'->\'Lily\':(80.0), '
-                       '\'Bob\'->\'Tom\':(70.0), '
-                       '\'Lily\'->\'Jerry\':(84.0), '
-                       '\'Tom\'->\'Jerry\':(68.3), '
-                       '\'Bob\'->\'John\':(97.2)')
+        edges = [('Bob', 'Lily', 80.0), ('Bob', 'Tom', 70.0), ('Lily', 'Jerry', 84.0),
+                 ('Tom', 'Jerry', 68.3), ('Bob', 'John', 97.2)]
+        for resp in client.execute_many(builder.insert_edges('like', ['likeness'], edges)):
+            assert resp.is_succeeded(), resp.error_msg()
 
         # Query data
         query_resp = client.execute('GO FROM \"Bob\" OVER like YIELD $^.person.name, '
@@ -17,5 +17,60 @@ class Config(object):
     # connection or execute timeout, unit ms, 0 means no timeout
     timeout = 0
 
+    # unit ms, the timeout of connecting, 0 means the timeout above
+    connect_timeout = 0
+
     # unit s, 0 means will never close the idle connection
     idle_time = 0
+
+    # unit s, the idle connection is pinged before reuse only if it has been
+    # idle longer than this, 0 means always ping, only its socket is checked
+    # when the keepalive is on
+    ping_idle_time = 30
+
+    # unit s, the interval of the servers health check,
+    # the bad servers are rechecked after 1s, 2s, 4s ... at most this interval
+    health_check_interval = 60
+
+    # unit ms, the timeout of one health check
+    health_check_timeout = 1000
+
+    # the transport of the connections, 'buffered', 'framed' or 'header'
+    transport = 'buffered'
+
+    # the compression of the header transport, None, 'zlib' or 'snappy',
+    # graphd compresses the reply of a compressed request
+    compression = None
+
+    # unit byte, the initial size of one receive of the connections,
+    # it grows for the big replies and shrinks for the small ones
+    recv_buffer_size = 65536
+
+    # disable the Nagle's algorithm, the small requests are sent at once
+    tcp_nodelay = True
+
+    # the TCP keepalive, the dead idle connections are found by the probes
+    # of the system, so they are checked without the ping before reuse
+    keepalive = False
+
+    # unit s, the idle time before the first keepalive probe
+    keepalive_idle = 60
+
+    # unit s, the interval of the keepalive probes
+    keepalive_interval = 10
+
+    # the unanswered keepalive probes before the connection is dropped
+    keepalive_count = 3
+
+    # unit byte, the SO_RCVBUF and SO_SNDBUF of the sockets,
+    # 0 means the system default
+    socket_recv_buffer = 0
+    socket_send_buffer = 0
+
+    # the choice of graphd for the new connections, 'round_robin',
+    # 'least_in_flight', 'ewma_latency' or 'power_of_two', a session
+    # stays on the graphd chosen when it is got
+    load_balancer = 'round_robin'
+
+    # unit s, the time for the latency EWMA of a server to decay to 1/e
+    ewma_decay_time = 10
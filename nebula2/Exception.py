@@ -52,3 +52,26 @@ class IOErrorException(Exception):
         Exception.__init__(self, message)
         self.type = code
 
+
+class SpaceNotFoundException(Exception):
+    def __init__(self, message):
+        Exception.__init__(self, message)
+        self.message = 'Space not found: {}'.format(message)
+
+
+class TagNotFoundException(Exception):
+    def __init__(self, message):
+        Exception.__init__(self, message)
+        self.message = 'Tag not found: {}'.format(message)
+
+
+class EdgeNotFoundException(Exception):
+    def __init__(self, message):
+        Exception.__init__(self, message)
+        self.message = 'Edge not found: {}'.format(message)
+
+
+class IndexNotFoundException(Exception):
+    def __init__(self, message):
+        Exception.__init__(self, message)
+        self.message = 'Index not found: {}'.format(message)
@@ -6,6 +6,10 @@
 # This source code is licensed under Apache 2.0 License,
 # attached with Common Clause Condition 1.0, found in the LICENSES directory.
 
+import datetime
+
+from array import array
+from collections import namedtuple
 
 from nebula2.common import ttypes
 from nebula2.Exception import (
@@ -15,18 +19,30 @@ from nebula2.Exception import (
 )
 from nebula2.common.ttypes import NullType
 
+np = None
+try:
+    import numpy as np
+except ImportError:
+    pass
+
 
 class Record(object):
-    def __init__(self, values, names):
+    """
+    the row view, the values are wrapped only when they are accessed
+    """
+    __slots__ = ('_values', '_names', '_key_indexes', '_decode_type')
+
+    def __init__(self, values, names, key_indexes=None, decode_type='utf-8'):
         assert len(names) == len(values)
-        self._record = list()
+        self._values = values
         self._names = names
-
-        for val in values:
-            self._record.append(ValueWrapper(val))
+        # the col name -> index, shared by all records of the DataSetWrapper
+        self._key_indexes = key_indexes
+        self._decode_type = decode_type
 
     def __iter__(self):
-        return iter(self._record)
+        for val in self._values:
+            yield ValueWrapper(val, self._decode_type)
 
     def size(self):
         return len(self._names)
@@ -38,15 +54,17 @@ class Record(object):
         """
         if index >= len(self._names):
             raise OutOfRangeException()
-        return self._record[index]
+        return ValueWrapper(self._values[index], self._decode_type)
 
     def get_value_by_key(self, key):
         """
         get value by key
         :return: Value
         """
+        if self._key_indexes is None:
+            self._key_indexes = {name: index for index, name in enumerate(self._names)}
         try:
-            return self._record[self._names.index(key)]
+            return ValueWrapper(self._values[self._key_indexes[key]], self._decode_type)
         except Exception:
             raise InvalidKeyException(key)
 
@@ -58,16 +76,16 @@ class Record(object):
         return self._names
 
     def values(self):
-        return self._record
+        return [(ValueWrapper(val, self._decode_type)) for val in self._values]
 
     def __repr__(self):
-        return "{}".format('\n'.join(self._record))
+        return "{}".format('\n'.join([str(value) for value in self]))
 
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
             return False
 
-        return self.__dict__ == other.__dict__
+        return self._names == other._names and self._values == other._values
 
     def __ne__(self, other):
         return not (self == other)
@@ -142,6 +160,46 @@ class DataSetWrapper(object):
 
         return [(ValueWrapper(row.values[self._key_indexes[key]])) for row in self._data_set.rows]
 
+    def column_array(self, key):
+        """
+        get column values as one typed column
+        :param key: the col name
+        :return: PrimitiveColumn, StringColumn or ValueColumn
+        """
+        if key not in self._key_indexes:
+            raise InvalidKeyException(key)
+        return _build_column(self._data_set.rows, self._key_indexes[key], self._decode_type)
+
+    def as_arrays(self):
+        """
+        convert the rows into per-column typed arrays,
+        int, double and bool columns are stored as numpy arrays (array.array
+        if numpy is not installed) with a null mask, string columns are stored
+        as offsets + bytes buffer, other columns fall back to ValueWrapper list
+        :return: dict<col name, column>
+        """
+        columns = dict()
+        for index, name in enumerate(self._column_names):
+            columns[name] = _build_column(self._data_set.rows, index, self._decode_type)
+        return columns
+
+    def iter_tuples(self):
+        """
+        iterate the rows as tuples of python objects, see to_python
+        :return: generator of tuple
+        """
+        decoders = _PYTHON_DECODERS
+        decode_type = self._decode_type
+        for row in self._data_set.rows:
+            yield tuple([decoders[value.field](value.value, decode_type) for value in row.values])
+
+    def as_python(self):
+        """
+        get all rows as tuples of python objects, see to_python
+        :return: list<tuple>
+        """
+        return list(self.iter_tuples())
+
     def __iter__(self):
         self._pos = -1
         return self
@@ -154,7 +212,10 @@ class DataSetWrapper(object):
         if len(self._data_set.rows) == 0 or self._pos >= len(self._data_set.rows) - 1:
             raise StopIteration
         self._pos = self._pos + 1
-        return Record(self._data_set.rows[self._pos].values, self._column_names)
+        return Record(self._data_set.rows[self._pos].values,
+                      self._column_names,
+                      self._key_indexes,
+                      self._decode_type)
 
     def __repr__(self):
         data_str = []
@@ -165,6 +226,378 @@ class DataSetWrapper(object):
         return 'keys: {}, values: {}'.format(name_str, value_str)
 
 
+class PrimitiveColumn(object):
+    def __init__(self, value_type, values, null_mask):
+        self._value_type = value_type
+        self._values = values
+        self._null_mask = null_mask
+
+    def get_type(self):
+        """
+        :return: ttypes.Value.IVAL, ttypes.Value.FVAL or ttypes.Value.BVAL
+        """
+        return self._value_type
+
+    def values(self):
+        """
+        the null slot is filled by 0
+        :return: numpy.ndarray or array.array
+        """
+        return self._values
+
+    def null_mask(self):
+        """
+        the item is True if the value is null or empty
+        :return: numpy.ndarray or array.array
+        """
+        return self._null_mask
+
+    def is_null(self, index):
+        return bool(self._null_mask[index])
+
+    def get(self, index):
+        if self._null_mask[index]:
+            return None
+        value = self._values[index]
+        if self._value_type == ttypes.Value.BVAL:
+            return bool(value)
+        if self._value_type == ttypes.Value.IVAL:
+            return int(value)
+        return float(value)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return 'PrimitiveColumn({})'.format(self._values)
+
+
+class StringColumn(object):
+    def __init__(self, offsets, data, null_mask, decode_type='utf-8'):
+        self._offsets = offsets
+        self._data = data
+        self._null_mask = null_mask
+        self._decode_type = decode_type
+
+    def get_type(self):
+        return ttypes.Value.SVAL
+
+    def offsets(self):
+        """
+        the value i is data()[offsets[i]:offsets[i + 1]]
+        :return: numpy.ndarray or array.array
+        """
+        return self._offsets
+
+    def data(self):
+        """
+        all values joined together
+        :return: bytes
+        """
+        return self._data
+
+    def null_mask(self):
+        return self._null_mask
+
+    def is_null(self, index):
+        return bool(self._null_mask[index])
+
+    def get_bytes(self, index):
+        if self._null_mask[index]:
+            return None
+        return self._data[self._offsets[index]:self._offsets[index + 1]]
+
+    def get(self, index):
+        if self._null_mask[index]:
+            return None
+        return self.get_bytes(index).decode(self._decode_type)
+
+    def __len__(self):
+        return len(self._null_mask)
+
+    def __repr__(self):
+        return 'StringColumn({})'.format([self.get(i) for i in range(len(self))])
+
+
+class ValueColumn(object):
+    def __init__(self, values):
+        self._values = values
+
+    def get_type(self):
+        """
+        the column holds mixed or nested types
+        :return: None
+        """
+        return None
+
+    def values(self):
+        """
+        :return: list<ValueWrapper>
+        """
+        return self._values
+
+    def is_null(self, index):
+        return self._values[index].is_null() or self._values[index].is_empty()
+
+    def get(self, index):
+        return self._values[index]
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return 'ValueColumn({})'.format(self._values)
+
+
+_ARRAY_TYPE_CODES = {
+    ttypes.Value.BVAL: 'b',
+    ttypes.Value.IVAL: 'q',
+    ttypes.Value.FVAL: 'd',
+}
+
+_NUMPY_TYPES = {
+    'b': 'bool',
+    'q': 'int64',
+    'd': 'float64',
+}
+
+
+def _to_ndarray(values, type_code):
+    if np is None:
+        return values
+    return np.frombuffer(values, dtype=_NUMPY_TYPES[type_code])
+
+
+def _build_column(rows, index, decode_type='utf-8'):
+    # the column type is the type of the first non null value,
+    # if the column contains other type, fall back to ValueColumn
+    col_type = ttypes.Value.__EMPTY__
+    for row in rows:
+        field = row.values[index].field
+        if field != ttypes.Value.__EMPTY__ and field != ttypes.Value.NVAL:
+            col_type = field
+            break
+
+    if col_type == ttypes.Value.SVAL:
+        column = _build_string_column(rows, index, decode_type)
+    elif col_type in _ARRAY_TYPE_CODES or col_type == ttypes.Value.__EMPTY__:
+        column = _build_primitive_column(rows, index, col_type)
+    else:
+        column = None
+
+    if column is None:
+        return ValueColumn([(ValueWrapper(row.values[index], decode_type)) for row in rows])
+    return column
+
+
+def _build_primitive_column(rows, index, col_type):
+    # all values are null, use int64 column
+    type_code = _ARRAY_TYPE_CODES.get(col_type, 'q')
+    values = array(type_code)
+    null_mask = array('b')
+    append_value = values.append
+    append_null = null_mask.append
+    for row in rows:
+        value = row.values[index]
+        field = value.field
+        if field == col_type:
+            append_value(value.value)
+            append_null(0)
+        elif field == ttypes.Value.__EMPTY__ or field == ttypes.Value.NVAL:
+            append_value(0)
+            append_null(1)
+        else:
+            return None
+    return PrimitiveColumn(col_type if col_type != ttypes.Value.__EMPTY__ else ttypes.Value.IVAL,
+                           _to_ndarray(values, type_code),
+                           _to_ndarray(null_mask, 'b'))
+
+
+def _build_string_column(rows, index, decode_type):
+    chunks = list()
+    offsets = array('q', [0])
+    null_mask = array('b')
+    append_chunk = chunks.append
+    append_offset = offsets.append
+    append_null = null_mask.append
+    offset = 0
+    for row in rows:
+        value = row.values[index]
+        field = value.field
+        if field == ttypes.Value.SVAL:
+            append_chunk(value.value)
+            offset = offset + len(value.value)
+            append_null(0)
+        elif field == ttypes.Value.__EMPTY__ or field == ttypes.Value.NVAL:
+            append_null(1)
+        else:
+            return None
+        append_offset(offset)
+    return StringColumn(_to_ndarray(offsets, 'q'),
+                        b''.join(chunks),
+                        _to_ndarray(null_mask, 'b'),
+                        decode_type)
+
+
+_TYPE_NAMES = {
+    ttypes.Value.__EMPTY__: "empty",
+    ttypes.Value.NVAL: "null",
+    ttypes.Value.BVAL: "bool",
+    ttypes.Value.IVAL: "int",
+    ttypes.Value.FVAL: "double",
+    ttypes.Value.SVAL: "string",
+    ttypes.Value.DVAL: "date",
+    ttypes.Value.TVAL: "time",
+    ttypes.Value.DTVAL: "datetime",
+    ttypes.Value.VVAL: "vertex",
+    ttypes.Value.EVAL: "edge",
+    ttypes.Value.PVAL: "path",
+    ttypes.Value.LVAL: "list",
+    ttypes.Value.MVAL: "map",
+    ttypes.Value.UVAL: "set",
+}
+
+# the lightweight python form of vertex, edge and path
+# NodeTuple.tags: dict<tag name, dict<prop name, value>>
+NodeTuple = namedtuple('NodeTuple', ['vid', 'tags'])
+EdgeTuple = namedtuple('EdgeTuple', ['src', 'dst', 'name', 'ranking', 'props'])
+PathTuple = namedtuple('PathTuple', ['nodes', 'relationships'])
+
+
+def to_python(value, decode_type='utf-8'):
+    """
+    decode the ttypes.Value to python object
+      empty, null -> None
+      bool, int, double -> bool, int, float
+      string -> str
+      date, time, datetime -> datetime.date, datetime.time, datetime.datetime
+      list, set, map -> list, set, dict
+      vertex, edge, path -> NodeTuple, EdgeTuple, PathTuple
+      dataset -> list<tuple>
+    :param value: ttypes.Value
+    :param decode_type: the string decode type
+    :return: python object
+    """
+    return _PYTHON_DECODERS[value.field](value.value, decode_type)
+
+
+def _decode_none(val, decode_type):
+    return None
+
+
+def _decode_same(val, decode_type):
+    return val
+
+
+def _decode_string(val, decode_type):
+    return val.decode(decode_type)
+
+
+def _decode_date(val, decode_type):
+    try:
+        return datetime.date(val.year, val.month, val.day)
+    except ValueError:
+        # out of the python date range
+        return DateWrapper(val)
+
+
+def _decode_time(val, decode_type):
+    try:
+        return datetime.time(val.hour, val.minute, val.sec, val.microsec)
+    except ValueError:
+        return TimeWrapper(val)
+
+
+def _decode_datetime(val, decode_type):
+    try:
+        return datetime.datetime(val.year, val.month, val.day,
+                                 val.hour, val.minute, val.sec, val.microsec)
+    except ValueError:
+        return DateTimeWrapper(val)
+
+
+def _decode_props(props, decode_type):
+    decoders = _PYTHON_DECODERS
+    return {key.decode(decode_type): decoders[value.field](value.value, decode_type)
+            for key, value in props.items()}
+
+
+def _decode_vertex(val, decode_type):
+    return NodeTuple(val.vid.decode(decode_type),
+                     {tag.name.decode(decode_type): _decode_props(tag.props, decode_type) for tag in val.tags})
+
+
+def _decode_edge(val, decode_type):
+    return EdgeTuple(val.src.decode(decode_type),
+                     val.dst.decode(decode_type),
+                     val.name.decode(decode_type),
+                     val.ranking,
+                     _decode_props(val.props, decode_type))
+
+
+def _decode_path(val, decode_type):
+    nodes = [_decode_vertex(val.src, decode_type)]
+    relationships = list()
+    for step in val.steps:
+        dst = _decode_vertex(step.dst, decode_type)
+        if step.type > 0:
+            src_id, dst_id = nodes[-1].vid, dst.vid
+        else:
+            src_id, dst_id = dst.vid, nodes[-1].vid
+        relationships.append(EdgeTuple(src_id,
+                                       dst_id,
+                                       step.name.decode(decode_type),
+                                       step.ranking,
+                                       _decode_props(step.props, decode_type)))
+        nodes.append(dst)
+    return PathTuple(nodes, relationships)
+
+
+def _decode_list(val, decode_type):
+    decoders = _PYTHON_DECODERS
+    return [decoders[value.field](value.value, decode_type) for value in val.values]
+
+
+def _decode_map(val, decode_type):
+    return _decode_props(val.kvs, decode_type)
+
+
+def _decode_set(val, decode_type):
+    values = _decode_list(val, decode_type)
+    try:
+        return set(values)
+    except TypeError:
+        # the unhashable values, e.g. list or map
+        return values
+
+
+def _decode_dataset(val, decode_type):
+    decoders = _PYTHON_DECODERS
+    return [tuple([decoders[value.field](value.value, decode_type) for value in row.values])
+            for row in val.rows]
+
+
+# indexed by ttypes.Value.field
+_PYTHON_DECODERS = (
+    _decode_none,       # __EMPTY__
+    _decode_none,       # NVAL
+    _decode_same,       # BVAL
+    _decode_same,       # IVAL
+    _decode_same,       # FVAL
+    _decode_string,     # SVAL
+    _decode_date,       # DVAL
+    _decode_time,       # TVAL
+    _decode_datetime,   # DTVAL
+    _decode_vertex,     # VVAL
+    _decode_edge,       # EVAL
+    _decode_path,       # PVAL
+    _decode_list,       # LVAL
+    _decode_map,        # MVAL
+    _decode_set,        # UVAL
+    _decode_dataset,    # GVAL
+)
+
+
 class Null(object):
     __NULL__ = NullType.__NULL__
     NaN = NullType.NaN
@@ -186,6 +619,8 @@ class Null(object):
 
 
 class ValueWrapper(object):
+    __slots__ = ('_value', '_decode_type')
+
     def __init__(self, value, decode_type='utf-8'):
         self._value = value
         self._decode_type = decode_type
@@ -334,37 +769,7 @@ class ValueWrapper(object):
         raise InvalidValueTypeException("expect path type, but is " + self._get_type_name())
 
     def _get_type_name(self):
-        if self.is_empty():
-            return "empty"
-        if self.is_null():
-            return "null"
-        if self.is_bool():
-            return "bool"
-        if self.is_int():
-            return "int"
-        if self.is_double():
-            return "double"
-        if self.is_string():
-            return "string"
-        if self.is_list():
-            return "list"
-        if self.is_set():
-            return "set"
-        if self.is_map():
-            return "map"
-        if self.is_time():
-            return "time"
-        if self.is_date():
-            return "date"
-        if self.is_datetime():
-            return "datetime"
-        if self.is_vertex():
-            return "vertex"
-        if self.is_edge():
-            return "edge"
-        if self.is_path():
-            return "path"
-        return "unknown"
+        return _TYPE_NAMES.get(self._value.getType(), "unknown")
 
     def __eq__(self, o: object) -> bool:
         if not isinstance(o, self.__class__):
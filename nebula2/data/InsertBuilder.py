@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+import datetime
+import math
+import numbers
+
+from nebula2.common import ttypes
+from nebula2.Exception import InvalidValueTypeException
+
+_ESCAPES = {
+    '\\': '\\\\',
+    '"': '\\"',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\t': '\\t',
+    '\b': '\\b',
+    '\f': '\\f',
+}
+_ESCAPE_TABLE = str.maketrans(_ESCAPES)
+
+# the parser can't read the literal of the min int64
+_MIN_INT64 = -2 ** 63
+
+
+def escape_string(value, decode_type='utf-8'):
+    """
+    make the nGQL string literal
+    :param value: str or bytes
+    :param decode_type: the decode type of bytes
+    :return: the quoted string
+    """
+    if isinstance(value, bytes):
+        value = value.decode(decode_type)
+    return '"{}"'.format(value.translate(_ESCAPE_TABLE))
+
+
+def escape_name(name, decode_type='utf-8'):
+    """
+    make the quoted identifier, e.g. the tag, edge or prop name
+    :param name: str or bytes
+    :param decode_type: the decode type of bytes
+    :return: the name quoted by backquote
+    """
+    if isinstance(name, bytes):
+        name = name.decode(decode_type)
+    if '`' in name:
+        raise InvalidValueTypeException('backquote in name: {}'.format(name))
+    return '`{}`'.format(name)
+
+
+def _format_int(value):
+    if value == _MIN_INT64:
+        return '({}-1)'.format(_MIN_INT64 + 1)
+    return str(value)
+
+
+def _format_rank(value):
+    # the rank is an integer literal in nGQL, not an expression
+    value = int(value)
+    if value == _MIN_INT64:
+        raise InvalidValueTypeException('rank: {} can not be written as a literal'.format(value))
+    return str(value)
+
+
+def _format_float(value):
+    if math.isnan(value) or math.isinf(value):
+        raise InvalidValueTypeException('double: {}'.format(value))
+    text = repr(value)
+    if '.' not in text:
+        # 1e+20 -> 1.0e+20, the double literal needs the dot
+        mantissa, sep, exponent = text.partition('e')
+        text = mantissa + '.0' + sep + exponent
+    return text
+
+
+def _format_date(value):
+    return 'date("{:04d}-{:02d}-{:02d}")'.format(value.year, value.month, value.day)
+
+
+def _format_time(hour, minute, sec, microsec):
+    if microsec:
+        return '{:02d}:{:02d}:{:02d}.{:06d}'.format(hour, minute, sec, microsec)
+    return '{:02d}:{:02d}:{:02d}'.format(hour, minute, sec)
+
+
+def _format_value(value, decode_type):
+    field = value.field
+    val = value.value
+    if field in (ttypes.Value.__EMPTY__, ttypes.Value.NVAL):
+        return 'NULL'
+    if field == ttypes.Value.BVAL:
+        return 'true' if val else 'false'
+    if field == ttypes.Value.IVAL:
+        return _format_int(val)
+    if field == ttypes.Value.FVAL:
+        return _format_float(val)
+    if field == ttypes.Value.SVAL:
+        return escape_string(val, decode_type)
+    if field == ttypes.Value.DVAL:
+        return _format_date(val)
+    if field == ttypes.Value.TVAL:
+        return 'time("{}")'.format(_format_time(val.hour, val.minute, val.sec, val.microsec))
+    if field == ttypes.Value.DTVAL:
+        return 'datetime("{}T{}")'.format(_format_date(val)[6:-2],
+                                          _format_time(val.hour, val.minute, val.sec, val.microsec))
+    if field == ttypes.Value.LVAL:
+        return '[{}]'.format(', '.join([_format_value(v, decode_type) for v in val.values]))
+    if field == ttypes.Value.UVAL:
+        if len(val.values) == 0:
+            raise InvalidValueTypeException('empty set: {} is an empty map in nGQL')
+        return '{{{}}}'.format(', '.join([_format_value(v, decode_type) for v in val.values]))
+    if field == ttypes.Value.MVAL:
+        return '{{{}}}'.format(', '.join(['{}: {}'.format(escape_name(k, decode_type), _format_value(v, decode_type))
+                                          for k, v in val.kvs.items()]))
+    raise InvalidValueTypeException('{} is not a literal'.format(ttypes.Value.thrift_spec[field][2]))
+
+
+def format_value(value, decode_type='utf-8'):
+    """
+    make the nGQL literal of the value
+      None -> NULL
+      bool, int, float -> true/false, int, double
+      str, bytes -> string
+      datetime.date, datetime.time, datetime.datetime -> date(), time(), datetime()
+      list, tuple, set, dict -> list, set, map, the empty set is not supported
+      ttypes.Value -> all kinds but vertex, edge, path and dataset
+    :param value: the python object or ttypes.Value
+    :param decode_type: the decode type of bytes
+    :return: str
+    """
+    if value is None:
+        return 'NULL'
+    if isinstance(value, ttypes.Value):
+        return _format_value(value, decode_type)
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, numbers.Integral):
+        return _format_int(int(value))
+    if isinstance(value, numbers.Real):
+        return _format_float(float(value))
+    if isinstance(value, (str, bytes)):
+        return escape_string(value, decode_type)
+    if isinstance(value, datetime.datetime):
+        return 'datetime("{}T{}")'.format(_format_date(value)[6:-2],
+                                          _format_time(value.hour, value.minute, value.second, value.microsecond))
+    if isinstance(value, datetime.date):
+        return _format_date(value)
+    if isinstance(value, datetime.time):
+        return 'time("{}")'.format(_format_time(value.hour, value.minute, value.second, value.microsecond))
+    if isinstance(value, (list, tuple)):
+        return '[{}]'.format(', '.join([format_value(v, decode_type) for v in value]))
+    if isinstance(value, (set, frozenset)):
+        if len(value) == 0:
+            raise InvalidValueTypeException('empty set: {} is an empty map in nGQL')
+        return '{{{}}}'.format(', '.join([format_value(v, decode_type) for v in value]))
+    if isinstance(value, dict):
+        return '{{{}}}'.format(', '.join(['{}: {}'.format(escape_name(k, decode_type), format_value(v, decode_type))
+                                          for k, v in value.items()]))
+    raise InvalidValueTypeException(type(value).__name__)
+
+
+class InsertBuilder(object):
+    """
+    build the INSERT VERTEX and INSERT EDGE statements of the rows, the rows
+    are split into the statements under the max bytes and rows
+    """
+    def __init__(self, max_rows=1000, max_bytes=1024 * 1024, decode_type='utf-8'):
+        """
+        :param max_rows: the max rows of one statement
+        :param max_bytes: the max utf-8 bytes of one statement, the statement
+        of one row longer than it is still given
+        :param decode_type: the decode type of bytes
+        """
+        self._max_rows = max_rows
+        self._max_bytes = max_bytes
+        self._decode_type = decode_type
+
+    def insert_vertices(self, tag_name, prop_names, rows):
+        """
+        build INSERT VERTEX statements
+        :param tag_name: the tag name
+        :param prop_names: the prop names
+        :param rows: iterable of (vid, the prop values in the order of prop_names)
+        :return: generator of str
+        """
+        prefix = 'INSERT VERTEX {}({}) VALUES '.format(
+            escape_name(tag_name, self._decode_type),
+            ', '.join([escape_name(name, self._decode_type) for name in prop_names]))
+        decode_type = self._decode_type
+        values = ('{}:({})'.format(format_value(row[0], decode_type),
+                                   ', '.join([format_value(v, decode_type) for v in row[1:]]))
+                  for row in rows)
+        return self._chunk(prefix, values)
+
+    def insert_edges(self, edge_name, prop_names, rows, with_rank=False):
+        """
+        build INSERT EDGE statements
+        :param edge_name: the edge name
+        :param prop_names: the prop names
+        :param rows: iterable of (src, dst, [rank,] the prop values in the order of prop_names)
+        :param with_rank: if the rows have the rank
+        :return: generator of str
+        """
+        prefix = 'INSERT EDGE {}({}) VALUES '.format(
+            escape_name(edge_name, self._decode_type),
+            ', '.join([escape_name(name, self._decode_type) for name in prop_names]))
+        decode_type = self._decode_type
+        offset = 3 if with_rank else 2
+        values = ('{}->{}{}:({})'.format(format_value(row[0], decode_type),
+                                         format_value(row[1], decode_type),
+                                         '@{}'.format(_format_rank(row[2])) if with_rank else '',
+                                         ', '.join([format_value(v, decode_type) for v in row[offset:]]))
+                  for row in rows)
+        return self._chunk(prefix, values)
+
+    def _chunk(self, prefix, values):
+        prefix_size = len(prefix.encode('utf-8'))
+        chunk = list()
+        size = prefix_size
+        for value in values:
+            value_size = len(value.encode('utf-8')) + 2
+            if len(chunk) > 0 and (len(chunk) >= self._max_rows or size + value_size > self._max_bytes):
+                yield prefix + ', '.join(chunk)
+                chunk = list()
+                size = prefix_size
+            chunk.append(value)
+            size = size + value_size
+        if len(chunk) > 0:
+            yield prefix + ', '.join(chunk)
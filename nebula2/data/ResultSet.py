@@ -125,6 +125,34 @@ class ResultSet(object):
             return []
         return self._data_set_wrapper.column_values(key)
 
+    def to_columns(self):
+        """
+        get all columns as typed arrays
+        :return: dict<col name, PrimitiveColumn/StringColumn/ValueColumn>
+        """
+        if self._data_set_wrapper is None:
+            return {}
+        return self._data_set_wrapper.as_arrays()
+
+    def iter_tuples(self):
+        """
+        iterate the rows as tuples of python objects,
+        see nebula2.data.DataObject.to_python
+        :return: generator of tuple
+        """
+        if self._data_set_wrapper is None:
+            return iter([])
+        return self._data_set_wrapper.iter_tuples()
+
+    def as_python(self):
+        """
+        get all rows as tuples of python objects
+        :return: list<tuple>
+        """
+        if self._data_set_wrapper is None:
+            return []
+        return self._data_set_wrapper.as_python()
+
     def rows(self):
         """
         get all rows
@@ -0,0 +1,640 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+"""
+Pure python decoding of the binary protocol replies.
+
+The generated read() methods go through the protocol object for every
+field, which dominates the time spent on big DataSets when the fastproto
+extension is not built. Here a complete reply is cut out of the stream by
+MessageScanner and decoded from one memoryview with precompiled structs,
+with dedicated functions for Value, Row and DataSet. For the huge results,
+stream_execute_reply decodes the rows in batches while they are received.
+"""
+
+import struct
+
+from thrift.Thrift import TType, TMessageType, TApplicationException
+from thrift.transport import TTransport
+from thrift.protocol import TBinaryProtocol
+
+from nebula2.graph.ttypes import ExecutionResponse
+from nebula2.common.ttypes import (
+    Value,
+    Row,
+    DataSet,
+    List,
+    Set,
+    UTF8STRINGS
+)
+
+fastproto = None
+try:
+    from thrift.protocol import fastproto
+except ImportError:
+    pass
+
+_BYTE = struct.Struct('!b')
+_I16 = struct.Struct('!h')
+_I32 = struct.Struct('!i')
+_I64 = struct.Struct('!q')
+_DOUBLE = struct.Struct('!d')
+_FLOAT = struct.Struct('!f')
+_FIELD = struct.Struct('!bh')
+_LIST = struct.Struct('!bi')
+_MAP = struct.Struct('!bbi')
+
+_FIXED_SIZES = {
+    TType.BOOL: 1,
+    TType.BYTE: 1,
+    TType.I16: 2,
+    TType.I32: 4,
+    TType.FLOAT: 4,
+    TType.I64: 8,
+    TType.DOUBLE: 8,
+}
+
+
+class MessageScanner(object):
+    """
+    find the message boundaries in the unframed binary stream. The bytes
+    are fed as they arrive, the walk over a message is resumed where it
+    stopped, so a big reply is scanned only once whatever the chunk size.
+    """
+    def __init__(self):
+        self._buf = bytearray()
+        self._pos = 0
+        self._seqid = None
+        # the structs and containers being walked, None for a struct,
+        # [remaining items, types...] for a container
+        self._stack = []
+
+    def feed(self, data):
+        """
+        append the received bytes
+        :param data: the bytes read from the socket
+        :return: void
+        """
+        if self._pos and self._seqid is None:
+            del self._buf[:self._pos]
+            self._pos = 0
+        self._buf += data
+
+    def next_message(self):
+        """
+        get the next complete message
+        :return: (seqid, message bytes) or None when more data is needed
+        """
+        if self._seqid is None:
+            if not self._scan_header():
+                return None
+            self._stack = [None]
+        if not self._scan_body():
+            return None
+        data = bytes(self._buf[:self._pos])
+        seqid = self._seqid
+        del self._buf[:self._pos]
+        self._pos = 0
+        self._seqid = None
+        return seqid, data
+
+    def _scan_header(self):
+        buf = self._buf
+        if len(buf) < 4:
+            return False
+        size = _I32.unpack_from(buf, 0)[0]
+        if size < 0:
+            # strict: version | type, name, seqid
+            if len(buf) < 8:
+                return False
+            pos = 8 + _I32.unpack_from(buf, 4)[0]
+        else:
+            # non strict: name, type, seqid
+            pos = 4 + size + 1
+        if len(buf) < pos + 4:
+            return False
+        self._seqid = _I32.unpack_from(buf, pos)[0]
+        self._pos = pos + 4
+        return True
+
+    def _scan_body(self):
+        self._pos, done = _walk(self._buf, self._pos, self._stack)
+        return done
+
+
+def _walk(buf, pos, stack):
+    """
+    walk over the values on the stack, it stops at the end of the buffer
+    and can be resumed with the same stack when more data is received
+    :param buf: the received bytes
+    :param pos: the position to start
+    :param stack: the values being walked, None for a struct,
+                  [remaining items, types...] for a container
+    :return: (the position reached, True if all the values are walked)
+    """
+    end = len(buf)
+    fixed_sizes = _FIXED_SIZES
+    while stack:
+        top = stack[-1]
+        if top is None:
+            # inside a struct, the next field header or STOP
+            if pos >= end:
+                break
+            ttype = buf[pos]
+            if ttype == TType.STOP:
+                pos += 1
+                stack.pop()
+                continue
+            value_pos = pos + 3
+        else:
+            # inside a container, [remaining, types...]
+            remaining = top[0]
+            if remaining == 0:
+                stack.pop()
+                continue
+            ttype = top[1 + (remaining & 1)]
+            value_pos = pos
+        size = fixed_sizes.get(ttype)
+        if size is not None:
+            frame = None
+            value_end = value_pos + size
+        elif ttype == TType.STRUCT:
+            frame = None
+            value_end = value_pos
+        elif ttype == TType.STRING:
+            if value_pos + 4 > end:
+                break
+            frame = None
+            value_end = value_pos + 4 + _I32.unpack_from(buf, value_pos)[0]
+        elif ttype == TType.LIST or ttype == TType.SET:
+            if value_pos + 5 > end:
+                break
+            etype, count = _LIST.unpack_from(buf, value_pos)
+            value_end = value_pos + 5
+            if etype in fixed_sizes:
+                frame = None
+                value_end += fixed_sizes[etype] * count
+            else:
+                frame = [count, etype, etype]
+        elif ttype == TType.MAP:
+            if value_pos + 6 > end:
+                break
+            ktype, vtype, count = _MAP.unpack_from(buf, value_pos)
+            value_end = value_pos + 6
+            frame = [count * 2, ktype, vtype]
+        else:
+            raise TTransport.TTransportException(TTransport.TTransportException.UNKNOWN,
+                                                 'Unknown type: {}'.format(ttype))
+        if value_end > end:
+            break
+        pos = value_end
+        if top is not None:
+            top[0] -= 1
+        if ttype == TType.STRUCT:
+            stack.append(None)
+        elif frame is not None:
+            stack.append(frame)
+    return pos, not stack
+
+
+def decode_reply(data, name, result_class):
+    """
+    decode the reply of a call
+    :param data: the complete message, as returned by MessageScanner
+    :param name: the called method, used in the error message
+    :param result_class: the generated <name>_result class
+    :return: the success field of the result
+    """
+    if fastproto is not None:
+        iprot = TBinaryProtocol.TBinaryProtocolAccelerated(TTransport.TMemoryBuffer(data))
+        (fname, mtype, rseqid) = iprot.readMessageBegin()
+        if mtype == TMessageType.EXCEPTION:
+            x = TApplicationException()
+            x.read(iprot)
+            raise x
+        result = result_class()
+        result.read(iprot)
+    else:
+        buf = memoryview(data)
+        size = _I32.unpack_from(buf, 0)[0]
+        if size < 0:
+            mtype = size & TBinaryProtocol.TBinaryProtocol.TYPE_MASK
+            pos = 8 + _I32.unpack_from(buf, 4)[0] + 4
+        else:
+            mtype = buf[4 + size]
+            pos = 4 + size + 1 + 4
+        if mtype == TMessageType.EXCEPTION:
+            x = TApplicationException()
+            x.read(TBinaryProtocol.TBinaryProtocol(TTransport.TMemoryBuffer(data[pos:])))
+            raise x
+        result, pos = decode_struct(buf, pos, result_class)
+    if result.success is None:
+        raise TApplicationException(TApplicationException.MISSING_RESULT,
+                                    '{} failed: unknown result'.format(name))
+    return result.success
+
+
+def stream_execute_reply(read, batch_size, read_size=65536):
+    """
+    decode the reply of execute while it is received, the rows are given
+    in batches, so only a batch is kept in memory instead of the whole reply
+    :param read: read(size) of the transport, it returns at most size bytes
+    :param batch_size: the max number of rows in a batch
+    :param read_size: the number of bytes asked to read at a time
+    :return: generator of ExecutionResponse, each one has a DataSet with a
+             batch of rows and the fields received before the rows, the last
+             one has all the fields of the reply
+    """
+    reader = _ReplyReader(read, read_size)
+    if reader.read_message_begin() == TMessageType.EXCEPTION:
+        x = TApplicationException()
+        x.read(TBinaryProtocol.TBinaryProtocol(TTransport.TMemoryBuffer(reader.read_bytes(TType.STRUCT))))
+        raise x
+    resp = None
+    while True:
+        ttype, fid = reader.read_field_begin()
+        if ttype == TType.STOP:
+            break
+        if fid == 0 and ttype == TType.STRUCT:
+            resp = ExecutionResponse()
+            for partial in _stream_response(reader, resp, batch_size):
+                yield partial
+        else:
+            reader.skip(ttype)
+    if resp is None:
+        raise TApplicationException(TApplicationException.MISSING_RESULT,
+                                    'execute failed: unknown result')
+    yield resp
+
+
+def _stream_response(reader, resp, batch_size):
+    spec = ExecutionResponse.thrift_spec
+    while True:
+        ttype, fid = reader.read_field_begin()
+        if ttype == TType.STOP:
+            return
+        if fid == 3 and ttype == TType.STRUCT:
+            resp.data = DataSet()
+            for partial in _stream_data_set(reader, resp, batch_size):
+                yield partial
+        elif 0 < fid < len(spec) and spec[fid] is not None and spec[fid][1] == ttype:
+            setattr(resp, spec[fid][2], reader.read_value(ttype, spec[fid][3]))
+        else:
+            reader.skip(ttype)
+
+
+def _stream_data_set(reader, resp, batch_size):
+    data_set = resp.data
+    spec = DataSet.thrift_spec
+    while True:
+        ttype, fid = reader.read_field_begin()
+        if ttype == TType.STOP:
+            return
+        if fid == 2 and ttype == TType.LIST:
+            etype, count = reader.read_list_begin()
+            rows = []
+            for i in range(count):
+                rows.append(reader.read_value(TType.STRUCT, spec[2][3][1]))
+                # the last batch is kept until the end of the reply
+                if len(rows) == batch_size and i < count - 1:
+                    partial = ExecutionResponse()
+                    partial.__dict__.update(resp.__dict__)
+                    partial.data = DataSet(data_set.column_names, rows)
+                    yield partial
+                    rows = []
+            data_set.rows = rows
+        elif fid == 1 and ttype == TType.LIST:
+            data_set.column_names = reader.read_value(ttype, spec[1][3])
+        else:
+            reader.skip(ttype)
+
+
+class _ReplyReader(object):
+    """
+    read a reply from the transport value by value, the buffer only holds
+    the value being decoded
+    """
+    def __init__(self, read, read_size):
+        self._read = read
+        self._read_size = read_size
+        self._buf = bytearray()
+        self._pos = 0
+
+    def read_message_begin(self):
+        size = _I32.unpack(self._take(4))[0]
+        if size < 0:
+            mtype = size & TBinaryProtocol.TBinaryProtocol.TYPE_MASK
+            self._take(_I32.unpack(self._take(4))[0])
+        else:
+            self._take(size)
+            mtype = self._take(1)[0]
+        self._take(4)
+        return mtype
+
+    def read_field_begin(self):
+        ttype = self._take(1)[0]
+        if ttype == TType.STOP:
+            return ttype, None
+        return ttype, _I16.unpack(self._take(2))[0]
+
+    def read_list_begin(self):
+        return _LIST.unpack(self._take(5))
+
+    def read_value(self, ttype, args):
+        start, end = self._walk(ttype)
+        if ttype == TType.STRUCT and fastproto is not None:
+            value = args[0]()
+            fastproto.decode(value, TTransport.TMemoryBuffer(bytes(self._buf[start:end])),
+                             args, utf8strings=UTF8STRINGS, protoid=0)
+        else:
+            with memoryview(self._buf) as buf:
+                value, end = _read(buf, start, ttype, args)
+        self._pos = end
+        return value
+
+    def read_bytes(self, ttype):
+        start, end = self._walk(ttype)
+        self._pos = end
+        return bytes(self._buf[start:end])
+
+    def skip(self, ttype):
+        self._pos = self._walk(ttype)[1]
+
+    def _take(self, size):
+        self._compact()
+        while len(self._buf) - self._pos < size:
+            self._fill()
+        pos = self._pos
+        self._pos += size
+        return bytes(self._buf[pos:self._pos])
+
+    def _walk(self, ttype):
+        """
+        make sure the next value is in the buffer
+        :return: (start, end) of the value in the buffer
+        """
+        self._compact()
+        start = self._pos
+        stack = [None] if ttype == TType.STRUCT else [[1, ttype, ttype]]
+        pos, done = _walk(self._buf, start, stack)
+        while not done:
+            self._fill()
+            pos, done = _walk(self._buf, pos, stack)
+        return start, pos
+
+    def _compact(self):
+        if self._pos > 0:
+            del self._buf[:self._pos]
+            self._pos = 0
+
+    def _fill(self):
+        data = self._read(self._read_size)
+        if not data:
+            raise TTransport.TTransportException(TTransport.TTransportException.END_OF_FILE,
+                                                 'TSocket read 0 bytes')
+        self._buf += data
+
+
+def decode_struct(buf, pos, cls):
+    """
+    decode a generated struct
+    :param buf: the memoryview holding the encoded struct
+    :param pos: the offset of the struct in buf
+    :param cls: the generated class
+    :return: (the struct, the offset after it)
+    """
+    try:
+        reader = _STRUCT_READERS.get(cls)
+        if reader is not None:
+            return reader(buf, pos)
+        return _read_struct(buf, pos, cls, cls.thrift_spec, False)
+    except (struct.error, IndexError):
+        raise EOFError('Truncated message')
+
+
+def _new(cls, spec, is_union):
+    obj = cls.__new__(cls)
+    if is_union:
+        obj.field = 0
+        obj.value = None
+    else:
+        for field in spec:
+            if field is not None:
+                setattr(obj, field[2], field[4])
+    return obj
+
+
+def _read_struct(buf, pos, cls, spec, is_union, specialized=True):
+    if specialized:
+        reader = _STRUCT_READERS.get(cls)
+        if reader is not None:
+            return reader(buf, pos)
+    obj = _new(cls, spec, is_union)
+    while True:
+        ttype = buf[pos]
+        if ttype == TType.STOP:
+            return obj, pos + 1
+        ttype, fid = _FIELD.unpack_from(buf, pos)
+        pos += 3
+        field = spec[fid] if 0 <= fid < len(spec) else None
+        if field is None or field[1] != ttype:
+            pos = _skip(buf, pos, ttype)
+            continue
+        val, pos = _read(buf, pos, ttype, field[3])
+        if is_union:
+            obj.field = fid
+            obj.value = val
+        else:
+            setattr(obj, field[2], val)
+
+
+def _read_string(buf, pos, is_utf8):
+    size = _I32.unpack_from(buf, pos)[0]
+    pos += 4
+    end = pos + size
+    if size < 0 or end > len(buf):
+        raise IndexError('string out of range')
+    if is_utf8 and UTF8STRINGS:
+        return str(buf[pos:end], 'utf-8'), end
+    return buf[pos:end].tobytes(), end
+
+
+def _read(buf, pos, ttype, args):
+    if ttype == TType.STRING:
+        return _read_string(buf, pos, args)
+    if ttype == TType.I64:
+        return _I64.unpack_from(buf, pos)[0], pos + 8
+    if ttype == TType.I32:
+        return _I32.unpack_from(buf, pos)[0], pos + 4
+    if ttype == TType.STRUCT:
+        return _read_struct(buf, pos, args[0], args[1], args[2])
+    if ttype == TType.DOUBLE:
+        return _DOUBLE.unpack_from(buf, pos)[0], pos + 8
+    if ttype == TType.BOOL:
+        return buf[pos] != 0, pos + 1
+    if ttype == TType.BYTE:
+        return _BYTE.unpack_from(buf, pos)[0], pos + 1
+    if ttype == TType.I16:
+        return _I16.unpack_from(buf, pos)[0], pos + 2
+    if ttype == TType.FLOAT:
+        return _FLOAT.unpack_from(buf, pos)[0], pos + 4
+    if ttype == TType.LIST or ttype == TType.SET:
+        etype, count = _LIST.unpack_from(buf, pos)
+        pos += 5
+        values = []
+        for i in range(count):
+            val, pos = _read(buf, pos, args[0], args[1])
+            values.append(val)
+        return (values if ttype == TType.LIST else set(values)), pos
+    if ttype == TType.MAP:
+        ktype, vtype, count = _MAP.unpack_from(buf, pos)
+        pos += 6
+        values = {}
+        for i in range(count):
+            key, pos = _read(buf, pos, args[0], args[1])
+            values[key], pos = _read(buf, pos, args[2], args[3])
+        return values, pos
+    raise TTransport.TTransportException(TTransport.TTransportException.UNKNOWN,
+                                         'Unknown type: {}'.format(ttype))
+
+
+def _skip(buf, pos, ttype):
+    size = _FIXED_SIZES.get(ttype)
+    if size is not None:
+        return pos + size
+    if ttype == TType.STRING:
+        return pos + 4 + _I32.unpack_from(buf, pos)[0]
+    if ttype == TType.STRUCT:
+        while True:
+            ttype = buf[pos]
+            if ttype == TType.STOP:
+                return pos + 1
+            pos = _skip(buf, pos + 3, ttype)
+    if ttype == TType.LIST or ttype == TType.SET:
+        etype, count = _LIST.unpack_from(buf, pos)
+        pos += 5
+        for i in range(count):
+            pos = _skip(buf, pos, etype)
+        return pos
+    if ttype == TType.MAP:
+        ktype, vtype, count = _MAP.unpack_from(buf, pos)
+        pos += 6
+        for i in range(count):
+            pos = _skip(buf, _skip(buf, pos, ktype), vtype)
+        return pos
+    raise TTransport.TTransportException(TTransport.TTransportException.UNKNOWN,
+                                         'Unknown type: {}'.format(ttype))
+
+
+def _read_value(buf, pos, _new_value=Value.__new__, _unpack_field=_FIELD.unpack_from,
+                _unpack_i64=_I64.unpack_from, _unpack_i32=_I32.unpack_from,
+                _unpack_double=_DOUBLE.unpack_from, _ival=(TType.I64, Value.IVAL),
+                _sval=(TType.STRING, Value.SVAL), _fval=(TType.DOUBLE, Value.FVAL),
+                _bval=(TType.BOOL, Value.BVAL)):
+    start = pos
+    if not buf[pos]:
+        value = _new_value(Value)
+        value.field = 0
+        value.value = None
+        return value, pos + 1
+    header = _unpack_field(buf, pos)
+    pos += 3
+    # the most common columns are decoded inline
+    if header == _ival:
+        val = _unpack_i64(buf, pos)[0]
+        pos += 8
+    elif header == _sval:
+        size = _unpack_i32(buf, pos)[0]
+        pos += 4
+        end = pos + size
+        if size < 0 or end > len(buf):
+            raise IndexError('string out of range')
+        val = buf[pos:end].tobytes()
+        pos = end
+    elif header == _fval:
+        val = _unpack_double(buf, pos)[0]
+        pos += 8
+    elif header == _bval:
+        val = buf[pos] != 0
+        pos += 1
+    else:
+        ttype, fid = header
+        if 0 < fid < len(_VALUE_SPEC) and _VALUE_SPEC[fid][1] == ttype:
+            val, pos = _read(buf, pos, ttype, _VALUE_SPEC[fid][3])
+        else:
+            return _read_struct(buf, start, Value, _VALUE_SPEC, True, False)
+    if buf[pos]:
+        # more than one field on the wire, let the generic path sort it out
+        return _read_struct(buf, start, Value, _VALUE_SPEC, True, False)
+    value = _new_value(Value)
+    value.field = header[1]
+    value.value = val
+    return value, pos + 1
+
+
+def _read_values(buf, pos):
+    etype, count = _LIST.unpack_from(buf, pos)
+    pos += 5
+    values = [None] * count
+    read_value = _read_value
+    for i in range(count):
+        values[i], pos = read_value(buf, pos)
+    return values, pos
+
+
+def _read_value_list(cls):
+    def read(buf, pos):
+        obj = cls.__new__(cls)
+        obj.values = None
+        while True:
+            ttype = buf[pos]
+            if ttype == TType.STOP:
+                return obj, pos + 1
+            ttype, fid = _FIELD.unpack_from(buf, pos)
+            pos += 3
+            if fid == 1 and ttype == TType.LIST:
+                obj.values, pos = _read_values(buf, pos)
+            elif fid == 1 and ttype == TType.SET:
+                values, pos = _read_values(buf, pos)
+                obj.values = set(values)
+            else:
+                pos = _skip(buf, pos, ttype)
+    return read
+
+
+def _read_data_set(buf, pos):
+    data_set = _new(DataSet, DataSet.thrift_spec, False)
+    while True:
+        ttype = buf[pos]
+        if ttype == TType.STOP:
+            return data_set, pos + 1
+        ttype, fid = _FIELD.unpack_from(buf, pos)
+        pos += 3
+        if fid == 2 and ttype == TType.LIST:
+            etype, count = _LIST.unpack_from(buf, pos)
+            pos += 5
+            rows = [None] * count
+            read_row = _STRUCT_READERS[Row]
+            for i in range(count):
+                rows[i], pos = read_row(buf, pos)
+            data_set.rows = rows
+        elif fid == 1 and ttype == TType.LIST:
+            data_set.column_names, pos = _read(buf, pos, ttype, DataSet.thrift_spec[1][3])
+        else:
+            pos = _skip(buf, pos, ttype)
+
+
+_VALUE_SPEC = Value.thrift_spec
+
+_STRUCT_READERS = {
+    Value: _read_value,
+    Row: _read_value_list(Row),
+    List: _read_value_list(List),
+    Set: _read_value_list(Set),
+    DataSet: _read_data_set,
+}
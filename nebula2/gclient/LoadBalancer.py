@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+"""
+The choice of graphd for the new connections of the pool.
+
+Every graphd has a ServerStats fed by its connections: the requests in
+flight, and a peak EWMA of the latency which jumps to a slower sample at
+once and decays toward the faster ones, so a graphd paused by GC or
+compaction is avoided at once and retried when its latency decays.
+The balancers rank the servers by the stats, the pool takes the first
+one which can give a connection.
+
+Every request of a connection feeds the stats, including the requests of
+the sessions, but the balancer is only asked when a connection is checked
+out, e.g. by get_session. A session stays on its graphd however slow it
+becomes, so the load is balanced by the new sessions, the long-lived
+sessions are better released and got again from time to time.
+"""
+
+import math
+import random
+import threading
+import time
+
+ROUND_ROBIN = 'round_robin'
+LEAST_IN_FLIGHT = 'least_in_flight'
+EWMA_LATENCY = 'ewma_latency'
+POWER_OF_TWO = 'power_of_two'
+
+
+class ServerStats(object):
+    # unit s, the latencies below it are taken as equal
+    MIN_LATENCY = 0.001
+
+    def __init__(self, decay_time=10):
+        """
+        :param decay_time: unit s, the time for the latency to decay to 1/e
+        when there is no slower sample
+        """
+        self._decay_time = decay_time
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        # unit s
+        self._latency = 0.0
+        self._update_time = time.time()
+
+    def begin(self, count=1):
+        """
+        the requests are sent
+        :param count: the number of the requests
+        :return: void
+        """
+        with self._lock:
+            self._in_flight = self._in_flight + count
+
+    def end(self, count=1, latency=None):
+        """
+        the requests are replied or failed
+        :param count: the number of the requests
+        :param latency: unit s, the latency sample, None means no sample
+        :return: void
+        """
+        with self._lock:
+            self._in_flight = max(self._in_flight - count, 0)
+            if latency is not None:
+                self._add(latency)
+
+    def add_latency(self, latency):
+        """
+        add a latency sample
+        :param latency: unit s
+        :return: void
+        """
+        with self._lock:
+            self._add(latency)
+
+    def in_flight(self):
+        return self._in_flight
+
+    def latency(self):
+        """
+        the latency decayed to now
+        :return: unit s
+        """
+        with self._lock:
+            return self._decayed(time.time())
+
+    def cost(self):
+        """
+        the expected wait of a new request, the latency times the requests
+        before it
+        """
+        with self._lock:
+            return max(self._decayed(time.time()), self.MIN_LATENCY) * (self._in_flight + 1)
+
+    def _decayed(self, now):
+        elapsed = max(now - self._update_time, 0)
+        return self._latency * math.exp(-elapsed / self._decay_time)
+
+    def _add(self, latency):
+        now = time.time()
+        current = self._decayed(now)
+        if latency > current:
+            self._latency = latency
+        else:
+            # the weight of the new sample grows with the time since the last
+            weight = 1 - math.exp(-max(now - self._update_time, 0) / self._decay_time)
+            self._latency = current + (latency - current) * max(weight, 0.1)
+        self._update_time = now
+
+
+class RoundRobinBalancer(object):
+    def __init__(self):
+        self._pos = -1
+        self._lock = threading.Lock()
+
+    def order(self, addresses, stats):
+        """
+        rank the servers
+        :param addresses: the addresses of the servers
+        :param stats: map<address, ServerStats>
+        :return: the addresses, the preferred first
+        """
+        return self._rotate(list(addresses))
+
+    def _rotate(self, addresses):
+        if len(addresses) == 0:
+            return addresses
+        with self._lock:
+            self._pos = self._pos + 1
+            pos = self._pos % len(addresses)
+        return addresses[pos:] + addresses[:pos]
+
+    def _rank(self, addresses, loads):
+        # the best servers of the same load are taken in turn
+        ranked = sorted(addresses, key=lambda addr: loads[addr])
+        best = [addr for addr in ranked if loads[addr] == loads[ranked[0]]] if ranked else []
+        return self._rotate(best) + ranked[len(best):]
+
+
+class LeastInFlightBalancer(RoundRobinBalancer):
+    def order(self, addresses, stats):
+        return self._rank(addresses, {addr: stats[addr].in_flight() for addr in addresses})
+
+
+class EwmaLatencyBalancer(RoundRobinBalancer):
+    def order(self, addresses, stats):
+        return self._rank(addresses, {addr: stats[addr].cost() for addr in addresses})
+
+
+class PowerOfTwoBalancer(object):
+    def order(self, addresses, stats):
+        """
+        pick two servers at random, the one with less requests in flight,
+        then the lower latency, is preferred, the others follow in random order
+        """
+        addresses = list(addresses)
+        random.shuffle(addresses)
+        if len(addresses) >= 2:
+            first, second = addresses[0], addresses[1]
+            if (stats[second].in_flight(), stats[second].latency()) < \
+                    (stats[first].in_flight(), stats[first].latency()):
+                addresses[0], addresses[1] = second, first
+        return addresses
+
+
+BALANCERS = {
+    ROUND_ROBIN: RoundRobinBalancer,
+    LEAST_IN_FLIGHT: LeastInFlightBalancer,
+    EWMA_LATENCY: EwmaLatencyBalancer,
+    POWER_OF_TWO: PowerOfTwoBalancer,
+}
+
+
+def make_balancer(name):
+    """
+    make the balancer
+    :param name: 'round_robin', 'least_in_flight', 'ewma_latency' or 'power_of_two'
+    :return: the balancer
+    """
+    balancer = BALANCERS.get(name)
+    if balancer is None:
+        raise RuntimeError('Unsupported load balancer: {}'.format(name))
+    return balancer()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+"""
+The transport stacks of the connections to graphd.
+
+buffered: the binary protocol without frames, the default
+framed: every message is sent in a frame with its size before it
+header: the header transport of fbthrift, the requests are compressed by
+zlib or snappy when the compression is set, graphd compresses the replies of
+the compressed requests, so the large results are received compressed
+"""
+
+import socket
+
+from thrift.transport import TSocket, TTransport
+from thrift.transport.THeaderTransport import (
+    THeaderTransport,
+    CLIENT_TYPE,
+    TRANSFORM,
+    T_BINARY_PROTOCOL
+)
+from thrift.protocol import TBinaryProtocol
+from thrift.protocol.THeaderProtocol import THeaderProtocol
+
+from nebula2.Config import Config
+
+snappy = None
+try:
+    import snappy
+except ImportError:
+    pass
+
+BUFFERED = 'buffered'
+FRAMED = 'framed'
+HEADER = 'header'
+
+TRANSFORMS = {
+    'zlib': TRANSFORM.ZLIB,
+    'snappy': TRANSFORM.SNAPPY,
+}
+
+
+class CompressedHeaderTransport(THeaderTransport):
+    def __init__(self, trans, transform=None):
+        """
+        the header transport of the binary protocol
+        :param trans: the underlying transport
+        :param transform: the TRANSFORM of the compression, None means no compression
+        """
+        THeaderTransport.__init__(self, trans, client_type=CLIENT_TYPE.HEADER)
+        self.set_protocol_id(T_BINARY_PROTOCOL)
+        if transform is not None:
+            self.add_transform(transform)
+
+    def read(self, sz):
+        # the rest of the current frame is given first, so the reads of
+        # the raw replies never wait for the frame which is not sent
+        ret = self.read_buffered(sz)
+        if len(ret) > 0:
+            return ret
+        return THeaderTransport.read(self, sz)
+
+
+def socket_options(configs):
+    """
+    the setsockopt arguments of the socket settings in the configs, the
+    keepalive settings not supported by the system are skipped
+    :param configs: the Config
+    :return: list of (level, optname, value)
+    """
+    options = list()
+    if configs.tcp_nodelay:
+        options.append((socket.IPPROTO_TCP, socket.TCP_NODELAY, 1))
+    if configs.keepalive:
+        options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        # TCP_KEEPALIVE is the idle time on macOS
+        keep_idle = getattr(socket, 'TCP_KEEPIDLE', getattr(socket, 'TCP_KEEPALIVE', None))
+        for optname, value in ((keep_idle, configs.keepalive_idle),
+                               (getattr(socket, 'TCP_KEEPINTVL', None), configs.keepalive_interval),
+                               (getattr(socket, 'TCP_KEEPCNT', None), configs.keepalive_count)):
+            if optname is not None and value > 0:
+                options.append((socket.IPPROTO_TCP, optname, value))
+    if configs.socket_recv_buffer > 0:
+        options.append((socket.SOL_SOCKET, socket.SO_RCVBUF, configs.socket_recv_buffer))
+    if configs.socket_send_buffer > 0:
+        options.append((socket.SOL_SOCKET, socket.SO_SNDBUF, configs.socket_send_buffer))
+    return options
+
+
+def make_socket(ip, port, timeout, configs=None):
+    """
+    make the TSocket with the socket settings in the configs, they are
+    applied when it is opened
+    :param ip: the ip
+    :param port: the port
+    :param timeout: unit ms, the read and write timeout, 0 means no timeout
+    :param configs: the Config, None means the default Config
+    :return: the TSocket not opened
+    """
+    if configs is None:
+        configs = Config()
+    sock = TSocket.TSocket(ip, port)
+    if timeout > 0:
+        sock.setTimeout(timeout)
+    if configs.connect_timeout > 0:
+        sock.setConnectTimeout(configs.connect_timeout)
+    sock.setSocketOptions(socket_options(configs))
+    return sock
+
+
+def make_protocol(sock, configs=None):
+    """
+    make the protocol of the transport stack in the configs
+    :param sock: the TSocket
+    :param configs: the Config, None means the default Config
+    :return: the protocol, its trans is the top transport of the stack
+    """
+    if configs is None:
+        configs = Config()
+    transport = configs.transport
+    compression = configs.compression
+    if compression is not None and transport != HEADER:
+        raise RuntimeError('The compression is only supported by the header transport')
+    # the replies are received into one reusable buffer on every stack
+    buffered = TTransport.TRecvBufferTransport(sock, configs.recv_buffer_size)
+    if transport == BUFFERED:
+        return TBinaryProtocol.TBinaryProtocolAccelerated(buffered)
+    if transport == FRAMED:
+        return TBinaryProtocol.TBinaryProtocolAccelerated(TTransport.TFramedTransport(buffered))
+    if transport != HEADER:
+        raise RuntimeError('Unsupported transport: {}'.format(transport))
+    transform = None
+    if compression is not None:
+        transform = TRANSFORMS.get(compression)
+        if transform is None:
+            raise RuntimeError('Unsupported compression: {}'.format(compression))
+        if transform == TRANSFORM.SNAPPY and snappy is None:
+            raise RuntimeError('The snappy compression needs the python-snappy package')
+    trans = CompressedHeaderTransport(buffered, transform)
+    return THeaderProtocol(trans)
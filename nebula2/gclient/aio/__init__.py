@@ -0,0 +1,500 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+
+import asyncio
+import logging
+import socket
+import time
+
+from thrift.Thrift import TMessageType
+from thrift.transport import TTransport
+from thrift.protocol import TBinaryProtocol
+
+from nebula2.graph import (
+    ttypes,
+    GraphService
+)
+
+from nebula2.Exception import (
+    AuthFailedException,
+    IOErrorException,
+    NotValidConnectionException,
+    InValidHostname
+)
+
+from nebula2.data.ResultSet import ResultSet
+
+from nebula2.gclient.Decoder import MessageScanner, decode_reply
+
+
+class AsyncSession(object):
+    def __init__(self, connection, session_id, pool, retry_connect=True):
+        self.session_id = session_id
+        self._connection = connection
+        self._timezone = 0
+        self._pool = pool
+        self._retry_connect = retry_connect
+
+    async def execute(self, stmt):
+        """
+        execute statement
+        :param stmt: the ngql
+        :return: ResultSet
+        """
+        if self._connection is None:
+            raise RuntimeError('The session has released')
+        try:
+            return ResultSet(await self._connection.execute(self.session_id, stmt))
+        except IOErrorException as ie:
+            if ie.type == IOErrorException.E_CONNECT_BROKEN:
+                self._pool.check_server(self._connection.get_address())
+                if self._retry_connect:
+                    if not await self._reconnect():
+                        logging.warning('Retry connect failed')
+                        raise IOErrorException(IOErrorException.E_ALL_BROKEN, 'All connections are broken')
+                    return ResultSet(await self._connection.execute(self.session_id, stmt))
+            raise
+
+    async def release(self):
+        """
+        signout the session, the connection is kept by the pool
+        """
+        if self._connection is None:
+            return
+        connection = self._connection
+        self._connection = None
+        await connection.signout(self.session_id)
+
+    async def ping(self):
+        """
+        check the connection is ok
+        :return Boolean
+        """
+        if self._connection is None:
+            return False
+        return await self._connection.ping()
+
+    async def _reconnect(self):
+        try:
+            # the server of the broken connection is checked again, so it's
+            # skipped if it's down, and taken again if it's back
+            await self._pool.update_servers_status([self._connection.get_address()])
+            conn = await self._pool.get_connection()
+            if conn is None:
+                return False
+            self._connection = conn
+        except NotValidConnectionException:
+            return False
+        return True
+
+
+class AsyncConnectionPool(object):
+    S_OK = 0
+    S_BAD = 1
+
+    def __init__(self):
+        # all addresses of servers
+        self._addresses = list()
+
+        # server's status
+        self._addresses_status = dict()
+
+        # all connections
+        self._connections = dict()
+
+        # the health check state of the servers
+        self._next_check_time = dict()
+        self._check_failures = dict()
+        self._check_event = None
+        self._check_task = None
+
+        self._configs = None
+        self._lock = None
+        self._pos = -1
+        self._close = False
+
+    async def init(self, addresses, configs):
+        """
+        init the connection pool
+        :param addresses: the graphd servers' addresses
+        :param configs: the config
+        :return: if all addresses are ok, return True else raise RuntimeError.
+        """
+        if self._close or self._lock is not None:
+            logging.error('The pool has init or closed.')
+            raise RuntimeError('The pool has init or closed.')
+        self._configs = configs
+        self._lock = asyncio.Lock()
+        self._check_event = asyncio.Event()
+        for address in addresses:
+            try:
+                ip = socket.gethostbyname(address[0])
+            except Exception:
+                raise InValidHostname(str(address[0]))
+            ip_port = (ip, address[1])
+            if ip_port in self._addresses:
+                continue
+            self._addresses.append(ip_port)
+            self._addresses_status[ip_port] = self.S_BAD
+            self._connections[ip_port] = list()
+            self._next_check_time[ip_port] = 0
+            self._check_failures[ip_port] = 0
+
+        await self.update_servers_status()
+        if self._configs.health_check_interval > 0:
+            self._check_task = asyncio.ensure_future(self._health_check_loop())
+
+        ok_num = self.get_ok_servers_num()
+        if ok_num < len(self._addresses):
+            raise RuntimeError('The services status exception: {}'.format(self._get_services_status()))
+
+        conns_per_address = int(self._configs.min_connection_pool_size / ok_num)
+        for addr in self._addresses:
+            for i in range(0, conns_per_address):
+                connection = AsyncConnection()
+                await connection.open(addr[0], addr[1], self._configs.timeout)
+                self._connections[addr].append(connection)
+        return True
+
+    async def get_session(self, user_name, password, retry_connect=True):
+        """
+        get session
+        :param user_name:
+        :param password:
+        :param retry_connect: if auto retry connect
+        :return: AsyncSession
+        """
+        connection = await self.get_connection()
+        if connection is None:
+            raise NotValidConnectionException()
+        session_id = await connection.authenticate(user_name, password)
+        return AsyncSession(connection, session_id, self, retry_connect)
+
+    async def get_connection(self):
+        """
+        get the connection with the fewest in-flight requests, a new
+        connection is opened only when all existing ones are busy
+        :return: AsyncConnection Object
+        """
+        async with self._lock:
+            if self._close:
+                logging.error('The pool is closed')
+                raise NotValidConnectionException()
+
+            ok_num = self.get_ok_servers_num()
+            if ok_num == 0:
+                # don't wait for the health check, the servers may be back
+                await self.update_servers_status()
+                ok_num = self.get_ok_servers_num()
+                if ok_num == 0:
+                    return None
+            max_con_per_address = int(self._configs.max_connection_pool_size / ok_num)
+            try_count = 0
+            while try_count < len(self._addresses):
+                self._pos = (self._pos + 1) % len(self._addresses)
+                addr = self._addresses[self._pos]
+                try_count = try_count + 1
+                if self._addresses_status[addr] != self.S_OK:
+                    continue
+                conns = self._connections[addr]
+                conns[:] = [conn for conn in conns if conn.is_open()]
+                best = None
+                for connection in conns:
+                    if best is None or connection.in_flight() < best.in_flight():
+                        best = connection
+                if best is not None and (best.in_flight() == 0 or len(conns) >= max_con_per_address):
+                    return best
+                if len(conns) < max_con_per_address:
+                    connection = AsyncConnection()
+                    try:
+                        await connection.open(addr[0], addr[1], self._configs.timeout)
+                    except Exception as ex:
+                        logging.warning('Connect {}:{} failed: {}'.format(addr[0], addr[1], ex))
+                        self._set_server_status(addr, False)
+                        continue
+                    conns.append(connection)
+                    logging.info('Get connection to {}'.format(addr))
+                    return connection
+            return None
+
+    async def ping(self, address):
+        """
+        check the server is ok
+        :param address: the server address want to connect
+        :return: True or False
+        """
+        try:
+            conn = AsyncConnection()
+            await conn.open(address[0], address[1], 1000)
+            await conn.close()
+            return True
+        except Exception as ex:
+            logging.warning('Connect {}:{} failed: {}'.format(address[0], address[1], ex))
+            return False
+
+    async def update_servers_status(self, addresses=None):
+        """
+        update the servers' status, the servers are checked concurrently
+        :param addresses: the servers to check, None means all servers
+        :return: void
+        """
+        if addresses is None:
+            addresses = list(self._addresses)
+        results = await asyncio.gather(*[self.ping(address) for address in addresses])
+        for address, ok in zip(addresses, results):
+            self._set_server_status(address, ok)
+
+    def check_server(self, address):
+        """
+        ask the health check to check the server soon, it doesn't block
+        :param address: the server address
+        :return: void
+        """
+        if address in self._next_check_time:
+            self._next_check_time[address] = 0
+            self._check_event.set()
+
+    async def close(self):
+        """
+        stop the health check and close all connections in pool
+        :return: void
+        """
+        self._close = True
+        if self._check_task is not None:
+            self._check_task.cancel()
+            await asyncio.gather(self._check_task, return_exceptions=True)
+            self._check_task = None
+        for addr in self._connections.keys():
+            for connection in self._connections[addr]:
+                if connection.in_flight() > 0:
+                    logging.error('The connection using by someone, but now want to close it')
+                await connection.close()
+
+    def connects(self):
+        """
+        get the number of existing connections
+        :return: int
+        """
+        count = 0
+        for addr in self._connections.keys():
+            count = count + len(self._connections[addr])
+        return count
+
+    def in_flight_requests(self):
+        """
+        get the number of the requests waiting for response
+        :return: int
+        """
+        count = 0
+        for addr in self._connections.keys():
+            for connection in self._connections[addr]:
+                count = count + connection.in_flight()
+        return count
+
+    def get_ok_servers_num(self):
+        """
+        get the number of the ok servers
+        :return: int
+        """
+        count = 0
+        for addr in self._addresses_status.keys():
+            if self._addresses_status[addr] == self.S_OK:
+                count = count + 1
+        return count
+
+    def _set_server_status(self, address, ok):
+        # the ok servers are checked every health_check_interval, the bad
+        # servers are rechecked after 1s, 2s, 4s ... at most the interval
+        interval = self._configs.health_check_interval
+        self._addresses_status[address] = self.S_OK if ok else self.S_BAD
+        if ok:
+            self._check_failures[address] = 0
+            delay = interval
+        else:
+            failures = self._check_failures[address]
+            self._check_failures[address] = failures + 1
+            delay = min(2 ** failures, interval)
+        self._next_check_time[address] = time.time() + delay
+        if self._check_event is not None:
+            self._check_event.set()
+
+    async def _health_check_loop(self):
+        while not self._close:
+            now = time.time()
+            due = [addr for addr in self._addresses if self._next_check_time[addr] <= now]
+            if len(due) > 0:
+                try:
+                    await self.update_servers_status(due)
+                except Exception as ex:
+                    logging.error('Check servers failed: {}'.format(ex))
+                continue
+            self._check_event.clear()
+            wait_time = min(self._next_check_time.values()) - now
+            try:
+                await asyncio.wait_for(self._check_event.wait(), wait_time)
+            except asyncio.TimeoutError:
+                pass
+
+    def _get_services_status(self):
+        msg_list = []
+        for addr in self._addresses_status.keys():
+            status = 'OK'
+            if self._addresses_status[addr] != self.S_OK:
+                status = 'BAD'
+            msg_list.append('[services: {}, status: {}]'.format(addr, status))
+        return ', '.join(msg_list)
+
+
+class AsyncConnection(object):
+    """
+    the asyncio connection to graphd, it speaks the same buffered binary
+    protocol as Connection, but many requests can be in flight at the same
+    time, the responses are matched to the requests by seqid
+    """
+    READ_SIZE = 65536
+
+    def __init__(self):
+        self._reader = None
+        self._writer = None
+        self._read_task = None
+        self._futures = dict()
+        self._seqid = 0
+        self._timeout = None
+        self._ip = None
+        self._port = None
+
+    async def open(self, ip, port, timeout):
+        """
+        :param timeout: unit ms, 0 means no timeout
+        """
+        self._ip = ip
+        self._port = port
+        self._timeout = timeout / 1000.0 if timeout > 0 else None
+        self._reader, self._writer = await asyncio.wait_for(asyncio.open_connection(ip, port),
+                                                            self._timeout)
+        self._read_task = asyncio.ensure_future(self._read_responses())
+
+    async def authenticate(self, user_name, password):
+        resp = await self._call('authenticate',
+                                GraphService.authenticate_args(username=user_name, password=password),
+                                GraphService.authenticate_result)
+        if resp.error_code != ttypes.ErrorCode.SUCCEEDED:
+            raise AuthFailedException(resp.error_msg)
+        return resp.session_id
+
+    async def execute(self, session_id, stmt):
+        return await self._call('execute',
+                                GraphService.execute_args(sessionId=session_id, stmt=stmt),
+                                GraphService.execute_result)
+
+    async def signout(self, session_id):
+        # signout is oneway, no response
+        try:
+            self._send('signout', GraphService.signout_args(sessionId=session_id))
+            await self._writer.drain()
+        except Exception as ex:
+            logging.warning('Signout {} failed: {}'.format(session_id, ex))
+
+    async def close(self):
+        """
+
+        :return: void
+        """
+        if self._writer is None:
+            return
+        try:
+            self._writer.close()
+        except Exception as e:
+            logging.error('Close connection to {}:{} failed:{}'.format(self._ip, self._port, e))
+        if self._read_task is not None:
+            self._read_task.cancel()
+            # wait for the task cancelled, else it's destroyed while pending
+            await asyncio.gather(self._read_task, return_exceptions=True)
+        self._fail_all(IOErrorException(IOErrorException.E_CONNECT_BROKEN, 'Connection closed'))
+
+    async def ping(self):
+        """
+        check the connection if ok
+        :return: Boolean
+        """
+        try:
+            await self.execute(0, 'YIELD 1;')
+            return True
+        except IOErrorException:
+            return False
+
+    def is_open(self):
+        return self._read_task is not None and not self._read_task.done()
+
+    def in_flight(self):
+        """
+        the number of requests waiting for response
+        :return: int
+        """
+        return len(self._futures)
+
+    def get_address(self):
+        return (self._ip, self._port)
+
+    def _send(self, name, args):
+        if not self.is_open():
+            raise IOErrorException(IOErrorException.E_CONNECT_BROKEN, 'Connection closed')
+        self._seqid = (self._seqid + 1) & 0x7fffffff
+        buf = TTransport.TMemoryBuffer()
+        oprot = TBinaryProtocol.TBinaryProtocolAccelerated(buf)
+        oprot.writeMessageBegin(name, TMessageType.CALL, self._seqid)
+        args.write(oprot)
+        oprot.writeMessageEnd()
+        self._writer.write(buf.getvalue())
+        return self._seqid
+
+    async def _call(self, name, args, result_class):
+        seqid = self._send(name, args)
+        future = asyncio.get_event_loop().create_future()
+        self._futures[seqid] = future
+        try:
+            await self._writer.drain()
+            data = await asyncio.wait_for(future, self._timeout)
+        except asyncio.TimeoutError:
+            raise IOErrorException(IOErrorException.E_UNKNOWN,
+                                   '{} to {}:{} timeout'.format(name, self._ip, self._port))
+        except (ConnectionError, OSError) as ex:
+            raise IOErrorException(IOErrorException.E_CONNECT_BROKEN, str(ex))
+        finally:
+            self._futures.pop(seqid, None)
+
+        return decode_reply(data, name, result_class)
+
+    async def _read_responses(self):
+        scanner = MessageScanner()
+        try:
+            while True:
+                chunk = await self._reader.read(self.READ_SIZE)
+                if not chunk:
+                    raise IOErrorException(IOErrorException.E_CONNECT_BROKEN, 'Connection closed by peer')
+                scanner.feed(chunk)
+                while True:
+                    message = scanner.next_message()
+                    if message is None:
+                        break
+                    seqid, data = message
+                    future = self._futures.get(seqid)
+                    if future is not None and not future.done():
+                        future.set_result(data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            logging.warning('Read from {}:{} failed: {}'.format(self._ip, self._port, ex))
+            self._fail_all(IOErrorException(IOErrorException.E_CONNECT_BROKEN, str(ex)))
+
+    def _fail_all(self, exception):
+        for future in self._futures.values():
+            if not future.done():
+                future.set_exception(exception)
+
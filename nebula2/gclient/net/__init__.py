@@ -7,17 +7,20 @@
 # attached with Common Clause Condition 1.0, found in the LICENSES directory.
 
 
+import hashlib
 import threading
 import logging
 import time
+import select
 import socket
+import weakref
 
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from threading import RLock
 
-from thrift.transport import TSocket, TTransport
+from thrift.Thrift import TMessageType
 from thrift.transport.TTransport import TTransportException
-from thrift.protocol import TBinaryProtocol
 
 from nebula2.graph import (
     ttypes,
@@ -33,6 +36,16 @@ from nebula2.Exception import (
 
 from nebula2.data.ResultSet import ResultSet
 
+from nebula2.gclient.Decoder import MessageScanner, decode_reply, stream_execute_reply
+from nebula2.gclient.Transport import BUFFERED, make_protocol, make_socket
+from nebula2.gclient.LoadBalancer import ServerStats, make_balancer
+
+fastproto = None
+try:
+    from thrift.protocol import fastproto
+except ImportError:
+    pass
+
 logging.basicConfig(level=logging.INFO, format='[%(asctime)s]:%(message)s')
 
 
@@ -43,6 +56,7 @@ class Session(object):
         self._timezone = 0
         self._pool = pool
         self._retry_connect = retry_connect
+        self._space_name = ''
 
     def execute(self, stmt):
         """
@@ -53,22 +67,141 @@ class Session(object):
         if self._connection is None:
             raise RuntimeError('The session has released')
         try:
-            return ResultSet(self._connection.execute(self.session_id, stmt))
+            return self._make_result(self._connection.execute(self.session_id, stmt))
         except IOErrorException as ie:
             if ie.type == IOErrorException.E_CONNECT_BROKEN:
-                self._pool.update_servers_status()
+                self._pool.check_server(self._connection.get_address())
                 if self._retry_connect:
                     if not self._reconnect():
                         logging.warning('Retry connect failed')
                         raise IOErrorException(IOErrorException.E_ALL_BROKEN, 'All connections are broken')
                     try:
-                        return ResultSet(self._connection.execute(self.session_id, stmt))
+                        return self._make_result(self._connection.execute(self.session_id, stmt))
                     except Exception:
                         raise
             raise
         except Exception:
             raise
 
+    def execute_stream(self, stmt, batch_size=1024):
+        """
+        execute statement and get the result in batches while it is received,
+        the memory used is bounded by the batch size instead of the result size.
+        The session can't execute other statements before the end of the stream,
+        if the stream is not read to the end, the connection is closed
+        :param stmt: the ngql
+        :param batch_size: the max number of rows in a ResultSet
+        :return: generator of ResultSet
+        """
+        if self._connection is None:
+            raise RuntimeError('The session has released')
+        received = False
+        try:
+            for resp in self._connection.execute_stream(self.session_id, stmt, batch_size):
+                received = True
+                yield self._make_result(resp)
+        except IOErrorException as ie:
+            if ie.type == IOErrorException.E_CONNECT_BROKEN:
+                self._pool.check_server(self._connection.get_address())
+                # it can be retried only if nothing has been given
+                if self._retry_connect and not received:
+                    if not self._reconnect():
+                        logging.warning('Retry connect failed')
+                        raise IOErrorException(IOErrorException.E_ALL_BROKEN, 'All connections are broken')
+                    for resp in self._connection.execute_stream(self.session_id, stmt, batch_size):
+                        yield self._make_result(resp)
+                    return
+            raise
+
+    def execute_many(self, stmts, concurrency=4):
+        """
+        execute the statements concurrently, e.g. the statements of InsertBuilder.
+        The session is kept by graphd, so the statements are sent over the
+        session's connection and the other connections to the same graphd
+        borrowed from the pool, the order of the execution is not kept.
+        So the statements must be independent and run in the current space of
+        the session, e.g. USE is not allowed
+        :param stmts: the list of ngql
+        :param concurrency: the max number of the connections used
+        :return: list of ResultSet in the order of stmts
+        """
+        if self._connection is None:
+            raise RuntimeError('The session has released')
+        stmts = list(stmts)
+        address = self._connection.get_address()
+        connections = [self._connection]
+        try:
+            for i in range(0, min(concurrency, len(stmts)) - 1):
+                connection = self._pool.get_connection(address)
+                if connection is None:
+                    break
+                connections.append(connection)
+            if len(connections) == 1:
+                return [self.execute(stmt) for stmt in stmts]
+
+            results = [None] * len(stmts)
+            errors = list()
+            indexes = iter(range(0, len(stmts)))
+            lock = threading.Lock()
+
+            def run(connection):
+                while True:
+                    with lock:
+                        index = next(indexes, None)
+                        if index is None or len(errors) > 0:
+                            return
+                    try:
+                        # the space of the session is not changed by the statements
+                        results[index] = ResultSet(connection.execute(self.session_id, stmts[index]))
+                    except Exception as x:
+                        with lock:
+                            errors.append(x)
+                        return
+
+            threads = [threading.Thread(target=run, args=(connection,)) for connection in connections[1:]]
+            for thread in threads:
+                thread.start()
+            run(self._connection)
+            for thread in threads:
+                thread.join()
+            if len(errors) > 0:
+                raise errors[0]
+            return results
+        finally:
+            for connection in connections[1:]:
+                self._pool.return_connection(connection)
+
+    def execute_pipelined(self, stmts, max_in_flight=64):
+        """
+        execute the independent statements on the session's connection by
+        sending them without waiting for the replies, see Connection.execute_pipelined.
+        The statements are not retried when the connection is broken, some of them
+        may have been executed
+        :param stmts: the list of ngql
+        :param max_in_flight: the max statements sent but not replied
+        :return: list of ResultSet in the order of stmts
+        """
+        if self._connection is None:
+            raise RuntimeError('The session has released')
+        stmts = list(stmts)
+        try:
+            resps = self._connection.execute_pipelined(self.session_id, stmts, max_in_flight)
+        except IOErrorException as ie:
+            if ie.type == IOErrorException.E_CONNECT_BROKEN:
+                self._pool.check_server(self._connection.get_address())
+            raise
+        return [self._make_result(resp) for resp in resps]
+
+    def space_name(self):
+        """
+        the current space of the session, it is updated by the responses
+        :return: str, '' if no space is used
+        """
+        return self._space_name
+
+    def is_released(self):
+        return self._connection is None
+
     def release(self):
         """
         release the connection to pool
@@ -76,7 +209,7 @@ class Session(object):
         if self._connection is None:
             return
         self._connection.signout(self.session_id)
-        self._connection.is_used = False
+        self._pool.return_connection(self._connection)
         self._connection = None
 
     def ping(self):
@@ -88,11 +221,18 @@ class Session(object):
             return False
         return self._connection.ping()
 
+    def _make_result(self, resp):
+        result = ResultSet(resp)
+        if resp.space_name and result.is_succeeded():
+            self._space_name = result.space_name()
+        return result
+
     def _reconnect(self):
         try:
             conn = self._pool.get_connection()
             if conn is None:
                 return False
+            self._pool.return_connection(self._connection)
             self._connection = conn
         except NotValidConnectionException:
             return False
@@ -102,10 +242,158 @@ class Session(object):
         self.release()
 
 
+class SessionPool(object):
+    """
+    keep the authenticated sessions for reuse, the idle sessions are grouped
+    by the user and the space they are using, so borrowing a session doesn't
+    need authenticate, signout or USE <space> round trips.
+    Every idle session holds a connection of the ConnectionPool, they are
+    signed out to free the connections when the ConnectionPool is exhausted
+    """
+    def __init__(self, connection_pool, max_idle_sessions=10, idle_time=0):
+        """
+        :param connection_pool: the inited ConnectionPool
+        :param max_idle_sessions: the max idle sessions of all the users and spaces
+        :param idle_time: unit s, the session idle longer than it is signed
+        out instead of reused, 0 means never
+        """
+        self._connection_pool = connection_pool
+        self._max_idle_sessions = max_idle_sessions
+        self._idle_time = idle_time
+        # (user_name, password digest, space_name) -> deque<(Session, return time)>
+        self._idle_sessions = dict()
+        # the borrowed session -> (user_name, password digest)
+        self._owners = weakref.WeakKeyDictionary()
+        self._lock = RLock()
+        self._close = False
+
+    def get_session(self, user_name, password, space_name=None, retry_connect=True):
+        """
+        borrow a session, the session is using space_name if it's given,
+        else it is not using any space
+        :param user_name:
+        :param password:
+        :param space_name: the space to use
+        :param retry_connect: if auto retry connect, only used by the new session
+        :return: Session
+        """
+        owner = (user_name, hashlib.sha256(password.encode('utf-8')).hexdigest())
+        session = self._take_idle(owner, space_name)
+        if session is not None and space_name and session.space_name() != space_name:
+            # the idle session may be expired on graphd, it's replaced by a new one
+            try:
+                used = self._use(session, space_name).is_succeeded()
+            except IOErrorException:
+                used = False
+            if not used:
+                session.release()
+                session = None
+        if session is None:
+            session = self._new_session(user_name, password, retry_connect)
+            if space_name:
+                resp = self._use(session, space_name)
+                if not resp.is_succeeded():
+                    session.release()
+                    raise RuntimeError('USE {} failed: {}'.format(space_name, resp.error_msg()))
+        with self._lock:
+            self._owners[session] = owner
+        return session
+
+    def return_session(self, session):
+        """
+        give back the session borrowed from get_session
+        :param session: the Session
+        :return: void
+        """
+        with self._lock:
+            owner = self._owners.pop(session, None)
+            if owner is not None and not self._close and not session.is_released() \
+                    and self.idle_sessions() < self._max_idle_sessions:
+                key = (owner[0], owner[1], session.space_name())
+                self._idle_sessions.setdefault(key, deque()).append((session, time.time()))
+                return
+        session.release()
+
+    def idle_sessions(self):
+        """
+        get the number of the idle sessions
+        :return: int
+        """
+        with self._lock:
+            return sum([len(sessions) for sessions in self._idle_sessions.values()])
+
+    def close(self):
+        """
+        signout all the idle sessions
+        :return: void
+        """
+        with self._lock:
+            self._close = True
+            sessions = list()
+            for idle_sessions in self._idle_sessions.values():
+                sessions.extend([session for session, return_time in idle_sessions])
+            self._idle_sessions.clear()
+        for session in sessions:
+            session.release()
+
+    @staticmethod
+    def _use(session, space_name):
+        return session.execute('USE {}'.format(space_name))
+
+    def _new_session(self, user_name, password, retry_connect):
+        while True:
+            try:
+                return self._connection_pool.get_session(user_name, password, retry_connect)
+            except NotValidConnectionException:
+                # the connections may be held by the idle sessions
+                session = self._take_oldest()
+                if session is None:
+                    raise
+                session.release()
+
+    def _take_oldest(self):
+        with self._lock:
+            oldest = None
+            for idle_sessions in self._idle_sessions.values():
+                if idle_sessions and (oldest is None or idle_sessions[0][1] < oldest[0][1]):
+                    oldest = idle_sessions
+            if oldest is None:
+                return None
+            return oldest.popleft()[0]
+
+    def _take_idle(self, owner, space_name):
+        expired = list()
+        try:
+            with self._lock:
+                if self._close:
+                    raise RuntimeError('The session pool is closed')
+                # the session using the same space first, then any session of
+                # the user if it will USE the space
+                keys = [(owner[0], owner[1], space_name or '')]
+                if space_name:
+                    keys.extend([key for key in self._idle_sessions.keys()
+                                 if key[:2] == owner and key not in keys])
+                for key in keys:
+                    idle_sessions = self._idle_sessions.get(key)
+                    while idle_sessions:
+                        session, return_time = idle_sessions.pop()
+                        if self._idle_time != 0 and time.time() - return_time > self._idle_time:
+                            expired.append(session)
+                            continue
+                        return session
+                return None
+        finally:
+            for session in expired:
+                session.release()
+
+
 class ConnectionPool(object):
     S_OK = 0
     S_BAD = 1
 
+    # the number of checkout wait time samples kept for the percentiles
+    CHECKOUT_SAMPLES = 4096
+
     def __init__(self):
         # all addresses of servers
         self._addresses = list()
@@ -115,10 +403,25 @@ class ConnectionPool(object):
 
         # all connections
         self._connections = dict()
+
+        # the idle connections, the last returned one is checked out first
+        self._idle_connections = dict()
+
+        # the recent checkout wait time, unit seconds
+        self._checkout_wait_times = deque(maxlen=self.CHECKOUT_SAMPLES)
+        # the health check state of the servers
+        self._next_check_time = dict()
+        self._check_failures = dict()
+        self._check_event = threading.Event()
+        self._check_executor = None
+        self._check_thread = None
+
+        # the load of the servers, fed by their connections
+        self._server_stats = dict()
+        self._balancer = None
+
         self._configs = None
         self._lock = RLock()
-        self._pos = -1
-        self._check_delay = 60  # unit seconds
         self._close = False
 
     def __del__(self):
@@ -135,6 +438,7 @@ class ConnectionPool(object):
             logging.error('The pool has init or closed.')
             raise RuntimeError('The pool has init or closed.')
         self._configs = configs
+        self._balancer = make_balancer(configs.load_balancer)
         for address in addresses:
             if address not in self._addresses:
                 try:
@@ -145,9 +449,15 @@ class ConnectionPool(object):
                 self._addresses.append(ip_port)
                 self._addresses_status[ip_port] = self.S_BAD
                 self._connections[ip_port] = deque()
+                self._idle_connections[ip_port] = deque()
+                self._next_check_time[ip_port] = 0
+                self._check_failures[ip_port] = 0
+                self._server_stats[ip_port] = ServerStats(configs.ewma_decay_time)
 
         # detect the services
-        self._period_detect()
+        self._check_executor = ThreadPoolExecutor(max_workers=len(self._addresses))
+        self.update_servers_status()
+        self._start_health_check()
 
         # init min connections
         ok_num = self.get_ok_servers_num()
@@ -158,8 +468,11 @@ class ConnectionPool(object):
         for addr in self._addresses:
             for i in range(0, conns_per_address):
                 connection = Connection()
-                connection.open(addr[0], addr[1], self._configs.timeout)
+                connection.set_stats(self._server_stats[addr])
+                connection.open(addr[0], addr[1], self._configs.timeout, self._configs)
+                connection.reset()
                 self._connections[addr].append(connection)
+                self._idle_connections[addr].append(connection)
         return True
 
     def get_session(self, user_name, password, retry_connect=True):
@@ -177,53 +490,146 @@ class ConnectionPool(object):
             session_id = connection.authenticate(user_name, password)
             return Session(connection, session_id, self, retry_connect)
         except Exception:
+            self.return_connection(connection)
             raise
 
-    def get_connection(self):
+    def get_connection(self, address=None):
         """
-        get available connection
+        get available connection, the idle connection is taken in O(1) under
+        the lock, it is pinged outside the lock only if it has been idle longer
+        than configs.ping_idle_time. The dead idle connections are dropped
+        until a good one is found or a new one is opened
+        :param address: (host, port), only get the connection to it if given
         :return: Connection Object
         """
+        start = time.time()
+        try:
+            # only the failed opens count, the idle connections are finite
+            failures = 0
+            while failures <= len(self._addresses):
+                connection, is_new, idle_time = self._checkout(address)
+                if connection is None:
+                    return None
+                addr = connection.get_address()
+                if is_new:
+                    try:
+                        connection.open(addr[0], addr[1], self._configs.timeout, self._configs)
+                    except Exception as ex:
+                        logging.error('Open connection to {} failed: {}'.format(addr, ex))
+                        self._discard(connection)
+                        self.check_server(addr)
+                        failures = failures + 1
+                        continue
+                elif idle_time > self._configs.ping_idle_time and not self._check_idle(connection):
+                    logging.debug('Remove the not unusable connection to {}'.format(addr))
+                    self._discard(connection)
+                    continue
+                connection.is_used = True
+                logging.info('Get connection to {}'.format(addr))
+                return connection
+            return None
+        finally:
+            self._checkout_wait_times.append(time.time() - start)
+
+    def return_connection(self, connection):
+        """
+        give back the connection to the pool
+        :param connection: the connection got from get_connection
+        :return: void
+        """
+        addr = connection.get_address()
+        with self._lock:
+            connection.is_used = False
+            connection.reset()
+            if self._close or not connection.is_open() or self._addresses_status.get(addr) != self.S_OK:
+                conns = self._connections.get(addr)
+                if conns is not None and connection in conns:
+                    conns.remove(connection)
+                connection.close()
+                return
+            self._idle_connections[addr].append(connection)
+
+    def server_stats(self):
+        """
+        get the load of the servers seen by the pool
+        :return: map<address, (requests in flight, latency)>, the latency
+        unit is ms
+        """
+        return {addr: (stats.in_flight(), stats.latency() * 1000)
+                for addr, stats in self._server_stats.items()}
+
+    def checkout_wait_percentiles(self, percents=(50, 90, 99)):
+        """
+        get the percentiles of the recent get_connection wait time
+        :param percents: the wanted percentiles
+        :return: dict<percent, wait time>, unit ms
+        """
+        samples = sorted(self._checkout_wait_times)
+        result = dict()
+        for percent in percents:
+            if len(samples) == 0:
+                result[percent] = 0
+                continue
+            index = min(len(samples) - 1, int(len(samples) * percent / 100))
+            result[percent] = samples[index] * 1000
+        return result
+
+    def _checkout(self, address=None):
+        """
+        take an idle connection or reserve a slot for a new one
+        :param address: (host, port), only take the connection to it if given
+        :return: (Connection, is_new, idle_time)
+        """
         with self._lock:
             if self._close:
                 logging.error('The pool is closed')
                 raise NotValidConnectionException()
 
-            try:
-                ok_num = self.get_ok_servers_num()
-                if ok_num == 0:
-                    return None
-                max_con_per_address = int(self._configs.max_connection_pool_size / ok_num)
-                try_count = 0
-                while try_count <= len(self._addresses):
-                    self._pos = (self._pos + 1) % len(self._addresses)
-                    addr = self._addresses[self._pos]
-                    if self._addresses_status[addr] == self.S_OK:
-                        for connection in self._connections[addr]:
-                            if not connection.is_used:
-                                if connection.ping():
-                                    connection.is_used = True
-                                    logging.info('Get connection to {}'.format(addr))
-                                    return connection
-
-                        if len(self._connections[addr]) < max_con_per_address:
-                            connection = Connection()
-                            connection.open(addr[0], addr[1], self._configs.timeout)
-                            connection.is_used = True
-                            self._connections[addr].append(connection)
-                            logging.info('Get connection to {}'.format(addr))
-                            return connection
-                    else:
-                        for connection in list(self._connections[addr]):
-                            if not connection.is_used:
-                                self._connections[addr].remove(connection)
-                    try_count = try_count + 1
-                return None
-            except Exception as ex:
-                logging.error('Get connection failed: {}'.format(ex))
-                import traceback
-                print(traceback.format_exc())
-                return None
+            ok_num = self.get_ok_servers_num()
+            if ok_num == 0 or (address is not None and address not in self._idle_connections):
+                return None, False, 0
+            max_con_per_address = int(self._configs.max_connection_pool_size / ok_num)
+            if address is None:
+                ok_addrs = [addr for addr in self._addresses if self._addresses_status[addr] == self.S_OK]
+                bad_addrs = [addr for addr in self._addresses if self._addresses_status[addr] != self.S_OK]
+                candidates = self._balancer.order(ok_addrs, self._server_stats) + bad_addrs
+            else:
+                candidates = [address]
+            for addr in candidates:
+                idle_conns = self._idle_connections[addr]
+                if self._addresses_status[addr] != self.S_OK:
+                    while len(idle_conns) > 0:
+                        connection = idle_conns.pop()
+                        self._connections[addr].remove(connection)
+                        connection.close()
+                    continue
+                if len(idle_conns) > 0:
+                    connection = idle_conns.pop()
+                    idle_time = connection.idle_time()
+                    connection.is_used = True
+                    return connection, False, idle_time
+                if len(self._connections[addr]) < max_con_per_address:
+                    connection = Connection()
+                    connection.set_address(addr[0], addr[1])
+                    connection.set_stats(self._server_stats[addr])
+                    connection.is_used = True
+                    self._connections[addr].append(connection)
+                    return connection, True, 0
+            return None, False, 0
+
+    def _check_idle(self, connection):
+        # the dead peers are found by the TCP keepalive, so only the socket
+        # is checked instead of the ping
+        if self._configs.keepalive:
+            return connection.is_alive()
+        return connection.ping()
+
+    def _discard(self, connection):
+        with self._lock:
+            conns = self._connections.get(connection.get_address())
+            if conns is not None and connection in conns:
+                conns.remove(connection)
+        connection.close()
 
     def ping(self, address):
         """
@@ -233,7 +639,9 @@ class ConnectionPool(object):
         """
         try:
             conn = Connection()
-            conn.open(address[0], address[1], 1000)
+            conn.open(address[0], address[1],
+                      self._configs.health_check_timeout if self._configs else 1000,
+                      self._configs)
             conn.close()
             return True
         except Exception as ex:
@@ -252,6 +660,13 @@ class ConnectionPool(object):
                         logging.error('The connection using by someone, but now want to close it')
                     connection.close()
             self._close = True
+        # stop the health checker before its executor
+        self._check_event.set()
+        thread = self._check_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        if self._check_executor is not None:
+            self._check_executor.shutdown(wait=False)
 
     def connnects(self):
         """
@@ -299,57 +714,172 @@ class ConnectionPool(object):
 
     def update_servers_status(self):
         """
-        update the servers' status
+        update all the servers' status, the servers are checked concurrently
         """
-        for address in self._addresses:
-            if self.ping(address):
+        self._check_servers(list(self._addresses))
+
+    def check_server(self, address):
+        """
+        ask the health checker to check the server soon, it doesn't block
+        :param address: the server address
+        :return: void
+        """
+        with self._lock:
+            if address in self._next_check_time:
+                self._next_check_time[address] = 0
+        self._check_event.set()
+
+    def _check_servers(self, addresses):
+        if len(addresses) == 0:
+            return
+        futures = [self._check_executor.submit(self._probe, address) for address in addresses]
+        for address, future in zip(addresses, futures):
+            try:
+                ok = future.result()
+            except Exception as ex:
+                logging.warning('Check {} failed: {}'.format(address, ex))
+                ok = False
+            self._set_server_status(address, ok)
+
+    def _set_server_status(self, address, ok):
+        with self._lock:
+            now = time.time()
+            if ok:
                 self._addresses_status[address] = self.S_OK
+                self._check_failures[address] = 0
+                self._next_check_time[address] = now + self._configs.health_check_interval
             else:
+                if self._addresses_status[address] == self.S_OK:
+                    logging.warning('The server {} is BAD'.format(address))
                 self._addresses_status[address] = self.S_BAD
+                # retry the bad server after 1s, 2s, 4s ... at most the check interval
+                failures = self._check_failures[address]
+                self._check_failures[address] = failures + 1
+                delay = min(2 ** failures, self._configs.health_check_interval)
+                self._next_check_time[address] = now + delay
+
+    def _probe(self, address):
+        """
+        ping the server by an idle connection of the pool if there is one,
+        else by a new connection
+        :return: True or False
+        """
+        connection = None
+        with self._lock:
+            idle_conns = self._idle_connections[address]
+            if len(idle_conns) > 0:
+                connection = idle_conns.pop()
+                connection.is_used = True
+        if connection is not None:
+            try:
+                connection.set_timeout(self._configs.health_check_timeout)
+                ok = connection.ping()
+                connection.set_timeout(self._configs.timeout)
+            except Exception as ex:
+                logging.warning('Ping {} failed: {}'.format(address, ex))
+                ok = False
+            if ok:
+                self._push_idle(connection)
+                return True
+            self._discard(connection)
+
+        return self.ping(address)
+
+    def _push_idle(self, connection):
+        # give back the connection without touching its idle time
+        with self._lock:
+            connection.is_used = False
+            conns = self._connections.get(connection.get_address())
+            if self._close or conns is None or connection not in conns:
+                connection.close()
+                return
+            self._idle_connections[connection.get_address()].append(connection)
 
     def _remove_idle_unusable_connection(self):
-        if self._configs.idle_time == 0:
-            return
         with self._lock:
-            for addr in self._connections.keys():
-                conns = self._connections[addr]
-                for connection in conns:
-                    if not connection.is_used:
-                        if not connection.ping():
-                            logging.debug('Remove the not unusable connection to {}'.format(connection.get_address()))
-                            conns.remove(connection)
-                            continue
-                        if self._configs.idle_time != 0 and connection.idle_time() > self._configs.idle_time:
-                            logging.debug('Remove the idle connection to {}'.format(connection.get_address()))
-                            conns.remove(connection)
+            for addr in self._idle_connections.keys():
+                idle_conns = self._idle_connections[addr]
+                for connection in list(idle_conns):
+                    if not connection.is_open():
+                        logging.debug('Remove the not unusable connection to {}'.format(addr))
+                    elif self._configs.idle_time != 0 and connection.idle_time() > self._configs.idle_time:
+                        logging.debug('Remove the idle connection to {}'.format(addr))
+                    else:
+                        continue
+                    idle_conns.remove(connection)
+                    self._connections[addr].remove(connection)
+                    connection.close()
 
-    def _period_detect(self):
-        self.update_servers_status()
-        self._remove_idle_unusable_connection()
-        timer = threading.Timer(self._check_delay, self._period_detect)
-        timer.setDaemon(True)
-        timer.start()
+    def _start_health_check(self):
+        self._check_thread = threading.Thread(target=self._health_check_loop, name='nebula-health-check')
+        self._check_thread.daemon = True
+        self._check_thread.start()
+
+    def _health_check_loop(self):
+        next_clean_time = time.time() + self._configs.health_check_interval
+        while not self._close:
+            now = time.time()
+            with self._lock:
+                due = [addr for addr in self._addresses if self._next_check_time[addr] <= now]
+                wait_time = min([self._next_check_time[addr] for addr in self._addresses] + [next_clean_time]) - now
+            if len(due) > 0:
+                try:
+                    self._check_servers(due)
+                except Exception as ex:
+                    if self._close:
+                        return
+                    logging.error('Check servers failed: {}'.format(ex))
+                continue
+            if now >= next_clean_time:
+                self._remove_idle_unusable_connection()
+                next_clean_time = now + self._configs.health_check_interval
+                continue
+            self._check_event.wait(max(wait_time, 0))
+            self._check_event.clear()
 
 
 class Connection(object):
     is_used = False
 
+    READ_SIZE = 65536
+
     def __init__(self):
         self._connection = None
+        self._socket = None
         self.start_use_time = 0
         self._ip = None
         self._port = None
+        self._framed = False
+        self._stats = None
+
+    def set_address(self, ip, port):
+        self._ip = ip
+        self._port = port
+
+    def set_stats(self, stats):
+        """
+        :param stats: the ServerStats fed by the requests of the connection
+        """
+        self._stats = stats
 
-    def open(self, ip, port, timeout):
+    def open(self, ip, port, timeout, configs=None):
+        """
+        open the connection
+        :param ip: the ip of graphd
+        :param port: the port of graphd
+        :param timeout: unit ms, 0 means no timeout
+        :param configs: the Config of the transport stack, None means the default Config
+        :return: void
+        """
         self._ip = ip
         self._port = port
         try:
-            s = TSocket.TSocket(self._ip, self._port)
-            if timeout > 0:
-                s.setTimeout(timeout)
-            transport = TTransport.TBufferedTransport(s)
-            protocol = TBinaryProtocol.TBinaryProtocol(transport)
-            transport.open()
+            s = make_socket(self._ip, self._port, timeout, configs)
+            self._socket = s
+            protocol = make_protocol(s, configs)
+            # every message has its own frame except on the buffered transport
+            self._framed = configs is not None and configs.transport != BUFFERED
+            protocol.trans.open()
             self._connection = GraphService.Client(protocol)
         except Exception:
             raise
@@ -366,14 +896,127 @@ class Connection(object):
             raise IOErrorException(IOErrorException.E_CONNECT_BROKEN, te.message)
 
     def execute(self, session_id, stmt):
+        if self._stats is None:
+            return self._execute(session_id, stmt)
+        self._stats.begin()
+        start = time.time()
         try:
-            resp = self._connection.execute(session_id, stmt)
-            return resp
+            return self._execute(session_id, stmt)
+        finally:
+            self._stats.end(latency=time.time() - start)
+
+    def _execute(self, session_id, stmt):
+        try:
+            if fastproto is not None:
+                return self._connection.execute(session_id, stmt)
+            # without fastproto the whole reply is read first, then decoded
+            # by the pure python decoder which is faster than the generated code
+            self._connection.send_execute(session_id, stmt)
+            return decode_reply(self._recv_message(), 'execute', GraphService.execute_result)
         except TTransportException as te:
             if te.type == TTransportException.END_OF_FILE:
                 self.close()
             raise IOErrorException(IOErrorException.E_CONNECT_BROKEN, te.message)
 
+    def execute_pipelined(self, session_id, stmts, max_in_flight=64):
+        """
+        execute the independent statements by sending the requests back to back
+        without waiting for the replies, the replies are matched by the seqids,
+        so the statements cost about one round trip instead of one per statement
+        :param session_id: the session id
+        :param stmts: the list of ngql
+        :param max_in_flight: the max requests sent but not replied, the server
+        stops reading when too many replies are not read
+        :return: list of ExecutionResponse in the order of stmts
+        """
+        oprot = self._connection._oprot
+        read = self._raw_read()
+        scanner = MessageScanner()
+        replies = dict()
+        sent = 0
+        if self._stats is not None:
+            self._stats.begin(len(stmts))
+        try:
+            while len(replies) < len(stmts):
+                if sent < len(stmts) and sent - len(replies) < max_in_flight:
+                    while sent < len(stmts) and sent - len(replies) < max_in_flight:
+                        sent = sent + 1
+                        oprot.writeMessageBegin('execute', TMessageType.CALL, sent)
+                        GraphService.execute_args(sessionId=session_id, stmt=stmts[sent - 1]).write(oprot)
+                        oprot.writeMessageEnd()
+                        if self._framed:
+                            oprot.trans.flush()
+                    if not self._framed:
+                        oprot.trans.flush()
+                message = scanner.next_message()
+                if message is None:
+                    scanner.feed(read(self.READ_SIZE))
+                    continue
+                if message[0] in replies or not 0 < message[0] <= sent:
+                    # the stream is out of sync, the connection can't be used again
+                    self.close()
+                    raise IOErrorException(IOErrorException.E_CONNECT_BROKEN,
+                                           'Unexpected seqid {} of the reply'.format(message[0]))
+                replies[message[0]] = message[1]
+        except TTransportException as te:
+            # the replies not read are still in the socket
+            self.close()
+            raise IOErrorException(IOErrorException.E_CONNECT_BROKEN, te.message)
+        finally:
+            if self._stats is not None:
+                self._stats.end(len(stmts))
+        # all replies are read, the connection is still usable if one of them fails
+        resps = [decode_reply(replies[seqid], 'execute', GraphService.execute_result)
+                 for seqid in range(1, len(stmts) + 1)]
+        if self._stats is not None:
+            # the client time of a reply includes the wait behind the others,
+            # so the latency of graphd is the sample
+            for resp in resps:
+                self._stats.add_latency(resp.latency_in_us / 1000000.0)
+        return resps
+
+    def execute_stream(self, session_id, stmt, batch_size):
+        """
+        execute the statement, the reply is decoded while it is received
+        :param session_id: the session id
+        :param stmt: the ngql
+        :param batch_size: the max number of rows in a batch
+        :return: generator of ExecutionResponse, see stream_execute_reply
+        """
+        try:
+            self._connection.send_execute(session_id, stmt)
+        except TTransportException as te:
+            if te.type == TTransportException.END_OF_FILE:
+                self.close()
+            raise IOErrorException(IOErrorException.E_CONNECT_BROKEN, te.message)
+        return self._stream_reply(batch_size)
+
+    def _stream_reply(self, batch_size):
+        done = False
+        if self._stats is not None:
+            self._stats.begin()
+        try:
+            stream = stream_execute_reply(self._raw_read(), batch_size, self.READ_SIZE)
+            # read one response ahead, so the reply is fully read
+            # when the last one is given
+            resp = next(stream)
+            if self._stats is not None:
+                # the client time depends on the reader of the stream
+                self._stats.add_latency(resp.latency_in_us / 1000000.0)
+            for next_resp in stream:
+                yield resp
+                resp = next_resp
+            done = True
+            yield resp
+        except TTransportException as te:
+            raise IOErrorException(IOErrorException.E_CONNECT_BROKEN, te.message)
+        finally:
+            if self._stats is not None:
+                self._stats.end()
+            if not done:
+                # the rest of the reply is still in the socket
+                self.close()
+
     def signout(self, session_id):
         try:
             self._connection.signout(session_id)
@@ -381,34 +1024,86 @@ class Connection(object):
             if te.type == TTransportException.END_OF_FILE:
                 self.close()
 
+    def _raw_read(self):
+        # the scanners copy what is read, so the bytes of the receive buffer
+        # are given to them without a copy when the transport can
+        trans = self._connection._iprot.trans
+        return getattr(trans, 'read_view', trans.read)
+
+    def _recv_message(self):
+        read = self._raw_read()
+        scanner = MessageScanner()
+        while True:
+            scanner.feed(read(self.READ_SIZE))
+            message = scanner.next_message()
+            if message is not None:
+                return message[1]
+
     def close(self):
         """
 
         :return: void
         """
+        if self._connection is None:
+            return
         try:
             self._connection._iprot.trans.close()
         except Exception as e:
             logging.error('Close connection to {}:{} failed:{}'.format(self._ip, self._port, e))
 
+    def is_open(self):
+        if self._connection is None:
+            return False
+        return self._connection._iprot.trans.isOpen()
+
     def ping(self):
         """
         check the connection if ok
         :return: Boolean
         """
         try:
+            start = time.time()
             self._connection.execute(0, 'YIELD 1;')
+            if self._stats is not None:
+                self._stats.add_latency(time.time() - start)
             return True
-        except TTransportException as te:
-            if te.type == TTransportException.END_OF_FILE:
-                return False
+        except TTransportException:
+            # the response may come later after timeout, the connection can't be used again
+            self.close()
+            return False
+
+    def is_alive(self):
+        """
+        check the socket without sending anything, the closed or broken
+        socket is readable, so is the socket with the data not asked for
+        :return: Boolean
+        """
+        if not self.is_open() or self._socket.handle is None:
+            return False
+        try:
+            readable, _, _ = select.select([self._socket.handle], [], [], 0)
+        except (select.error, ValueError):
+            return False
+        if len(readable) > 0:
+            self.close()
+            return False
         return True
 
+    def set_timeout(self, timeout):
+        """
+        :param timeout: unit ms, 0 means no timeout
+        """
+        if self._socket is not None:
+            self._socket.setTimeout(timeout if timeout > 0 else None)
+
     def reset(self):
         self.start_use_time = time.time()
 
     def idle_time(self):
-        if not self.is_used:
+        """
+        the time since the connection was returned to the pool, unit s
+        """
+        if self.is_used:
             return 0
         return time.time() - self.start_use_time
 
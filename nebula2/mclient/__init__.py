@@ -0,0 +1,492 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+
+import logging
+import threading
+
+from threading import RLock
+
+from thrift.transport import TSocket, TTransport
+from thrift.transport.TTransport import TTransportException
+from thrift.protocol import TBinaryProtocol
+
+from nebula2.meta import (
+    ttypes,
+    MetaService
+)
+
+from nebula2.Exception import (
+    IOErrorException,
+    SpaceNotFoundException,
+    TagNotFoundException,
+    EdgeNotFoundException,
+    IndexNotFoundException
+)
+
+
+def to_bytes(name, encoding='utf-8'):
+    """
+    the names are bytes in the meta and storage requests
+    """
+    if isinstance(name, bytes):
+        return name
+    return name.encode(encoding)
+
+
+def latest_versions(items, name_field):
+    """
+    metad returns all versions of the schemas, keep the latest one of every name
+    :param items: list<TagItem> or list<EdgeItem>
+    :param name_field: tag_name or edge_name
+    :return: map<name, TagItem or EdgeItem>
+    """
+    latest = dict()
+    for item in items:
+        name = getattr(item, name_field)
+        if name not in latest or latest[name].version < item.version:
+            latest[name] = item
+    return latest
+
+
+class MetaClient(object):
+    # the times to follow the leader of metad when it changed
+    MAX_LEADER_RETRY = 3
+
+    def __init__(self, addresses, timeout):
+        """
+        the client of metad, the calls are serialized by a lock
+        :param addresses: the metad servers' addresses
+        :param timeout: unit ms, 0 means no timeout
+        """
+        if len(addresses) == 0:
+            raise RuntimeError('Input empty addresses')
+        self._addresses = addresses
+        self._timeout = timeout
+        self._connection = None
+        self._transport = None
+        self._leader = None
+        self._lock = RLock()
+
+    def open(self):
+        """
+        connect to the first available metad
+        :return: void
+        """
+        with self._lock:
+            self.close()
+            last_ex = None
+            for address in self._addresses:
+                try:
+                    self._connect(address)
+                    return
+                except Exception as x:
+                    logging.warning('Connect metad {} failed: {}'.format(address, x))
+                    last_ex = x
+            raise IOErrorException(IOErrorException.E_ALL_BROKEN,
+                                   'Connect metad failed: {}'.format(last_ex))
+
+    def get_space(self, space_name):
+        """
+        get the space
+        :param space_name: the space name
+        :return: SpaceItem
+        """
+        req = ttypes.GetSpaceReq(space_name=to_bytes(space_name))
+        resp = self._call('getSpace', req)
+        if resp.code == ttypes.ErrorCode.E_NOT_FOUND:
+            raise SpaceNotFoundException(space_name)
+        self._check(resp, 'Get space {}'.format(space_name))
+        return resp.item
+
+    def list_spaces(self):
+        """
+        list the spaces
+        :return: list<IdName>
+        """
+        resp = self._call('listSpaces', ttypes.ListSpacesReq())
+        self._check(resp, 'List spaces')
+        return resp.spaces
+
+    def list_tags(self, space_id):
+        """
+        list the tags with the latest schema
+        :param space_id: the space id
+        :return: list<TagItem>
+        """
+        resp = self._call('listTags', ttypes.ListTagsReq(space_id=space_id))
+        self._check(resp, 'List tags of space {}'.format(space_id))
+        return resp.tags
+
+    def list_edges(self, space_id):
+        """
+        list the edges with the latest schema
+        :param space_id: the space id
+        :return: list<EdgeItem>
+        """
+        resp = self._call('listEdges', ttypes.ListEdgesReq(space_id=space_id))
+        self._check(resp, 'List edges of space {}'.format(space_id))
+        return resp.edges
+
+    def get_tag(self, space_id, tag_name):
+        """
+        get the tag with the latest schema
+        :param space_id: the space id
+        :param tag_name: the tag name
+        :return: TagItem
+        """
+        tag = latest_versions(self.list_tags(space_id), 'tag_name').get(to_bytes(tag_name))
+        if tag is None:
+            raise TagNotFoundException(tag_name)
+        return tag
+
+    def get_edge(self, space_id, edge_name):
+        """
+        get the edge with the latest schema
+        :param space_id: the space id
+        :param edge_name: the edge name
+        :return: EdgeItem
+        """
+        edge = latest_versions(self.list_edges(space_id), 'edge_name').get(to_bytes(edge_name))
+        if edge is None:
+            raise EdgeNotFoundException(edge_name)
+        return edge
+
+    def list_tag_indexes(self, space_id):
+        """
+        list the tag indexes
+        :param space_id: the space id
+        :return: list<IndexItem>
+        """
+        resp = self._call('listTagIndexes', ttypes.ListTagIndexesReq(space_id=space_id))
+        self._check(resp, 'List tag indexes of space {}'.format(space_id))
+        return resp.items
+
+    def list_edge_indexes(self, space_id):
+        """
+        list the edge indexes
+        :param space_id: the space id
+        :return: list<IndexItem>
+        """
+        resp = self._call('listEdgeIndexes', ttypes.ListEdgeIndexesReq(space_id=space_id))
+        self._check(resp, 'List edge indexes of space {}'.format(space_id))
+        return resp.items
+
+    def get_parts_alloc(self, space_id):
+        """
+        get the storaged addresses of all parts
+        :param space_id: the space id
+        :return: map<part_id, list<HostAddr>>
+        """
+        resp = self._call('getPartsAlloc', ttypes.GetPartsAllocReq(space_id=space_id))
+        self._check(resp, 'Get parts alloc of space {}'.format(space_id))
+        return resp.parts
+
+    def list_hosts(self, host_type=ttypes.ListHostType.STORAGE):
+        """
+        list the hosts
+        :param host_type: the ListHostType
+        :return: list<HostItem>
+        """
+        resp = self._call('listHosts', ttypes.ListHostsReq(type=host_type))
+        self._check(resp, 'List hosts')
+        return resp.hosts
+
+    def close(self):
+        with self._lock:
+            if self._transport is not None:
+                try:
+                    self._transport.close()
+                except Exception:
+                    pass
+            self._transport = None
+            self._connection = None
+            self._leader = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _connect(self, address):
+        s = TSocket.TSocket(address[0], address[1])
+        if self._timeout > 0:
+            s.setTimeout(self._timeout)
+        transport = TTransport.TRecvBufferTransport(s)
+        protocol = TBinaryProtocol.TBinaryProtocolAccelerated(transport)
+        transport.open()
+        self._transport = transport
+        self._connection = MetaService.Client(protocol)
+        self._leader = address
+
+    def _call(self, method, req):
+        with self._lock:
+            if self._connection is None:
+                self.open()
+            for retry in range(0, self.MAX_LEADER_RETRY + 1):
+                try:
+                    resp = getattr(self._connection, method)(req)
+                except TTransportException as te:
+                    self.close()
+                    raise IOErrorException(IOErrorException.E_CONNECT_BROKEN, te.message)
+                if resp.code != ttypes.ErrorCode.E_LEADER_CHANGED or \
+                        resp.leader is None or retry == self.MAX_LEADER_RETRY:
+                    return resp
+                # follow the new leader of metad
+                leader = (resp.leader.host, resp.leader.port)
+                logging.info('The leader of metad changed to {}'.format(leader))
+                self.close()
+                self._connect(leader)
+
+    @staticmethod
+    def _check(resp, action):
+        if resp.code != ttypes.ErrorCode.SUCCEEDED:
+            raise RuntimeError('{} failed, error code: {}'.format(
+                action, ttypes.ErrorCode._VALUES_TO_NAMES.get(resp.code, resp.code)))
+
+
+class SpaceCache(object):
+    """
+    the metadata of one space
+    """
+    __slots__ = ('space_id', 'space_desc', 'tags', 'edges', 'tag_indexes', 'edge_indexes',
+                 'parts_alloc', 'leaders')
+
+    def __init__(self, space_id, space_desc, tags, edges, tag_indexes, edge_indexes, parts_alloc, leaders):
+        self.space_id = space_id
+        self.space_desc = space_desc
+        # name -> TagItem of the latest version
+        self.tags = tags
+        # name -> EdgeItem of the latest version
+        self.edges = edges
+        # name -> IndexItem
+        self.tag_indexes = tag_indexes
+        # name -> IndexItem
+        self.edge_indexes = edge_indexes
+        # part_id -> list<(host, port)>
+        self.parts_alloc = parts_alloc
+        # part_id -> (host, port) of the leader
+        self.leaders = leaders
+
+
+class MetaCache(object):
+    def __init__(self, addresses, timeout=2000, load_period=10):
+        """
+        the cache of the metadata used by the storage clients, it's loaded
+        when created and refreshed by a background thread
+        :param addresses: the metad servers' addresses
+        :param timeout: unit ms, 0 means no timeout
+        :param load_period: unit s, the period to refresh the cache, 0 means never
+        """
+        self._meta_client = MetaClient(addresses, timeout)
+        self._meta_client.open()
+        self._load_period = load_period
+        # space name -> SpaceCache
+        self._spaces = dict()
+        self._storage_addrs = list()
+        self._lock = RLock()
+        self._close_event = threading.Event()
+        self._load_thread = None
+        self.load()
+        if load_period > 0:
+            self._load_thread = threading.Thread(target=self._load_loop, name='MetaCacheLoader')
+            self._load_thread.daemon = True
+            self._load_thread.start()
+
+    def get_meta_client(self):
+        return self._meta_client
+
+    def get_space_id(self, space_name):
+        return self._get_space(space_name).space_id
+
+    def get_space_desc(self, space_name):
+        """
+        get the space properties
+        :param space_name: the space name
+        :return: SpaceDesc
+        """
+        return self._get_space(space_name).space_desc
+
+    def get_tag(self, space_name, tag_name, min_version=None):
+        """
+        get the tag of the latest cached version
+        :param space_name: the space name
+        :param tag_name: the tag name
+        :param min_version: the space is reloaded if the cached version is older
+        :return: TagItem
+        """
+        return self._get_schema(space_name, tag_name, 'tags', min_version, TagNotFoundException)
+
+    def get_tag_id(self, space_name, tag_name):
+        return self.get_tag(space_name, tag_name).tag_id
+
+    def get_tag_schema(self, space_name, tag_name):
+        return self.get_tag(space_name, tag_name).schema
+
+    def get_edge(self, space_name, edge_name, min_version=None):
+        """
+        get the edge of the latest cached version
+        :param space_name: the space name
+        :param edge_name: the edge name
+        :param min_version: the space is reloaded if the cached version is older
+        :return: EdgeItem
+        """
+        return self._get_schema(space_name, edge_name, 'edges', min_version, EdgeNotFoundException)
+
+    def get_edge_type(self, space_name, edge_name):
+        return self.get_edge(space_name, edge_name).edge_type
+
+    def get_edge_schema(self, space_name, edge_name):
+        return self.get_edge(space_name, edge_name).schema
+
+    def get_tag_index(self, space_name, index_name):
+        """
+        get the tag index
+        :param space_name: the space name
+        :param index_name: the index name
+        :return: IndexItem
+        """
+        return self._get_schema(space_name, index_name, 'tag_indexes', None, IndexNotFoundException)
+
+    def get_edge_index(self, space_name, index_name):
+        """
+        get the edge index
+        :param space_name: the space name
+        :param index_name: the index name
+        :return: IndexItem
+        """
+        return self._get_schema(space_name, index_name, 'edge_indexes', None, IndexNotFoundException)
+
+    def get_parts_alloc(self, space_name):
+        """
+        get the storaged addresses of all parts
+        :param space_name: the space name
+        :return: map<part_id, list<(host, port)>>
+        """
+        return self._get_space(space_name).parts_alloc
+
+    def get_part_leaders(self, space_name):
+        """
+        get the leaders of all parts
+        :param space_name: the space name
+        :return: map<part_id, (host, port)>
+        """
+        return self._get_space(space_name).leaders
+
+    def update_part_leader(self, space_name, part_id, address):
+        """
+        update the leader of the part when storaged reports it changed
+        :param space_name: the space name
+        :param part_id: the part id
+        :param address: the address (host, port) of the new leader
+        :return: void
+        """
+        with self._lock:
+            space = self._spaces.get(to_bytes(space_name))
+            if space is not None:
+                space.leaders[part_id] = address
+
+    def get_storage_addrs(self):
+        """
+        get the addresses of the online storaged
+        :return: list<(host, port)>
+        """
+        return self._storage_addrs
+
+    def load(self, space_name=None):
+        """
+        reload the metadata from metad
+        :param space_name: the space to reload, None means all spaces
+        :return: void
+        """
+        hosts = self._meta_client.list_hosts()
+        if space_name is None:
+            names = [space.name for space in self._meta_client.list_spaces()]
+        else:
+            names = [to_bytes(space_name)]
+        spaces = dict()
+        for name in names:
+            try:
+                spaces[name] = self._load_space(name, hosts)
+            except SpaceNotFoundException:
+                # dropped after listed
+                pass
+        with self._lock:
+            if space_name is None:
+                self._spaces = spaces
+            else:
+                self._spaces.update(spaces)
+            self._storage_addrs = [(host.hostAddr.host, host.hostAddr.port)
+                                   for host in hosts if host.status == ttypes.HostStatus.ONLINE]
+
+    def close(self):
+        self._close_event.set()
+        if self._load_thread is not None and self._load_thread is not threading.current_thread():
+            self._load_thread.join()
+        self._meta_client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _load_loop(self):
+        while not self._close_event.wait(self._load_period):
+            try:
+                self.load()
+            except Exception as x:
+                logging.warning('Load meta cache failed: {}'.format(x))
+
+    def _load_space(self, space_name, hosts):
+        item = self._meta_client.get_space(space_name)
+        tags = latest_versions(self._meta_client.list_tags(item.space_id), 'tag_name')
+        edges = latest_versions(self._meta_client.list_edges(item.space_id), 'edge_name')
+        tag_indexes = {index.index_name: index for index in self._meta_client.list_tag_indexes(item.space_id)}
+        edge_indexes = {index.index_name: index for index in self._meta_client.list_edge_indexes(item.space_id)}
+        parts_alloc = {part_id: [(addr.host, addr.port) for addr in addrs]
+                       for part_id, addrs in self._meta_client.get_parts_alloc(item.space_id).items()}
+        leaders = {part_id: addrs[0] for part_id, addrs in parts_alloc.items() if len(addrs) > 0}
+        for host in hosts:
+            if host.status != ttypes.HostStatus.ONLINE or host.leader_parts is None:
+                continue
+            for part_id in host.leader_parts.get(space_name, []):
+                leaders[part_id] = (host.hostAddr.host, host.hostAddr.port)
+
+        old = self._spaces.get(space_name)
+        if old is not None:
+            # keep the unchanged schemas, only the newer versions replace the cached ones
+            for cached, loaded in ((old.tags, tags), (old.edges, edges)):
+                for name, schema in loaded.items():
+                    if name in cached and cached[name].version >= schema.version:
+                        loaded[name] = cached[name]
+        return SpaceCache(item.space_id, item.properties, tags, edges, tag_indexes, edge_indexes,
+                          parts_alloc, leaders)
+
+    def _get_space(self, space_name):
+        name = to_bytes(space_name)
+        space = self._spaces.get(name)
+        if space is None:
+            # created after loaded
+            self.load(name)
+            space = self._spaces.get(name)
+            if space is None:
+                raise SpaceNotFoundException(space_name)
+        return space
+
+    def _get_schema(self, space_name, schema_name, field, min_version, not_found):
+        name = to_bytes(schema_name)
+        item = getattr(self._get_space(space_name), field).get(name)
+        if item is None or (min_version is not None and item.version < min_version):
+            self.load(space_name)
+            item = getattr(self._get_space(space_name), field).get(name)
+        if item is None:
+            raise not_found(schema_name)
+        return item
@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+"""
+The bulk load of the vertices and edges to storaged directly.
+
+The rows are read in batches, every batch is converted by the schema, split
+by the parts and sent to the leaders of the parts by the worker pool. The
+reading waits when there are too many batches in flight.
+"""
+
+import csv
+import threading
+
+from itertools import islice
+
+from nebula2.meta.ttypes import PropertyType
+from nebula2.storage import ttypes
+from nebula2.mclient import to_bytes
+from nebula2.sclient.net import StorageClient
+from nebula2.sclient.Partitioner import Partitioner
+from nebula2.sclient.ValueConverter import make_converter, vid_converter, vid_value
+
+from nebula2.Exception import InvalidKeyException
+
+
+class BulkWriter(StorageClient):
+    # the rows of one batch, the batch is split by the leaders of the parts
+    DEFAULT_BATCH_SIZE = 1000
+
+    def __init__(self,
+                 meta_cache,
+                 batch_size=DEFAULT_BATCH_SIZE,
+                 max_in_flight=16,
+                 concurrency=8,
+                 timeout=60000,
+                 overwritable=True):
+        """
+        :param meta_cache: the MetaCache
+        :param batch_size: the rows of one batch
+        :param max_in_flight: the max number of the batches which are read but not written
+        :param concurrency: the max number of the batches written at the same time
+        :param timeout: unit ms, the timeout of one request
+        :param overwritable: if overwrite the existed vertices and edges
+        """
+        StorageClient.__init__(self, meta_cache, timeout, concurrency)
+        self._batch_size = batch_size
+        self._max_in_flight = max_in_flight
+        self._overwritable = overwritable
+        self._partitioner = Partitioner(meta_cache)
+
+    def add_vertices(self, space_name, tag_name, rows, prop_names=None):
+        """
+        write the vertices of the tag
+        :param space_name: the space name
+        :param tag_name: the tag name
+        :param rows: iterable of (vid, the prop values in the order of prop_names)
+        :param prop_names: the prop names, None means all props in the schema order
+        :return: the number of the written vertices
+        """
+        space_id = self._meta_cache.get_space_id(space_name)
+        tag = self._meta_cache.get_tag(space_name, tag_name)
+        names, indexes, converters = self._prepare_props(tag.schema, prop_names)
+        vid_converter = self._vid_converter(space_name)
+        tag_id = tag.tag_id
+
+        def make_req(parts):
+            return ttypes.AddVerticesRequest(space_id=space_id,
+                                             parts=parts,
+                                             prop_names={tag_id: names},
+                                             overwritable=self._overwritable)
+
+        def write(rows):
+            vids = [vid_converter(row[0]) for row in rows]
+            parts = dict()
+            for part_id, vid, row in zip(self._part_ids(space_name, vids), vids, rows):
+                props = [converter(row[index]) for index, converter in zip(indexes, converters)]
+                vertex = ttypes.NewVertex(id=vid_value(vid),
+                                          tags=[ttypes.NewTag(tag_id=tag_id, props=props)])
+                parts.setdefault(part_id, []).append(vertex)
+            self._execute(space_name, 'add_vertices', parts, make_req)
+        return self._write(rows, write)
+
+    def add_edges(self, space_name, edge_name, rows, prop_names=None, with_rank=False):
+        """
+        write the edges, the reverse edges are written too like INSERT EDGE
+        :param space_name: the space name
+        :param edge_name: the edge name
+        :param rows: iterable of (src, dst, [rank,] the prop values in the order of prop_names)
+        :param prop_names: the prop names, None means all props in the schema order
+        :param with_rank: if the rows have the rank, else the rank is 0
+        :return: the number of the written edges
+        """
+        space_id = self._meta_cache.get_space_id(space_name)
+        edge = self._meta_cache.get_edge(space_name, edge_name)
+        names, indexes, converters = self._prepare_props(edge.schema, prop_names)
+        offset = 3 if with_rank else 2
+        indexes = [index + offset - 1 for index in indexes]
+        vid_converter = self._vid_converter(space_name)
+        edge_type = edge.edge_type
+
+        def make_req(parts):
+            return ttypes.AddEdgesRequest(space_id=space_id,
+                                          parts=parts,
+                                          prop_names=names,
+                                          overwritable=self._overwritable)
+
+        def write(rows):
+            srcs = [vid_converter(row[0]) for row in rows]
+            dsts = [vid_converter(row[1]) for row in rows]
+            src_parts = self._part_ids(space_name, srcs)
+            dst_parts = self._part_ids(space_name, dsts)
+            parts = dict()
+            for i, row in enumerate(rows):
+                src = vid_value(srcs[i])
+                dst = vid_value(dsts[i])
+                rank = int(row[2]) if with_rank else 0
+                props = [converter(row[index]) for index, converter in zip(indexes, converters)]
+                parts.setdefault(src_parts[i], []).append(ttypes.NewEdge(
+                    key=ttypes.EdgeKey(src=src, edge_type=edge_type, ranking=rank, dst=dst),
+                    props=props))
+                parts.setdefault(dst_parts[i], []).append(ttypes.NewEdge(
+                    key=ttypes.EdgeKey(src=dst, edge_type=-edge_type, ranking=rank, dst=src),
+                    props=props))
+            self._execute(space_name, 'add_edges', parts, make_req)
+        return self._write(rows, write)
+
+    def add_vertices_from_csv(self, space_name, tag_name, path, prop_names=None,
+                              header=True, delimiter=',', encoding='utf-8'):
+        """
+        write the vertices from the CSV file, the first column is the vid
+        :param space_name: the space name
+        :param tag_name: the tag name
+        :param path: the CSV file path
+        :param prop_names: the prop names of the other columns, None means the header
+        or all props in the schema order when no header
+        :param header: if the first line is the header
+        :param delimiter: the delimiter of the CSV
+        :param encoding: the encoding of the file
+        :return: the number of the written vertices
+        """
+        with open(path, newline='', encoding=encoding) as f:
+            reader = csv.reader(f, delimiter=delimiter)
+            if header:
+                names = next(reader)[1:]
+                if prop_names is None:
+                    prop_names = names
+            return self.add_vertices(space_name, tag_name, reader, prop_names)
+
+    def add_edges_from_csv(self, space_name, edge_name, path, prop_names=None, with_rank=False,
+                           header=True, delimiter=',', encoding='utf-8'):
+        """
+        write the edges from the CSV file, the first columns are the src, dst and rank
+        :param space_name: the space name
+        :param edge_name: the edge name
+        :param path: the CSV file path
+        :param prop_names: the prop names of the other columns, None means the header
+        or all props in the schema order when no header
+        :param with_rank: if the third column is the rank
+        :param header: if the first line is the header
+        :param delimiter: the delimiter of the CSV
+        :param encoding: the encoding of the file
+        :return: the number of the written edges
+        """
+        with open(path, newline='', encoding=encoding) as f:
+            reader = csv.reader(f, delimiter=delimiter)
+            if header:
+                names = next(reader)[3 if with_rank else 2:]
+                if prop_names is None:
+                    prop_names = names
+            return self.add_edges(space_name, edge_name, reader, prop_names, with_rank)
+
+    def add_vertices_from_dataframe(self, space_name, tag_name, df, vid_column='vid', prop_names=None):
+        """
+        write the vertices from the pandas DataFrame
+        :param space_name: the space name
+        :param tag_name: the tag name
+        :param df: the DataFrame
+        :param vid_column: the column of the vid
+        :param prop_names: the prop columns, None means the other columns
+        :return: the number of the written vertices
+        """
+        if prop_names is None:
+            prop_names = [col for col in df.columns if col != vid_column]
+        rows = df[[vid_column] + list(prop_names)].itertuples(index=False, name=None)
+        return self.add_vertices(space_name, tag_name, rows, prop_names)
+
+    def add_edges_from_dataframe(self, space_name, edge_name, df, src_column='src', dst_column='dst',
+                                 rank_column=None, prop_names=None):
+        """
+        write the edges from the pandas DataFrame
+        :param space_name: the space name
+        :param edge_name: the edge name
+        :param df: the DataFrame
+        :param src_column: the column of the src vid
+        :param dst_column: the column of the dst vid
+        :param rank_column: the column of the rank, None means the rank is 0
+        :param prop_names: the prop columns, None means the other columns
+        :return: the number of the written edges
+        """
+        key_columns = [src_column, dst_column] + ([rank_column] if rank_column is not None else [])
+        if prop_names is None:
+            prop_names = [col for col in df.columns if col not in key_columns]
+        rows = df[key_columns + list(prop_names)].itertuples(index=False, name=None)
+        return self.add_edges(space_name, edge_name, rows, prop_names, rank_column is not None)
+
+    @staticmethod
+    def _prepare_props(schema, prop_names):
+        """
+        sort the props by the schema
+        :return: the prop names, the value indexes in the row and the converters
+        """
+        columns = {col.name: (pos, col) for pos, col in enumerate(schema.columns)}
+        if prop_names is None:
+            prop_names = [col.name for col in schema.columns]
+        props = list()
+        for index, name in enumerate(prop_names):
+            name = to_bytes(name)
+            if name not in columns:
+                raise InvalidKeyException(name.decode('utf-8'))
+            pos, col = columns[name]
+            props.append((pos, name, index + 1, make_converter(col.type.type)))
+        props.sort(key=lambda prop: prop[0])
+        return [prop[1] for prop in props], [prop[2] for prop in props], [prop[3] for prop in props]
+
+    def _vid_converter(self, space_name):
+        return vid_converter(self._meta_cache.get_space_desc(space_name).vid_type.type == PropertyType.INT64)
+
+    def _part_ids(self, space_name, vids):
+        parts = self._partitioner.part_ids(space_name, vids)
+        if not isinstance(parts, list):
+            parts = parts.tolist()
+        return parts
+
+    def _execute(self, space_name, method, parts, make_req):
+        result = self._router.execute(space_name, method, parts, make_req)
+        if not result.is_succeeded():
+            raise RuntimeError('Write space {} failed, {}'.format(space_name, result.error_msg()))
+
+    def _write(self, rows, write):
+        self._check_open()
+        in_flight = threading.BoundedSemaphore(self._max_in_flight)
+        errors = list()
+
+        def run(batch):
+            try:
+                write(batch)
+            except Exception as x:
+                errors.append(x)
+            finally:
+                in_flight.release()
+
+        count = 0
+        rows = iter(rows)
+        while len(errors) == 0:
+            batch = list(islice(rows, self._batch_size))
+            if len(batch) == 0:
+                break
+            # wait for the written batches
+            in_flight.acquire()
+            try:
+                self._executor.submit(run, batch)
+            except Exception as x:
+                # e.g. the writer is closed, run never releases the permit
+                in_flight.release()
+                errors.append(x)
+                break
+            count = count + len(batch)
+        # wait for all batches
+        for i in range(0, self._max_in_flight):
+            in_flight.acquire()
+        for i in range(0, self._max_in_flight):
+            in_flight.release()
+        if len(errors) > 0:
+            raise errors[0]
+        return count
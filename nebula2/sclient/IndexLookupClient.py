@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+"""
+The index lookup of the vertices and edges on storaged directly.
+
+The lookup of every part is sent by the worker pool at the same time, the
+records of the parts are given in the order the responses arrive, and the
+parts not finished are canceled when the limit is reached.
+"""
+
+from concurrent.futures import as_completed
+
+from nebula2.storage import ttypes
+from nebula2.storage.ttypes import ScanType
+from nebula2.data.DataObject import DataSetWrapper
+from nebula2.mclient import to_bytes
+from nebula2.sclient.net import StorageClient
+from nebula2.sclient.StorageScanClient import VID, SRC, RANK, DST
+from nebula2.sclient.ValueConverter import make_converter
+
+from nebula2.Exception import InvalidKeyException
+
+
+class IndexLookupClient(StorageClient):
+    def __init__(self, meta_cache, timeout=60000, concurrency=8, decode_type='utf-8'):
+        """
+        :param meta_cache: the MetaCache which has the indexes
+        :param timeout: unit ms, the timeout of one lookup request
+        :param concurrency: the max number of the parts looked up at the same time
+        :param decode_type: the decode type of the strings
+        """
+        StorageClient.__init__(self, meta_cache, timeout, concurrency)
+        self._decode_type = decode_type
+
+    def lookup_tag(self,
+                   space_name,
+                   index_name,
+                   hints=None,
+                   prop_names=None,
+                   where=None,
+                   limit=None,
+                   parts=None):
+        """
+        lookup the vertices by the tag index
+        :param space_name: the space name
+        :param index_name: the tag index name
+        :param hints: the list of the hints on the index fields, (name, value)
+        means the prefix scan, (name, begin, end) means the range scan of [begin, end),
+        IndexColumnHint is used as it is
+        :param prop_names: the props to return, the vertex id is always
+        returned as the first column
+        :param where: the encoded filter expression
+        :param limit: the max number of the records, None means no limit
+        :param parts: the part ids to lookup, None means all parts
+        :return: the generator of Record, the order between the parts is not kept
+        """
+        index = self._meta_cache.get_tag_index(space_name, index_name)
+        return_columns = [VID] + [to_bytes(name) for name in prop_names or []]
+        return self._lookup(space_name, index, False, index.schema_id.value, hints,
+                            return_columns, where, limit, parts)
+
+    def lookup_edge(self,
+                    space_name,
+                    index_name,
+                    hints=None,
+                    prop_names=None,
+                    where=None,
+                    limit=None,
+                    parts=None):
+        """
+        lookup the edges by the edge index
+        :param space_name: the space name
+        :param index_name: the edge index name
+        :param hints: the list of the hints on the index fields, (name, value)
+        means the prefix scan, (name, begin, end) means the range scan of [begin, end),
+        IndexColumnHint is used as it is
+        :param prop_names: the props to return, the src, rank and dst are
+        always returned as the first three columns
+        :param where: the encoded filter expression
+        :param limit: the max number of the records, None means no limit
+        :param parts: the part ids to lookup, None means all parts
+        :return: the generator of Record, the order between the parts is not kept
+        """
+        index = self._meta_cache.get_edge_index(space_name, index_name)
+        return_columns = [SRC, RANK, DST] + [to_bytes(name) for name in prop_names or []]
+        return self._lookup(space_name, index, True, index.schema_id.value, hints,
+                            return_columns, where, limit, parts)
+
+    @staticmethod
+    def _make_hints(index, hints):
+        fields = {field.name: field for field in index.fields}
+        column_hints = list()
+        for hint in hints or []:
+            if isinstance(hint, ttypes.IndexColumnHint):
+                column_hints.append(hint)
+                continue
+            name = to_bytes(hint[0])
+            field = fields.get(name)
+            if field is None:
+                raise InvalidKeyException(name.decode('utf-8'))
+            convert = make_converter(field.type.type)
+            if len(hint) == 2:
+                column_hints.append(ttypes.IndexColumnHint(column_name=name,
+                                                           scan_type=ScanType.PREFIX,
+                                                           begin_value=convert(hint[1])))
+            else:
+                column_hints.append(ttypes.IndexColumnHint(column_name=name,
+                                                           scan_type=ScanType.RANGE,
+                                                           begin_value=convert(hint[1]),
+                                                           end_value=convert(hint[2])))
+        return column_hints
+
+    def _lookup(self, space_name, index, is_edge, schema_id, hints, return_columns, where, limit, parts):
+        self._check_open()
+        space_id = self._meta_cache.get_space_id(space_name)
+        parts_alloc = self._meta_cache.get_parts_alloc(space_name)
+        if parts is None:
+            parts = sorted(parts_alloc.keys())
+        for part_id in parts:
+            if part_id not in parts_alloc:
+                raise RuntimeError('Part {} not found in space {}'.format(part_id, space_name))
+        context = ttypes.IndexQueryContext(index_id=index.index_id,
+                                           filter=where or b'',
+                                           column_hints=self._make_hints(index, hints))
+        indices = ttypes.IndexSpec(contexts=[context], is_edge=is_edge, tag_or_edge_id=schema_id)
+
+        def make_req(sub_parts):
+            return ttypes.LookupIndexRequest(space_id=space_id,
+                                             parts=list(sub_parts.keys()),
+                                             indices=indices,
+                                             return_columns=return_columns)
+        return self._iter_records(space_name, parts, make_req, limit)
+
+    def _iter_records(self, space_name, parts, make_req, limit):
+        futures = [self._executor.submit(self._router.execute, space_name, 'lookup_index', {part_id: None}, make_req)
+                   for part_id in parts]
+        count = 0
+        try:
+            if limit is not None and limit <= 0:
+                return
+            for future in as_completed(futures):
+                result = future.result()
+                if not result.is_succeeded():
+                    raise RuntimeError('Lookup space {} failed, {}'.format(space_name, result.error_msg()))
+                for resp in result.responses:
+                    if resp.data is None:
+                        continue
+                    for record in DataSetWrapper(resp.data, self._decode_type):
+                        yield record
+                        count = count + 1
+                        if limit is not None and count >= limit:
+                            return
+        finally:
+            # the limit is reached or the records are not read to the end
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+"""
+The key value client of the GeneralStorageService of storaged.
+
+The keys are hashed to the parts as the vertex ids of the string, the keys
+are split into batches, and every batch is sent to the leaders of its parts
+by one request of every leader, the batches are sent by the worker pool.
+"""
+
+import logging
+
+from nebula2.common import ttypes as common_ttypes
+from nebula2.storage import ttypes
+from nebula2.mclient import to_bytes
+from nebula2.sclient.net import StorageClient, GeneralStorageConnection
+from nebula2.sclient.Partitioner import bucket, part_ids
+
+
+class KVClient(StorageClient):
+    # storaged serves the GeneralStorageService on its port - 2
+    DEFAULT_PORT_OFFSET = -2
+
+    def __init__(self,
+                 meta_cache,
+                 batch_size=1000,
+                 timeout=60000,
+                 concurrency=8,
+                 port_offset=DEFAULT_PORT_OFFSET):
+        """
+        :param meta_cache: the MetaCache
+        :param batch_size: the max keys of one batch
+        :param timeout: unit ms, the timeout of one request
+        :param concurrency: the max number of the batches sent at the same time
+        :param port_offset: the port of the kv service is the port of storaged plus it
+        """
+        StorageClient.__init__(self, meta_cache, timeout, concurrency, GeneralStorageConnection, port_offset)
+        self._batch_size = batch_size
+
+    def get(self, space_name, keys, return_partly=False):
+        """
+        get the values of the keys
+        :param space_name: the space name
+        :param keys: list of bytes or str
+        :param return_partly: return the values found, the keys not found and the
+        keys of the failed parts are not in the result, else raise the failure
+        :return: map<bytes, bytes>
+        """
+        space_id = self._meta_cache.get_space_id(space_name)
+
+        def make_req(parts):
+            return ttypes.KVGetRequest(space_id=space_id, parts=parts, return_partly=return_partly)
+
+        key_values = dict()
+        for result in self._execute(space_name, 'get', [to_bytes(key) for key in keys], make_req):
+            if not result.is_succeeded():
+                if not return_partly:
+                    raise RuntimeError('Get keys of space {} failed, {}'.format(space_name, result.error_msg()))
+                logging.warning('Get keys of space {} partly, {}'.format(space_name, result.error_msg()))
+            for resp in result.responses:
+                if resp.key_values is not None:
+                    key_values.update(resp.key_values)
+        return key_values
+
+    def put(self, space_name, key_values):
+        """
+        put the key values
+        :param space_name: the space name
+        :param key_values: map<key, value> or list of (key, value), bytes or str
+        :return: void
+        """
+        space_id = self._meta_cache.get_space_id(space_name)
+        if isinstance(key_values, dict):
+            key_values = key_values.items()
+        values = dict()
+        for key, value in key_values:
+            values[to_bytes(key)] = to_bytes(value)
+
+        def make_req(parts):
+            return ttypes.KVPutRequest(
+                space_id=space_id,
+                parts={part_id: [common_ttypes.KeyValue(key=key, value=values[key]) for key in part_keys]
+                       for part_id, part_keys in parts.items()})
+
+        for result in self._execute(space_name, 'put', list(values.keys()), make_req):
+            if not result.is_succeeded():
+                raise RuntimeError('Put keys of space {} failed, {}'.format(space_name, result.error_msg()))
+
+    def remove(self, space_name, keys):
+        """
+        remove the keys
+        :param space_name: the space name
+        :param keys: list of bytes or str
+        :return: void
+        """
+        space_id = self._meta_cache.get_space_id(space_name)
+
+        def make_req(parts):
+            return ttypes.KVRemoveRequest(space_id=space_id, parts=parts)
+
+        for result in self._execute(space_name, 'remove', [to_bytes(key) for key in keys], make_req):
+            if not result.is_succeeded():
+                raise RuntimeError('Remove keys of space {} failed, {}'.format(space_name, result.error_msg()))
+
+    def _execute(self, space_name, method, keys, make_req):
+        """
+        send the batches of the keys
+        :return: list of RouteResult
+        """
+        self._check_open()
+        num_parts = self._meta_cache.get_space_desc(space_name).partition_num
+        batches = list()
+        for start in range(0, len(keys), self._batch_size):
+            batch = keys[start:start + self._batch_size]
+            batches.append(bucket(batch, part_ids(batch, num_parts, is_int=False)))
+        if len(batches) == 1:
+            return [self._router.execute(space_name, method, batches[0], make_req)]
+        futures = [self._executor.submit(self._router.execute, space_name, method, parts, make_req)
+                   for parts in batches]
+        return [future.result() for future in futures]
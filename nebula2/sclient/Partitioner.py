@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+"""
+The vertex id to part id hashing which is the same as the server.
+
+The id of 8 bytes is taken as the little endian uint64, the other ids are
+hashed by MurmurHash2 (64A), then part id = hash % num_parts + 1. The int
+ids are the 8 bytes of the int64. The ids are hashed by numpy when it's
+installed, else by the pure python code.
+"""
+
+import numbers
+import struct
+
+from nebula2.meta.ttypes import PropertyType
+
+np = None
+try:
+    import numpy as np
+except ImportError:
+    pass
+
+_MASK = 0xFFFFFFFFFFFFFFFF
+_M = 0xc6a4a7935bd1e995
+_SEED = 0xc70f6907
+_R = 47
+_U64 = struct.Struct('<Q')
+
+
+def murmur_hash(data):
+    """
+    the MurmurHash2 of the server
+    :param data: bytes
+    :return: uint64
+    """
+    length = len(data)
+    h = (_SEED ^ (length * _M)) & _MASK
+    end = length - (length & 7)
+    for k, in struct.iter_unpack('<Q', data[:end]):
+        k = (k * _M) & _MASK
+        k ^= k >> _R
+        k = (k * _M) & _MASK
+        h ^= k
+        h = (h * _M) & _MASK
+    if length & 7:
+        h ^= int.from_bytes(data[end:], 'little')
+        h = (h * _M) & _MASK
+    h ^= h >> _R
+    h = (h * _M) & _MASK
+    h ^= h >> _R
+    return h
+
+
+def _to_bytes(vid):
+    if isinstance(vid, bytes):
+        return vid
+    return vid.encode('utf-8')
+
+
+def part_id(vid, num_parts):
+    """
+    get the part id of one vertex id
+    :param vid: int, bytes or str
+    :param num_parts: the partition number of the space
+    :return: the part id
+    """
+    if isinstance(vid, numbers.Integral):
+        return (int(vid) & _MASK) % num_parts + 1
+    vid = _to_bytes(vid)
+    if len(vid) == 8:
+        return _U64.unpack(vid)[0] % num_parts + 1
+    # the server hashes the C string, so it ends at the first zero byte
+    end = vid.find(b'\0')
+    return murmur_hash(vid if end < 0 else vid[:end]) % num_parts + 1
+
+
+def part_ids(vids, num_parts, is_int=None):
+    """
+    get the part ids of the vertex ids, it's vectorized by numpy when installed
+    :param vids: list or numpy array of int, bytes or str
+    :param num_parts: the partition number of the space
+    :param is_int: if the ids are int, None means detect from the ids
+    :return: numpy array of int32 when numpy installed, else list
+    """
+    if is_int is None:
+        if np is not None and isinstance(vids, np.ndarray):
+            is_int = vids.dtype.kind in 'iu'
+        else:
+            is_int = len(vids) > 0 and isinstance(vids[0], numbers.Integral)
+    if np is None:
+        return [part_id(vid, num_parts) for vid in vids]
+    if len(vids) == 0:
+        return np.zeros(0, dtype=np.int32)
+    if is_int:
+        hashes = np.asarray(vids, dtype=np.int64).view(np.uint64)
+    else:
+        hashes = _hash_strings(vids)
+    return (hashes % np.uint64(num_parts) + np.uint64(1)).astype(np.int32)
+
+
+def _hash_strings(vids):
+    vids = [_to_bytes(vid) for vid in vids]
+    count = len(vids)
+    lengths = np.fromiter(map(len, vids), dtype=np.int64, count=count)
+    width = max(8, (int(lengths.max()) + 8) & ~7)
+    # the zero padded ids, the padding makes the tail of every id a whole block
+    matrix = np.array(vids, dtype='S{}'.format(width)).view(np.uint8).reshape(count, width)
+    raw_blocks = matrix.view(np.dtype('<u8')).reshape(count, width // 8)
+    # the length of the C string, there is at least one zero byte of the padding
+    str_lengths = np.argmax(matrix == 0, axis=1)
+    blocks = raw_blocks
+    if np.any(str_lengths != lengths):
+        # the bytes after the first zero byte are not hashed
+        matrix = np.where(np.arange(width) < str_lengths[:, None], matrix, 0).astype(np.uint8)
+        blocks = matrix.view(np.dtype('<u8')).reshape(count, width // 8)
+
+    m = np.uint64(_M)
+    r = np.uint64(_R)
+    h = np.uint64(_SEED) ^ (str_lengths.astype(np.uint64) * m)
+    full_blocks = str_lengths // 8
+    for i in range(int(full_blocks.max()) + 1):
+        k = blocks[:, i] * m
+        k ^= k >> r
+        k *= m
+        mixed = (h ^ k) * m
+        # the tail block is mixed once without the k mixing
+        tail = (h ^ blocks[:, i]) * m
+        h = np.where(i < full_blocks, mixed,
+                     np.where((i == full_blocks) & (str_lengths & 7 != 0), tail, h))
+    h ^= h >> r
+    h *= m
+    h ^= h >> r
+    # the 8 bytes ids are not hashed
+    return np.where(lengths == 8, raw_blocks[:, 0], h)
+
+
+def bucket(vids, parts):
+    """
+    group the vertex ids by the part ids
+    :param vids: list or numpy array of the vertex ids
+    :param parts: the part ids of the vertex ids, the result of part_ids
+    :return: map<part_id, list or numpy array of the vertex ids>
+    """
+    if np is None or not isinstance(parts, np.ndarray):
+        buckets = dict()
+        for vid, part in zip(vids, parts):
+            buckets.setdefault(part, []).append(vid)
+        return buckets
+    order = np.argsort(parts, kind='stable')
+    unique_parts, starts = np.unique(parts[order], return_index=True)
+    ends = list(starts[1:]) + [len(order)]
+    if isinstance(vids, np.ndarray):
+        return {int(part): vids[order[start:end]]
+                for part, start, end in zip(unique_parts, starts, ends)}
+    return {int(part): [vids[index] for index in order[start:end].tolist()]
+            for part, start, end in zip(unique_parts, starts, ends)}
+
+
+class Partitioner(object):
+    def __init__(self, meta_cache):
+        """
+        split the vertex ids by the parts and the leaders of the space
+        :param meta_cache: the MetaCache
+        """
+        self._meta_cache = meta_cache
+
+    def part_ids(self, space_name, vids):
+        """
+        get the part ids of the vertex ids
+        :param space_name: the space name
+        :param vids: list or numpy array of the vertex ids
+        :return: numpy array of int32 when numpy installed, else list
+        """
+        space_desc = self._meta_cache.get_space_desc(space_name)
+        is_int = space_desc.vid_type.type == PropertyType.INT64
+        return part_ids(vids, space_desc.partition_num, is_int)
+
+    def bucket(self, space_name, vids):
+        """
+        group the vertex ids by the parts
+        :param space_name: the space name
+        :param vids: list or numpy array of the vertex ids
+        :return: map<part_id, list or numpy array of the vertex ids>
+        """
+        return bucket(vids, self.part_ids(space_name, vids))
+
+    def group_by_leader(self, space_name, vids):
+        """
+        group the vertex ids by the leaders and the parts
+        :param space_name: the space name
+        :param vids: list or numpy array of the vertex ids
+        :return: map<(host, port), map<part_id, list or numpy array of the vertex ids>>
+        """
+        leaders = self._meta_cache.get_part_leaders(space_name)
+        parts_alloc = self._meta_cache.get_parts_alloc(space_name)
+        groups = dict()
+        for part, part_vids in self.bucket(space_name, vids).items():
+            address = leaders.get(part)
+            if address is None:
+                address = parts_alloc[part][0]
+            groups.setdefault(address, dict())[part] = part_vids
+        return groups
@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+"""
+The props fetch of the vertices and edges from storaged directly.
+
+The single vertex fetches of the concurrent callers are coalesced: the vertex
+ids of the same space, tag and props are collected for a short window or until
+the batch is full, then fetched by one getProps request of every leader, and
+the rows are given back to the callers by the vertex ids.
+"""
+
+import threading
+import time
+
+from concurrent.futures import Future
+
+from nebula2.common import ttypes as common_ttypes
+from nebula2.meta.ttypes import PropertyType
+from nebula2.storage import ttypes
+from nebula2.data.DataObject import DataSetWrapper
+from nebula2.mclient import to_bytes
+from nebula2.sclient.net import StorageClient
+from nebula2.sclient.Partitioner import Partitioner
+from nebula2.sclient.StorageScanClient import VID, SRC, TYPE, RANK, DST
+from nebula2.sclient.ValueConverter import vid_converter, vid_value
+
+
+class _Batch(object):
+    __slots__ = ('key', 'deadline', 'vids', 'futures')
+
+    def __init__(self, key, deadline):
+        # (space_name, tag_name, prop_names)
+        self.key = key
+        self.deadline = deadline
+        self.vids = list()
+        self.futures = list()
+
+
+class PropsFetcher(StorageClient):
+    def __init__(self,
+                 meta_cache,
+                 window=2,
+                 max_batch_size=1000,
+                 timeout=60000,
+                 concurrency=8,
+                 decode_type='utf-8'):
+        """
+        :param meta_cache: the MetaCache
+        :param window: unit ms, the time to wait for the other callers before
+        a coalesced fetch is sent
+        :param max_batch_size: the max vertex ids of one coalesced fetch, the
+        full batch is sent at once
+        :param timeout: unit ms, the timeout of one getProps request
+        :param concurrency: the max number of the fetches sent at the same time
+        :param decode_type: the decode type of the strings
+        """
+        StorageClient.__init__(self, meta_cache, timeout, concurrency)
+        self._window = window / 1000.0
+        self._max_batch_size = max_batch_size
+        self._decode_type = decode_type
+        self._partitioner = Partitioner(meta_cache)
+        # key -> _Batch, the batches waiting for the window
+        self._batches = dict()
+        self._cond = threading.Condition(self._lock)
+        self._flush_thread = threading.Thread(target=self._flush_loop, name='PropsFetcherFlusher')
+        self._flush_thread.daemon = True
+        self._flush_thread.start()
+
+    def fetch_vertex_async(self, space_name, tag_name, vid, prop_names=None):
+        """
+        fetch the props of one vertex, it's coalesced with the fetches of the
+        other callers of the same space, tag and props
+        :param space_name: the space name
+        :param tag_name: the tag name
+        :param vid: the vertex id
+        :param prop_names: the props to return, None means all props of the tag,
+        the vertex id is always returned as the first column
+        :return: Future of Record, the result is None if the vertex has no such tag
+        """
+        future = Future()
+        key = (space_name, tag_name, None if prop_names is None else tuple(prop_names))
+        with self._cond:
+            self._check_open()
+            batch = self._batches.get(key)
+            if batch is None:
+                batch = _Batch(key, time.time() + self._window)
+                self._batches[key] = batch
+                self._cond.notify()
+            batch.vids.append(vid)
+            batch.futures.append(future)
+            if len(batch.vids) >= self._max_batch_size:
+                del self._batches[key]
+                # submitted under the lock, so close can't shut the workers down before it
+                self._submit(batch)
+        return future
+
+    def fetch_vertex(self, space_name, tag_name, vid, prop_names=None):
+        """
+        fetch the props of one vertex and wait for the result, see fetch_vertex_async
+        :return: Record, None if the vertex has no such tag
+        """
+        return self.fetch_vertex_async(space_name, tag_name, vid, prop_names).result()
+
+    def fetch_vertices(self, space_name, tag_name, vids, prop_names=None, dedup=False, limit=None):
+        """
+        fetch the props of the vertices by one request of every leader
+        :param space_name: the space name
+        :param tag_name: the tag name
+        :param vids: the vertex ids
+        :param prop_names: the props to return, None means all props of the tag,
+        the vertex id is always returned as the first column
+        :param dedup: dedup the rows
+        :param limit: the max rows of one request, None means no limit
+        :return: map<vid, Record>, the vid is bytes or int, the vertices without
+        the tag are not in it
+        """
+        space_id = self._meta_cache.get_space_id(space_name)
+        tag = self._meta_cache.get_tag(space_name, tag_name)
+        if prop_names is None:
+            prop_names = [col.name for col in tag.schema.columns]
+        vertex_props = [ttypes.VertexProp(tag=tag.tag_id, props=[VID] + [to_bytes(name) for name in prop_names])]
+        vids = self._normalize(space_name, vids)
+
+        def make_req(parts):
+            return ttypes.GetPropRequest(
+                space_id=space_id,
+                column_names=[VID],
+                parts={part_id: [common_ttypes.Row(values=[vid_value(vid)]) for vid in part_vids]
+                       for part_id, part_vids in parts.items()},
+                vertex_props=vertex_props,
+                dedup=dedup,
+                limit=limit)
+
+        records = dict()
+        for record in self._get_props(space_name, vids, make_req):
+            records[record.get_value(0).get_value().value] = record
+        return records
+
+    def fetch_edges(self, space_name, edge_name, keys, prop_names=None, dedup=False, limit=None):
+        """
+        fetch the props of the edges by one request of every leader
+        :param space_name: the space name
+        :param edge_name: the edge name
+        :param keys: the list of (src, dst) or (src, dst, rank)
+        :param prop_names: the props to return, None means all props of the edge,
+        the src, type, rank and dst are always returned as the first four columns
+        :param dedup: dedup the rows
+        :param limit: the max rows of one request, None means no limit
+        :return: map<(src, dst, rank), Record>, the ids are bytes or int, the
+        edges not found are not in it
+        """
+        space_id = self._meta_cache.get_space_id(space_name)
+        edge = self._meta_cache.get_edge(space_name, edge_name)
+        if prop_names is None:
+            prop_names = [col.name for col in edge.schema.columns]
+        edge_props = [ttypes.EdgeProp(type=edge.edge_type,
+                                      props=[SRC, TYPE, RANK, DST] + [to_bytes(name) for name in prop_names])]
+        srcs = self._normalize(space_name, [key[0] for key in keys])
+        dsts = self._normalize(space_name, [key[1] for key in keys])
+        ranks = [key[2] if len(key) > 2 else 0 for key in keys]
+        # the edges are stored in the parts of the src
+        edges = {src: list() for src in srcs}
+        for src, dst, rank in zip(srcs, dsts, ranks):
+            edges[src].append((dst, rank))
+
+        def make_req(parts):
+            rows = dict()
+            for part_id, part_srcs in parts.items():
+                rows[part_id] = [common_ttypes.Row(values=[vid_value(src),
+                                                           common_ttypes.Value(iVal=edge.edge_type),
+                                                           common_ttypes.Value(iVal=rank),
+                                                           vid_value(dst)])
+                                 for src in part_srcs for dst, rank in edges[src]]
+            return ttypes.GetPropRequest(space_id=space_id,
+                                         column_names=[SRC, TYPE, RANK, DST],
+                                         parts=rows,
+                                         edge_props=edge_props,
+                                         dedup=dedup,
+                                         limit=limit)
+
+        records = dict()
+        for record in self._get_props(space_name, list(edges.keys()), make_req):
+            key = (record.get_value(0).get_value().value,
+                   record.get_value(3).get_value().value,
+                   record.get_value(2).get_value().value)
+            records[key] = record
+        return records
+
+    def _normalize(self, space_name, vids):
+        # the ids in the responses are bytes or int
+        convert = vid_converter(self._meta_cache.get_space_desc(space_name).vid_type.type == PropertyType.INT64)
+        return [convert(vid) for vid in vids]
+
+    def _get_props(self, space_name, vids, make_req):
+        parts = self._partitioner.bucket(space_name, vids)
+        result = self._router.execute(space_name, 'get_props', parts, make_req)
+        if not result.is_succeeded():
+            raise RuntimeError('Get props of space {} failed, {}'.format(space_name, result.error_msg()))
+        for resp in result.responses:
+            if resp.props is None:
+                continue
+            for record in DataSetWrapper(resp.props, self._decode_type):
+                yield record
+
+    def _shutdown(self):
+        # the waiting fetches are sent before the workers stop
+        with self._cond:
+            self._cond.notify()
+        self._flush_thread.join()
+        StorageClient._shutdown(self)
+
+    def _submit(self, batch):
+        try:
+            self._executor.submit(self._flush, batch)
+        except Exception as x:
+            # the futures of the batch are never resolved else
+            for future in batch.futures:
+                future.set_exception(x)
+
+    def _flush(self, batch):
+        space_name, tag_name, prop_names = batch.key
+        try:
+            vids = self._normalize(space_name, batch.vids)
+            records = self.fetch_vertices(space_name, tag_name, list(set(vids)), prop_names)
+        except Exception as x:
+            for future in batch.futures:
+                future.set_exception(x)
+            return
+        for vid, future in zip(vids, batch.futures):
+            future.set_result(records.get(vid))
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while not self._close and len(self._batches) == 0:
+                    self._cond.wait()
+                now = time.time()
+                if self._close:
+                    due = list(self._batches.values())
+                else:
+                    due = [batch for batch in self._batches.values() if batch.deadline <= now]
+                    if len(due) == 0:
+                        self._cond.wait(min(batch.deadline for batch in self._batches.values()) - now)
+                        continue
+                for batch in due:
+                    del self._batches[batch.key]
+                close = self._close
+            for batch in due:
+                self._submit(batch)
+            if close:
+                return
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+"""
+The scan of the vertices and edges from storaged directly.
+
+Every part is scanned by one task of the worker pool, the task follows the
+cursor of the part until it's finished and puts the pages into a bounded
+queue, so the workers stop fetching when the rows are not consumed.
+"""
+
+import threading
+
+from queue import Queue, Full
+
+from nebula2.storage import ttypes
+from nebula2.data.DataObject import DataSetWrapper
+from nebula2.mclient import to_bytes
+from nebula2.sclient.net import StorageClient
+
+# the prop names of the vertex id and the edge key
+VID = b'_vid'
+SRC = b'_src'
+TYPE = b'_type'
+RANK = b'_rank'
+DST = b'_dst'
+
+
+class _PartDone(object):
+    __slots__ = ('part_id', 'error')
+
+    def __init__(self, part_id, error=None):
+        self.part_id = part_id
+        self.error = error
+
+
+class StorageScanClient(StorageClient):
+    # the rows of one scan request
+    DEFAULT_LIMIT = 1000
+
+    def __init__(self, meta_cache, timeout=60000, concurrency=8, queue_size=64, decode_type='utf-8'):
+        """
+        :param meta_cache: the MetaCache
+        :param timeout: unit ms, the timeout of one scan request
+        :param concurrency: the max number of the parts scanned at the same time
+        :param queue_size: the max number of the pages which are fetched but not consumed
+        :param decode_type: the decode type of the strings
+        """
+        StorageClient.__init__(self, meta_cache, timeout, concurrency)
+        self._queue_size = queue_size
+        self._decode_type = decode_type
+
+    def scan_vertex(self,
+                    space_name,
+                    tag_name,
+                    prop_names=None,
+                    limit=DEFAULT_LIMIT,
+                    start_time=None,
+                    end_time=None,
+                    where=None,
+                    only_latest_version=False,
+                    enable_read_from_follower=True,
+                    parts=None):
+        """
+        scan the vertices of the tag, the parts are scanned in parallel
+        :param space_name: the space name
+        :param tag_name: the tag name
+        :param prop_names: the props to return, None means all props of the tag,
+        the vertex id is always returned as the first column
+        :param limit: the rows of one scan request
+        :param start_time: the start time of the version, unit us
+        :param end_time: the end time of the version, unit us
+        :param where: the encoded filter expression
+        :param only_latest_version: only return the latest version
+        :param enable_read_from_follower: if read from the follower
+        :param parts: the part ids to scan, None means all parts
+        :return: the generator of Record, the order between the parts is not kept
+        """
+        space_id = self._meta_cache.get_space_id(space_name)
+        tag = self._meta_cache.get_tag(space_name, tag_name)
+        if prop_names is None:
+            prop_names = [col.name for col in tag.schema.columns]
+        return_columns = ttypes.VertexProp(
+            tag=tag.tag_id, props=[VID] + [to_bytes(name) for name in prop_names])
+
+        def make_req(parts):
+            (part_id, cursor), = parts.items()
+            return ttypes.ScanVertexRequest(space_id=space_id,
+                                            part_id=part_id,
+                                            cursor=cursor,
+                                            return_columns=return_columns,
+                                            no_columns=False,
+                                            limit=limit,
+                                            start_time=start_time,
+                                            end_time=end_time,
+                                            filter=where,
+                                            only_latest_version=only_latest_version,
+                                            enable_read_from_follower=enable_read_from_follower)
+        return self._scan(space_name, parts, 'scan_vertex', 'vertex_data', make_req)
+
+    def scan_edge(self,
+                  space_name,
+                  edge_name,
+                  prop_names=None,
+                  limit=DEFAULT_LIMIT,
+                  start_time=None,
+                  end_time=None,
+                  where=None,
+                  only_latest_version=False,
+                  enable_read_from_follower=True,
+                  parts=None):
+        """
+        scan the edges, the parts are scanned in parallel
+        :param space_name: the space name
+        :param edge_name: the edge name
+        :param prop_names: the props to return, None means all props of the edge,
+        the src, type, rank and dst are always returned as the first four columns
+        :param limit: the rows of one scan request
+        :param start_time: the start time of the version, unit us
+        :param end_time: the end time of the version, unit us
+        :param where: the encoded filter expression
+        :param only_latest_version: only return the latest version
+        :param enable_read_from_follower: if read from the follower
+        :param parts: the part ids to scan, None means all parts
+        :return: the generator of Record, the order between the parts is not kept
+        """
+        space_id = self._meta_cache.get_space_id(space_name)
+        edge = self._meta_cache.get_edge(space_name, edge_name)
+        if prop_names is None:
+            prop_names = [col.name for col in edge.schema.columns]
+        return_columns = ttypes.EdgeProp(
+            type=edge.edge_type,
+            props=[SRC, TYPE, RANK, DST] + [to_bytes(name) for name in prop_names])
+
+        def make_req(parts):
+            (part_id, cursor), = parts.items()
+            return ttypes.ScanEdgeRequest(space_id=space_id,
+                                          part_id=part_id,
+                                          cursor=cursor,
+                                          return_columns=return_columns,
+                                          no_columns=False,
+                                          limit=limit,
+                                          start_time=start_time,
+                                          end_time=end_time,
+                                          filter=where,
+                                          only_latest_version=only_latest_version,
+                                          enable_read_from_follower=enable_read_from_follower)
+        return self._scan(space_name, parts, 'scan_edge', 'edge_data', make_req)
+
+    def _scan(self, space_name, parts, method, data_field, make_req):
+        self._check_open()
+        parts_alloc = self._meta_cache.get_parts_alloc(space_name)
+        if parts is None:
+            parts = sorted(parts_alloc.keys())
+        for part_id in parts:
+            if part_id not in parts_alloc:
+                raise RuntimeError('Part {} not found in space {}'.format(part_id, space_name))
+        return self._iter_records(space_name, parts, method, data_field, make_req)
+
+    def _iter_records(self, space_name, parts, method, data_field, make_req):
+        pages = Queue(self._queue_size)
+        stop = threading.Event()
+        futures = [self._executor.submit(self._scan_part,
+                                         space_name,
+                                         part_id,
+                                         method,
+                                         data_field,
+                                         make_req,
+                                         pages,
+                                         stop) for part_id in parts]
+        try:
+            done = 0
+            while done < len(futures):
+                page = pages.get()
+                if isinstance(page, _PartDone):
+                    if page.error is not None:
+                        raise page.error
+                    done = done + 1
+                    continue
+                for record in DataSetWrapper(page, self._decode_type):
+                    yield record
+        finally:
+            # the rows are not read to the end or failed, stop the other parts
+            stop.set()
+            for future in futures:
+                future.cancel()
+
+    def _scan_part(self, space_name, part_id, method, data_field, make_req, pages, stop):
+        try:
+            cursor = None
+            while not stop.is_set():
+                result = self._router.execute(space_name, method, {part_id: cursor}, make_req)
+                if not result.is_succeeded():
+                    raise RuntimeError('Scan space {} failed, {}'.format(space_name, result.error_msg()))
+                resp = result.responses[-1]
+                data = getattr(resp, data_field)
+                if data is not None and len(data.rows) > 0:
+                    if not self._put(pages, data, stop):
+                        return
+                if not resp.has_next:
+                    break
+                cursor = resp.next_cursor
+            self._put(pages, _PartDone(part_id), stop)
+        except Exception as x:
+            self._put(pages, _PartDone(part_id, x), stop)
+
+    @staticmethod
+    def _put(pages, page, stop):
+        # the consumer may stop reading, so don't block forever
+        while not stop.is_set():
+            try:
+                pages.put(page, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+"""
+The multi hop expansion of the vertices on storaged directly.
+
+Every hop splits the frontier by the parts and sends one getNeighbors request
+of every part by the worker pool. Only the dst ids are read from the edge
+columns of the responses, the new frontier is the dst ids not visited by the
+former hops, the int ids are kept in the numpy arrays when numpy installed.
+"""
+
+from nebula2.common import ttypes as common_ttypes
+from nebula2.meta.ttypes import PropertyType
+from nebula2.storage import ttypes
+from nebula2.storage.ttypes import EdgeDirection
+from nebula2.sclient.net import StorageClient
+from nebula2.sclient.Partitioner import bucket, part_ids
+from nebula2.sclient.StorageScanClient import VID, DST
+from nebula2.sclient.ValueConverter import vid_converter, vid_value
+
+np = None
+try:
+    import numpy as np
+except ImportError:
+    pass
+
+# the prefix of the edge columns of GetNeighborsResponse.vertices
+_EDGE_PREFIX = b'_edge:'
+
+
+def decode_neighbors(data_set, srcs, dsts):
+    """
+    read the src and dst ids of the edges in the vertices of GetNeighborsResponse,
+    the dst must be the first prop of the edge columns
+    :param data_set: the DataSet of GetNeighborsResponse.vertices
+    :param srcs: the list to append the src ids
+    :param dsts: the list to append the dst ids
+    :return: void
+    """
+    if data_set is None:
+        return
+    columns = [index for index, name in enumerate(data_set.column_names) if name.startswith(_EDGE_PREFIX)]
+    lval = common_ttypes.Value.LVAL
+    for row in data_set.rows:
+        values = row.values
+        src = values[0].value
+        for index in columns:
+            cell = values[index]
+            # no edge is NULL
+            if cell.field != lval:
+                continue
+            edges = cell.value.values
+            dsts.extend([edge.value.values[0].value for edge in edges])
+            srcs.extend([src] * len(edges))
+
+
+class TraversalClient(StorageClient):
+    def __init__(self, meta_cache, timeout=60000, concurrency=8):
+        """
+        :param meta_cache: the MetaCache
+        :param timeout: unit ms, the timeout of one getNeighbors request
+        :param concurrency: the max number of the parts requested at the same time
+        """
+        StorageClient.__init__(self, meta_cache, timeout, concurrency)
+
+    def get_neighbors(self,
+                      space_name,
+                      vids,
+                      edge_names,
+                      direction=EdgeDirection.OUT_EDGE,
+                      dedup=False,
+                      limit=None,
+                      where=None):
+        """
+        get the edges of the vertices
+        :param space_name: the space name
+        :param vids: list or numpy array of the vertex ids
+        :param edge_names: the edge names
+        :param direction: EdgeDirection, the src is always the given vertex
+        :param dedup: dedup the edges of one vertex
+        :param limit: the max edges of one vertex, None means no limit
+        :param where: the encoded filter expression
+        :return: (srcs, dsts), numpy arrays of int64 for the int ids when numpy
+        installed, else lists
+        """
+        is_int = self._is_int(space_name)
+        spec = self._make_spec(space_name, edge_names, direction, dedup, limit, where)
+        srcs, dsts = self._expand(space_name, vids, spec, is_int)
+        if is_int and np is not None:
+            return np.array(srcs, dtype=np.int64), np.array(dsts, dtype=np.int64)
+        return srcs, dsts
+
+    def k_hop(self,
+              space_name,
+              vids,
+              edge_names,
+              steps,
+              direction=EdgeDirection.OUT_EDGE,
+              dedup=False,
+              limit=None,
+              where=None):
+        """
+        the breadth first expansion of the vertices, the vertices of one hop
+        are the neighbors of the former hop which are not visited
+        :param space_name: the space name
+        :param vids: list or numpy array of the start vertex ids
+        :param edge_names: the edge names
+        :param steps: the number of hops
+        :param direction: EdgeDirection
+        :param dedup: dedup the edges of one vertex
+        :param limit: the max edges of one vertex in every hop, None means no limit
+        :param where: the encoded filter expression
+        :return: the list of the vertex ids of every hop, sorted numpy arrays of
+        int64 for the int ids when numpy installed, else sorted lists
+        """
+        is_int = self._is_int(space_name)
+        spec = self._make_spec(space_name, edge_names, direction, dedup, limit, where)
+        use_numpy = is_int and np is not None
+        if use_numpy:
+            frontier = np.unique(np.asarray(vids, dtype=np.int64))
+            visited = frontier
+        else:
+            convert = vid_converter(is_int)
+            frontier = sorted(set(convert(vid) for vid in vids))
+            visited = set(frontier)
+
+        frontiers = list()
+        for step in range(0, steps):
+            dsts = self._expand(space_name, frontier, spec, is_int)[1]
+            if use_numpy:
+                dsts = np.unique(np.array(dsts, dtype=np.int64))
+                frontier = dsts[~np.isin(dsts, visited, assume_unique=True)]
+                visited = np.union1d(visited, frontier)
+            else:
+                new_vids = set(dsts)
+                new_vids.difference_update(visited)
+                visited.update(new_vids)
+                frontier = sorted(new_vids)
+            frontiers.append(frontier)
+        return frontiers
+
+    def _is_int(self, space_name):
+        return self._meta_cache.get_space_desc(space_name).vid_type.type == PropertyType.INT64
+
+    def _make_spec(self, space_name, edge_names, direction, dedup, limit, where):
+        edge_types = list()
+        for name in edge_names:
+            edge_type = self._meta_cache.get_edge_type(space_name, name)
+            if direction in (EdgeDirection.OUT_EDGE, EdgeDirection.BOTH):
+                edge_types.append(edge_type)
+            if direction in (EdgeDirection.IN_EDGE, EdgeDirection.BOTH):
+                edge_types.append(-edge_type)
+        # only the dst is returned, no vertex props and stats
+        return ttypes.TraverseSpec(edge_types=edge_types,
+                                   edge_direction=direction,
+                                   dedup=dedup,
+                                   vertex_props=[],
+                                   edge_props=[ttypes.EdgeProp(type=edge_type, props=[DST])
+                                               for edge_type in edge_types],
+                                   limit=limit,
+                                   filter=where)
+
+    def _expand(self, space_name, vids, spec, is_int):
+        self._check_open()
+        srcs = list()
+        dsts = list()
+        if len(vids) == 0:
+            return srcs, dsts
+        if not is_int:
+            convert = vid_converter(is_int)
+            vids = [convert(vid) for vid in vids]
+        space_desc = self._meta_cache.get_space_desc(space_name)
+        space_id = self._meta_cache.get_space_id(space_name)
+        parts = bucket(vids, part_ids(vids, space_desc.partition_num, is_int))
+
+        def make_req(sub_parts):
+            return ttypes.GetNeighborsRequest(
+                space_id=space_id,
+                column_names=[VID],
+                parts={part_id: [common_ttypes.Row(values=[vid_value(vid)]) for vid in part_vids]
+                       for part_id, part_vids in sub_parts.items()},
+                traverse_spec=spec)
+
+        futures = [self._executor.submit(self._router.execute, space_name, 'get_neighbors',
+                                         {part_id: part_vids}, make_req)
+                   for part_id, part_vids in parts.items()]
+        for future in futures:
+            result = future.result()
+            if not result.is_succeeded():
+                raise RuntimeError('Get neighbors of space {} failed, {}'.format(space_name, result.error_msg()))
+            for resp in result.responses:
+                decode_neighbors(resp.vertices, srcs, dsts)
+        return srcs, dsts
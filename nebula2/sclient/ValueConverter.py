@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+"""
+The conversion of the python values to ttypes.Value for the storage
+requests, by the prop types of the schema and the vid type of the space.
+"""
+
+import datetime
+import re
+
+from nebula2.common import ttypes as common_ttypes
+from nebula2.meta.ttypes import PropertyType
+
+_NULL = common_ttypes.Value(nVal=common_ttypes.NullType.__NULL__)
+
+
+def _is_null(obj):
+    # the missing value of pandas is NaN
+    return obj is None or (isinstance(obj, float) and obj != obj)
+
+
+def _to_bool(obj):
+    if isinstance(obj, str):
+        return obj.strip().lower() in ('true', '1')
+    return bool(obj)
+
+
+def _to_string(obj):
+    if isinstance(obj, bytes):
+        return obj
+    return str(obj).encode('utf-8')
+
+
+# the ISO formats of the CSV fields, datetime.fromisoformat needs python 3.7
+_DATE_PATTERN = r'(\d{4})-(\d{2})-(\d{2})'
+_TIME_PATTERN = r'(\d{2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6}))?)?'
+_DATE_RE = re.compile(_DATE_PATTERN + '$')
+_TIME_RE = re.compile(_TIME_PATTERN + '$')
+_DATETIME_RE = re.compile(_DATE_PATTERN + '[T ]' + _TIME_PATTERN + '$')
+
+
+def _parse(regex, text):
+    """
+    parse the ISO date or time
+    :return: the list of the int fields, the missing ones are 0
+    """
+    match = regex.match(text.strip())
+    if match is None:
+        raise ValueError('Invalid isoformat string: {!r}'.format(text))
+    fields = list(match.groups())
+    # the fraction of second is the microseconds
+    if regex is not _DATE_RE and fields[-1] is not None:
+        fields[-1] = fields[-1].ljust(6, '0')
+    return [int(field) if field is not None else 0 for field in fields]
+
+
+def _to_date(obj):
+    if isinstance(obj, str):
+        return common_ttypes.Date(*_parse(_DATE_RE, obj))
+    if isinstance(obj, datetime.datetime):
+        obj = obj.date()
+    return common_ttypes.Date(obj.year, obj.month, obj.day)
+
+
+def _to_time(obj):
+    if isinstance(obj, str):
+        return common_ttypes.Time(*_parse(_TIME_RE, obj))
+    return common_ttypes.Time(obj.hour, obj.minute, obj.second, obj.microsecond)
+
+
+def _to_datetime(obj):
+    if isinstance(obj, str):
+        return common_ttypes.DateTime(*_parse(_DATETIME_RE, obj))
+    return common_ttypes.DateTime(obj.year, obj.month, obj.day,
+                                  obj.hour, obj.minute, obj.second, obj.microsecond)
+
+
+# PropertyType -> (the field of Value, the python to thrift conversion)
+_CONVERTERS = {
+    PropertyType.BOOL: (common_ttypes.Value.BVAL, _to_bool),
+    PropertyType.INT8: (common_ttypes.Value.IVAL, int),
+    PropertyType.INT16: (common_ttypes.Value.IVAL, int),
+    PropertyType.INT32: (common_ttypes.Value.IVAL, int),
+    PropertyType.INT64: (common_ttypes.Value.IVAL, int),
+    PropertyType.TIMESTAMP: (common_ttypes.Value.IVAL, int),
+    PropertyType.FLOAT: (common_ttypes.Value.FVAL, float),
+    PropertyType.DOUBLE: (common_ttypes.Value.FVAL, float),
+    PropertyType.STRING: (common_ttypes.Value.SVAL, _to_string),
+    PropertyType.FIXED_STRING: (common_ttypes.Value.SVAL, _to_string),
+    PropertyType.DATE: (common_ttypes.Value.DVAL, _to_date),
+    PropertyType.TIME: (common_ttypes.Value.TVAL, _to_time),
+    PropertyType.DATETIME: (common_ttypes.Value.DTVAL, _to_datetime),
+}
+
+
+def make_converter(prop_type):
+    """
+    make the conversion from the python value to ttypes.Value by the prop type,
+    None and NaN are converted to NULL, and the str is parsed, e.g. the CSV field
+    :param prop_type: the PropertyType
+    :return: function(python value) -> ttypes.Value
+    """
+    field, convert = _CONVERTERS[prop_type]
+    is_string = prop_type in (PropertyType.STRING, PropertyType.FIXED_STRING)
+
+    def converter(obj):
+        if isinstance(obj, common_ttypes.Value):
+            return obj
+        if _is_null(obj) or (obj == '' and not is_string):
+            return _NULL
+        value = common_ttypes.Value()
+        value.field = field
+        value.value = convert(obj)
+        return value
+    return converter
+
+
+def vid_converter(is_int):
+    """
+    make the conversion of the vertex ids given by the users
+    :param is_int: if the vid type of the space is INT64
+    :return: function(vid) -> int or bytes, the int vid of the string vid
+    space is taken as its decimal string
+    """
+    if is_int:
+        return int
+    return _to_string
+
+
+def vid_value(vid):
+    """
+    make ttypes.Value of the vertex id
+    :param vid: bytes of the string vid, or int
+    :return: ttypes.Value
+    """
+    value = common_ttypes.Value()
+    if isinstance(vid, bytes):
+        value.field = common_ttypes.Value.SVAL
+    else:
+        value.field = common_ttypes.Value.IVAL
+        vid = int(vid)
+    value.value = vid
+    return value
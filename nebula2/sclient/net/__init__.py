@@ -0,0 +1,333 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+
+import logging
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from thrift.transport import TSocket, TTransport
+from thrift.transport.TTransport import TTransportException
+from thrift.protocol import TBinaryProtocol
+
+from nebula2.storage import (
+    ttypes,
+    GraphStorageService,
+    GeneralStorageService
+)
+
+from nebula2.Exception import IOErrorException
+
+
+class GraphStorageConnection(object):
+    SERVICE = GraphStorageService
+
+    def __init__(self, address, timeout):
+        """
+        the connection to one storaged, it is not thread safe
+        :param address: the storaged address (host, port)
+        :param timeout: unit ms, 0 means no timeout
+        """
+        self._address = address
+        self._timeout = timeout
+        self._transport = None
+        self._connection = None
+
+    def open(self):
+        s = TSocket.TSocket(self._address[0], self._address[1])
+        if self._timeout > 0:
+            s.setTimeout(self._timeout)
+        transport = TTransport.TRecvBufferTransport(s)
+        protocol = TBinaryProtocol.TBinaryProtocolAccelerated(transport)
+        transport.open()
+        self._transport = transport
+        self._connection = self.SERVICE.Client(protocol)
+
+    def get_address(self):
+        return self._address
+
+    def is_open(self):
+        return self._connection is not None
+
+    def scan_vertex(self, req):
+        return self._call('scanVertex', req)
+
+    def scan_edge(self, req):
+        return self._call('scanEdge', req)
+
+    def get_neighbors(self, req):
+        return self._call('getNeighbors', req)
+
+    def get_props(self, req):
+        return self._call('getProps', req)
+
+    def lookup_index(self, req):
+        return self._call('lookupIndex', req)
+
+    def add_vertices(self, req):
+        return self._call('addVertices', req)
+
+    def add_edges(self, req):
+        return self._call('addEdges', req)
+
+    def close(self):
+        if self._transport is not None:
+            try:
+                self._transport.close()
+            except Exception:
+                pass
+        self._transport = None
+        self._connection = None
+
+    def _call(self, method, req):
+        try:
+            if self._connection is None:
+                self.open()
+            return getattr(self._connection, method)(req)
+        except TTransportException as te:
+            # the reply of the broken connection can't be read any more
+            self.close()
+            raise IOErrorException(IOErrorException.E_CONNECT_BROKEN, te.message)
+
+
+class GeneralStorageConnection(GraphStorageConnection):
+    """
+    the connection to the kv service of one storaged, it is not thread safe
+    """
+    SERVICE = GeneralStorageService
+
+    def get(self, req):
+        return self._call('get', req)
+
+    def put(self, req):
+        return self._call('put', req)
+
+    def remove(self, req):
+        return self._call('remove', req)
+
+
+class RouteResult(object):
+    def __init__(self):
+        # the responses which have the succeeded parts
+        self.responses = list()
+        # part_id -> ErrorCode, the parts failed after retried
+        self.failed_parts = dict()
+
+    def is_succeeded(self):
+        return len(self.failed_parts) == 0
+
+    def error_msg(self):
+        return ', '.join('part {}: {}'.format(
+            part_id, ttypes.ErrorCode._VALUES_TO_NAMES.get(code, code))
+            for part_id, code in sorted(self.failed_parts.items()))
+
+
+class StorageRouter(object):
+    # the times to retry the failed parts when the leader changed or the connection broken
+    MAX_RETRY = 3
+
+    def __init__(self,
+                 meta_cache,
+                 timeout=60000,
+                 concurrency=8,
+                 connection_class=GraphStorageConnection,
+                 port_offset=0):
+        """
+        send the storage requests to the leaders of the parts
+        :param meta_cache: the MetaCache which has the leaders of the parts
+        :param timeout: unit ms, the timeout of one request
+        :param concurrency: the max number of the hosts requested at the same time
+        :param connection_class: GraphStorageConnection or GeneralStorageConnection
+        :param port_offset: the port of the service is the port of storaged plus it
+        """
+        self._meta_cache = meta_cache
+        self._timeout = timeout
+        self._connection_class = connection_class
+        self._port_offset = port_offset
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        # every thread has its own connections
+        self._local = threading.local()
+        self._connections = list()
+        self._lock = threading.Lock()
+        self._close = False
+
+    def get_meta_cache(self):
+        return self._meta_cache
+
+    def group_by_leader(self, space_name, parts):
+        """
+        group the parts by their leaders
+        :param space_name: the space name
+        :param parts: the part ids
+        :return: map<(host, port), list<part_id>>
+        """
+        leaders = self._meta_cache.get_part_leaders(space_name)
+        parts_alloc = self._meta_cache.get_parts_alloc(space_name)
+        groups = dict()
+        for part_id in parts:
+            address = leaders.get(part_id)
+            if address is None:
+                hosts = parts_alloc.get(part_id)
+                if not hosts:
+                    raise RuntimeError('Part {} not found in space {}'.format(part_id, space_name))
+                address = hosts[0]
+            groups.setdefault(address, []).append(part_id)
+        return groups
+
+    def execute(self, space_name, method, parts, make_req):
+        """
+        send one request to the leader of every group of the parts, the parts
+        failed because of the leader changed are retried on the new leaders
+        :param space_name: the space name
+        :param method: the method name of GraphStorageConnection
+        :param parts: map<part_id, the data of the part>
+        :param make_req: build the request of one host from map<part_id, the data of the part>
+        :return: RouteResult, the failed parts of the responses are in its failed_parts
+        """
+        if self._close:
+            raise RuntimeError('The router is closed')
+        result = RouteResult()
+        pending = parts
+        retry = 0
+        while len(pending) > 0:
+            calls = [(address, {part_id: pending[part_id] for part_id in part_ids})
+                     for address, part_ids in self.group_by_leader(space_name, pending.keys()).items()]
+            if len(calls) == 1:
+                outcomes = [self._call(calls[0][0], method, make_req, calls[0][1])]
+            else:
+                futures = [self._executor.submit(self._call, address, method, make_req, sub_parts)
+                           for address, sub_parts in calls]
+                outcomes = [future.result() for future in futures]
+
+            failed = dict()
+            for (address, sub_parts), (resp, error) in zip(calls, outcomes):
+                if error is not None:
+                    logging.warning('Request storaged {} failed: {}'.format(address, error))
+                    for part_id in sub_parts:
+                        # try the other replica
+                        self._meta_cache.update_part_leader(
+                            space_name, part_id, self._next_host(space_name, part_id, address))
+                        failed[part_id] = ttypes.ErrorCode.E_RPC_FAILURE
+                    continue
+                if len(resp.result.failed_parts) < len(sub_parts):
+                    result.responses.append(resp)
+                for part in resp.result.failed_parts:
+                    failed[part.part_id] = part.code
+                    if part.code != ttypes.ErrorCode.E_LEADER_CHANGED:
+                        continue
+                    if part.leader is not None and part.leader.port != 0:
+                        leader = (part.leader.host, part.leader.port)
+                    else:
+                        leader = self._next_host(space_name, part.part_id, address)
+                    logging.info('The leader of part {} changed to {}'.format(part.part_id, leader))
+                    self._meta_cache.update_part_leader(space_name, part.part_id, leader)
+
+            pending = dict()
+            for part_id, code in failed.items():
+                if retry < self.MAX_RETRY and part_id in parts and \
+                        code in (ttypes.ErrorCode.E_LEADER_CHANGED, ttypes.ErrorCode.E_RPC_FAILURE):
+                    pending[part_id] = parts[part_id]
+                else:
+                    result.failed_parts[part_id] = code
+            retry = retry + 1
+        return result
+
+    def close(self):
+        """
+        close all connections
+        :return: void
+        """
+        with self._lock:
+            if self._close:
+                return
+            self._close = True
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+
+    def _call(self, address, method, make_req, parts):
+        try:
+            return getattr(self._get_connection(address), method)(make_req(parts)), None
+        except IOErrorException as x:
+            return None, x
+
+    def _next_host(self, space_name, part_id, address):
+        hosts = self._meta_cache.get_parts_alloc(space_name).get(part_id, [address])
+        if address not in hosts:
+            return hosts[0]
+        return hosts[(hosts.index(address) + 1) % len(hosts)]
+
+    def _get_connection(self, address):
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = dict()
+            self._local.connections = connections
+        connection = connections.get(address)
+        if connection is None:
+            connection = self._connection_class((address[0], address[1] + self._port_offset), self._timeout)
+            connections[address] = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+
+class StorageClient(object):
+    """
+    the base of the storage clients, the workers run the tasks of the client,
+    e.g. one part or one batch, and the router sends the request of a task to
+    the leaders of its parts. The router fans a task out to more than one
+    leader by its own pool, which starts no thread while every task has one
+    leader. A worker may wait for the requests in the router's pool, but they
+    never wait for the workers, so the two pools can't block each other
+    """
+    def __init__(self,
+                 meta_cache,
+                 timeout=60000,
+                 concurrency=8,
+                 connection_class=GraphStorageConnection,
+                 port_offset=0):
+        """
+        :param meta_cache: the MetaCache
+        :param timeout: unit ms, the timeout of one request
+        :param concurrency: the max number of the tasks running at the same time
+        :param connection_class: GraphStorageConnection or GeneralStorageConnection
+        :param port_offset: the port of the service is the port of storaged plus it
+        """
+        self._meta_cache = meta_cache
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._router = StorageRouter(meta_cache, timeout, concurrency, connection_class, port_offset)
+        self._lock = threading.Lock()
+        self._close = False
+
+    def close(self):
+        """
+        stop the workers and close all connections
+        :return: void
+        """
+        with self._lock:
+            if self._close:
+                return
+            self._close = True
+        self._shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _check_open(self):
+        if self._close:
+            raise RuntimeError('The client is closed')
+
+    def _shutdown(self):
+        self._executor.shutdown(wait=True)
+        self._router.close()
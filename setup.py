@@ -6,7 +6,13 @@
 # attached with Common Clause Condition 1.0, found in the LICENSES directory.
 
 
-from setuptools import setup, find_packages, sic
+from setuptools import setup, find_packages, sic, Extension
+
+# The accelerated protocol is optional, the generated code falls back to
+# the pure python implementation when it can't be built.
+fastproto = Extension('thrift.protocol.fastproto',
+                      sources=['thrift/protocol/fastproto.c'],
+                      optional=True)
 
 setup(
     name='nebula2-python',
@@ -21,6 +27,7 @@ setup(
                       'six',
                       'futures; python_version == "2.7"'],
     packages=find_packages(),
+    ext_modules=[fastproto],
     platforms=["2.7, 3.5, 3.7"],
     package_dir={'nebula2': 'nebula2',
                  'thirft': 'thirft'},
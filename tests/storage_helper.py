@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+"""
+The common setup of the tests of the storage clients, they need metad and
+storaged besides graphd. The schema is synced to graphd and storaged by
+their heartbeats, so the statements using a new schema are retried until
+they succeed instead of sleeping for a fixed time.
+"""
+
+import os
+import socket
+import time
+
+from contextlib import contextmanager
+from unittest import skipIf
+
+from nebula2.gclient.net import ConnectionPool
+
+from nebula2.Config import Config
+
+GRAPH_ADDRESS = ('127.0.0.1', 3699)
+META_ADDRESS = ('127.0.0.1', 45500)
+
+# unit s, the max time to wait for the schema synced
+SYNC_TIMEOUT = 60
+
+
+def reachable(address):
+    try:
+        socket.create_connection(address, timeout=1).close()
+        return True
+    except socket.error:
+        return False
+
+
+# the tests of the storage clients are skipped if metad is not reachable,
+# or NEBULA_SKIP_STORAGE_TEST is set
+storage_test = skipIf(os.environ.get('NEBULA_SKIP_STORAGE_TEST') or not reachable(META_ADDRESS),
+                      'metad and storaged are not available')
+
+
+def wait_until(check, timeout=SYNC_TIMEOUT, interval=0.5):
+    """
+    call check until it returns True
+    :return: False if it's timeout
+    """
+    deadline = time.time() + timeout
+    while not check():
+        if time.time() >= deadline:
+            return False
+        time.sleep(interval)
+    return True
+
+
+def execute(session, stmt, retry=False):
+    """
+    execute the statement and check it succeeded
+    :param retry: retry the statement until it succeeds or SYNC_TIMEOUT
+    :return: ResultSet
+    """
+    resps = list()
+
+    def run():
+        resps.append(session.execute(stmt))
+        return retry is False or resps[-1].is_succeeded()
+
+    wait_until(run)
+    assert resps[-1].is_succeeded(), '{}: {}'.format(stmt, resps[-1].error_msg())
+    return resps[-1]
+
+
+@contextmanager
+def graph_session():
+    pool = ConnectionPool()
+    assert pool.init([GRAPH_ADDRESS], Config())
+    session = pool.get_session('root', 'nebula')
+    try:
+        yield session
+    finally:
+        session.release()
+        pool.close()
+
+
+def create_space(session, space_name, vid_type, schema, probes=()):
+    """
+    create the space and its schema, the session uses the space after it
+    :param session: the Session
+    :param space_name: the space name
+    :param vid_type: the vid type, e.g. INT64
+    :param schema: the statements creating the tags and edges
+    :param probes: the statements which succeed after storaged has the schema
+    :return: void
+    """
+    execute(session, 'CREATE SPACE IF NOT EXISTS {}(partition_num=10, vid_type={})'.format(space_name, vid_type))
+    execute(session, 'USE {}'.format(space_name), retry=True)
+    for stmt in schema:
+        execute(session, stmt)
+    for stmt in probes:
+        execute(session, stmt, retry=True)
+
+
+def rebuild_index(session, kind, index_name):
+    """
+    rebuild the index and wait for the job finished
+    :param kind: TAG or EDGE
+    :return: void
+    """
+    execute(session, 'REBUILD {} INDEX {}'.format(kind, index_name), retry=True)
+
+    def finished():
+        resp = execute(session, 'SHOW {} INDEX STATUS'.format(kind))
+        return (index_name, 'FINISHED') in [row[:2] for row in resp.iter_tuples()]
+
+    assert wait_until(finished), 'rebuild {} timeout'.format(index_name)
+
+
+def prepare_space():
+    """
+    create the space scan_test with 100 vertices of person and 100 edges of like
+    """
+    with graph_session() as session:
+        create_space(session, 'scan_test', 'FIXED_STRING(8)',
+                     ['CREATE TAG IF NOT EXISTS person(name string, age int)',
+                      'CREATE EDGE IF NOT EXISTS like(likeness double)'])
+        # the inserts fail until graphd and storaged have the schema
+        vertices = ','.join('"p{}":("name{}", {})'.format(i, i, i) for i in range(100))
+        execute(session, 'INSERT VERTEX person(name, age) VALUES {}'.format(vertices), retry=True)
+        edges = ','.join('"p{}"->"p{}":({})'.format(i, (i + 1) % 100, i * 0.5) for i in range(100))
+        execute(session, 'INSERT EDGE like(likeness) VALUES {}'.format(edges), retry=True)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+import sys
+import os
+import asyncio
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.join(current_dir, '..')
+sys.path.insert(0, root_dir)
+
+from unittest import TestCase
+
+from nebula2.gclient.aio import AsyncConnectionPool
+
+from nebula2.Config import Config
+
+from nebula2.Exception import (
+    NotValidConnectionException,
+    InValidHostname
+)
+
+
+def run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class TestAsyncConnectionPool(TestCase):
+    @classmethod
+    def setup_class(self):
+        self.addresses = list()
+        self.addresses.append(('127.0.0.1', 3699))
+        self.addresses.append(('127.0.0.1', 3700))
+        self.configs = Config()
+        self.configs.min_connection_pool_size = 2
+        self.configs.max_connection_pool_size = 4
+        self.pool = AsyncConnectionPool()
+        assert run(self.pool.init(self.addresses, self.configs))
+        assert self.pool.connects() == 2
+
+    @classmethod
+    def teardown_class(self):
+        run(self.pool.close())
+
+    def test_wrong_hostname(self):
+        pool = AsyncConnectionPool()
+        try:
+            run(pool.init([('wrong_host', 3699)], Config()))
+            assert False
+        except InValidHostname:
+            assert True
+
+    def test_ping(self):
+        assert run(self.pool.ping(('127.0.0.1', 3699)))
+        assert run(self.pool.ping(('127.0.0.1', 5000))) is False
+
+    def test_execute(self):
+        session = run(self.pool.get_session('root', 'nebula'))
+        resp = run(session.execute('SHOW SPACES'))
+        assert resp.is_succeeded()
+        assert run(session.ping())
+        run(session.release())
+        assert not run(session.ping())
+
+    def test_concurrent_execute(self):
+        async def execute_all():
+            session = await self.pool.get_session('root', 'nebula')
+            results = await asyncio.gather(*[session.execute('YIELD {}'.format(i)) for i in range(0, 100)])
+            await session.release()
+            return results
+
+        results = run(execute_all())
+        assert len(results) == 100
+        for i, resp in enumerate(results):
+            assert resp.is_succeeded()
+            assert resp.row_values(0)[0].as_int() == i
+        assert self.pool.connects() <= self.configs.max_connection_pool_size
+        assert self.pool.in_flight_requests() == 0
+
+    def test_stop_close(self):
+        pool = AsyncConnectionPool()
+        assert run(pool.init(self.addresses, Config()))
+        session = run(pool.get_session('root', 'nebula'))
+        assert run(session.execute('SHOW SPACES')).is_succeeded()
+        run(pool.close())
+        try:
+            run(pool.get_session('root', 'nebula'))
+            assert False
+        except NotValidConnectionException:
+            assert True
+
+    def test_bad_server_back(self):
+        configs = Config()
+        configs.health_check_interval = 2
+        pool = AsyncConnectionPool()
+        assert run(pool.init([('127.0.0.1', 3701)], configs))
+        address = ('127.0.0.1', 3701)
+        try:
+            # the bad server is checked again when there is no ok server
+            pool._set_server_status(address, False)
+            assert pool.get_ok_servers_num() == 0
+            session = run(pool.get_session('root', 'nebula'))
+            assert run(session.execute('YIELD 1')).is_succeeded()
+            run(session.release())
+
+            # the health check finds it back after 1s
+            pool._set_server_status(address, False)
+            run(asyncio.sleep(1.5))
+            assert pool.get_ok_servers_num() == 1
+        finally:
+            run(pool.close())
+
+    def test_no_pending_tasks(self):
+        pool = AsyncConnectionPool()
+        assert run(pool.init(self.addresses, self.configs))
+        session = run(pool.get_session('root', 'nebula'))
+        assert run(session.execute('YIELD 1')).is_succeeded()
+        run(session.release())
+        tasks = [pool._check_task]
+        for connections in pool._connections.values():
+            tasks.extend([connection._read_task for connection in connections])
+        run(pool.close())
+        # the tasks are finished by close, not destroyed while pending
+        assert all([task.done() for task in tasks])
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+import sys
+import os
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.join(current_dir, '..')
+sys.path.insert(0, root_dir)
+sys.path.insert(0, current_dir)
+
+from unittest import TestCase, skipIf
+
+from nebula2.mclient import MetaCache
+from nebula2.common import ttypes
+from nebula2.meta.ttypes import PropertyType
+from nebula2.sclient.BulkWriter import BulkWriter
+from nebula2.sclient.StorageScanClient import StorageScanClient
+from nebula2.sclient.ValueConverter import make_converter
+
+from nebula2.Exception import InvalidKeyException
+
+from storage_helper import create_space, graph_session, storage_test
+
+pd = None
+try:
+    import pandas as pd
+except ImportError:
+    pass
+
+
+class TestConverter(TestCase):
+    def test_convert(self):
+        assert make_converter(PropertyType.INT64)('12').get_iVal() == 12
+        assert make_converter(PropertyType.BOOL)('true').get_bVal()
+        assert make_converter(PropertyType.STRING)('').get_sVal() == b''
+        assert make_converter(PropertyType.DATE)('2020-01-02').get_dVal() == ttypes.Date(2020, 1, 2)
+        assert make_converter(PropertyType.TIME)('01:02:03.5').get_tVal() == ttypes.Time(1, 2, 3, 500000)
+        assert make_converter(PropertyType.DATETIME)('2020-01-02T03:04').get_dtVal() == \
+            ttypes.DateTime(2020, 1, 2, 3, 4, 0, 0)
+        self.assertRaises(ValueError, make_converter(PropertyType.DATE), '2020/01/02')
+
+        # None, NaN and the empty non string field are NULL
+        for prop_type in (PropertyType.INT64, PropertyType.DOUBLE, PropertyType.STRING):
+            assert make_converter(prop_type)(None).get_nVal() == ttypes.NullType.__NULL__
+            assert make_converter(prop_type)(float('nan')).get_nVal() == ttypes.NullType.__NULL__
+        assert make_converter(PropertyType.DOUBLE)('').get_nVal() == ttypes.NullType.__NULL__
+
+
+@storage_test
+class TestBulkWriter(TestCase):
+    @classmethod
+    def setup_class(cls):
+        with graph_session() as session:
+            for space, vid_type, vid in (('bulk_test', 'FIXED_STRING(8)', '"0"'), ('int_test', 'INT64', '0')):
+                # the fetches fail until storaged has the tag and the edge
+                create_space(session, space, vid_type,
+                             ['CREATE TAG IF NOT EXISTS person(name string, age int)',
+                              'CREATE EDGE IF NOT EXISTS like(likeness double)'],
+                             ['FETCH PROP ON person {}'.format(vid),
+                              'FETCH PROP ON like {}->{}'.format(vid, vid)])
+
+        cls.meta_cache = MetaCache([('127.0.0.1', 45500)], 3000)
+        cls.writer = BulkWriter(cls.meta_cache, batch_size=64, max_in_flight=4, concurrency=4)
+        cls.scan_client = StorageScanClient(cls.meta_cache)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.writer.close()
+        cls.scan_client.close()
+        cls.meta_cache.close()
+
+    def scan_vertices(self, space, prefix):
+        vertices = dict()
+        for record in self.scan_client.scan_vertex(space, 'person'):
+            vid = record.get_value(0).get_value().value
+            if isinstance(vid, int) or vid.startswith(prefix):
+                vertices[vid] = (record.get_value(1), record.get_value(2))
+        return vertices
+
+    def test_add_vertices(self):
+        rows = [('v%d' % i, 'name%d' % i, i) for i in range(1000)]
+        assert self.writer.add_vertices('bulk_test', 'person', rows) == 1000
+        vertices = self.scan_vertices('bulk_test', b'v')
+        assert len(vertices) == 1000
+        assert vertices[b'v10'][0].as_string() == 'name10'
+        assert vertices[b'v10'][1].as_int() == 10
+
+        # the values are sorted by the schema
+        rows = iter([('r%d' % i, i, 'name%d' % i) for i in range(100)])
+        assert self.writer.add_vertices('bulk_test', 'person', rows, ['age', 'name']) == 100
+        vertices = self.scan_vertices('bulk_test', b'r')
+        assert len(vertices) == 100
+        assert vertices[b'r7'][0].as_string() == 'name7'
+        assert vertices[b'r7'][1].as_int() == 7
+
+        try:
+            self.writer.add_vertices('bulk_test', 'person', rows, ['not_exist_prop'])
+            assert False, 'expect to raise exception'
+        except InvalidKeyException:
+            pass
+
+    def test_add_edges(self):
+        rows = [('e%d' % i, 'e%d' % (i + 1), i % 3, i * 0.5) for i in range(300)]
+        assert self.writer.add_edges('bulk_test', 'like', rows, with_rank=True) == 300
+        edges = dict()
+        for record in self.scan_client.scan_edge('bulk_test', 'like'):
+            src = record.get_value(0).as_string()
+            if src.startswith('e'):
+                edges[src] = (record.get_value(2).as_int(),
+                              record.get_value(3).as_string(),
+                              record.get_value(4).as_double())
+        assert len(edges) == 300
+        assert edges['e10'] == (1, 'e11', 5.0)
+
+    def test_add_from_csv(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('vid,name,age\n')
+            f.write('c1,Tom,18\n')
+            f.write('c2,,\n')
+            path = f.name
+        try:
+            assert self.writer.add_vertices_from_csv('bulk_test', 'person', path) == 2
+        finally:
+            os.remove(path)
+        vertices = self.scan_vertices('bulk_test', b'c')
+        assert vertices[b'c1'][0].as_string() == 'Tom'
+        assert vertices[b'c1'][1].as_int() == 18
+        # the empty string is kept, the empty int is NULL
+        assert vertices[b'c2'][0].as_string() == ''
+        assert vertices[b'c2'][1].is_null()
+
+    def test_int_vid(self):
+        rows = [(i, 'name%d' % i, i) for i in range(-50, 50)]
+        assert self.writer.add_vertices('int_test', 'person', rows) == 100
+        vertices = self.scan_vertices('int_test', None)
+        assert sorted(vertices.keys()) == list(range(-50, 50))
+
+        # the int vid of the string vid space is its decimal string
+        assert self.writer.add_vertices('bulk_test', 'person', [(12345, 'n', 1)]) == 1
+        assert b'12345' in self.scan_vertices('bulk_test', b'12345')
+
+    def test_close_while_writing(self):
+        writer = BulkWriter(self.meta_cache, batch_size=8, max_in_flight=2)
+
+        def rows():
+            for i in range(100):
+                if i == 16:
+                    writer.close()
+                yield ('w%d' % i, 'name%d' % i, i)
+        # the batches after close are not written, and nothing is waited for ever
+        try:
+            writer.add_vertices('bulk_test', 'person', rows())
+            assert False, 'expect to raise exception'
+        except RuntimeError:
+            pass
+
+    @skipIf(pd is None, 'pandas is not installed')
+    def test_add_from_dataframe(self):
+        df = pd.DataFrame({'vid': ['d1', 'd2'], 'name': ['Tom', None], 'age': [18, None]})
+        assert self.writer.add_vertices_from_dataframe('bulk_test', 'person', df) == 2
+        vertices = self.scan_vertices('bulk_test', b'd')
+        assert vertices[b'd1'][1].as_int() == 18
+        assert vertices[b'd2'][0].is_null()
+        assert vertices[b'd2'][1].is_null()
@@ -8,13 +8,18 @@
 
 import sys
 import os
+import socket
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 root_dir = os.path.join(current_dir, '..')
 sys.path.insert(0, root_dir)
 
 from unittest import TestCase
+from thrift.transport import TTransport
+from thrift.transport.THeaderTransport import THeaderTransport, TRANSFORM
+from nebula2.Config import Config
 from nebula2.gclient.net import Connection
+from nebula2.gclient.Transport import CompressedHeaderTransport
 from nebula2.graph import ttypes
 from nebula2.Exception import IOErrorException
 
@@ -55,4 +60,80 @@ class TestConnection(TestCase):
         except IOErrorException:
             assert True
 
+    def test_execute_pipelined(self):
+        conn = Connection()
+        conn.open('127.0.0.1', 3699, 3000)
+        session_id = conn.authenticate('root', 'nebula')
+        stmts = ['YIELD {}'.format(i) for i in range(200)]
+        resps = conn.execute_pipelined(session_id, stmts, max_in_flight=16)
+        assert len(resps) == 200
+        for i, resp in enumerate(resps):
+            assert resp.error_code == ttypes.ErrorCode.SUCCEEDED, resp.error_msg
+            assert resp.data.rows[0].values[0].get_iVal() == i
+        # the connection is still usable
+        resp = conn.execute(session_id, 'SHOW SPACES')
+        assert resp.error_code == ttypes.ErrorCode.SUCCEEDED, resp.error_msg
+        assert conn.execute_pipelined(session_id, []) == []
+        conn.signout(session_id)
+        conn.close()
+
+    def test_transports(self):
+        for transport, compression in [('framed', None), ('header', None), ('header', 'zlib')]:
+            configs = Config()
+            configs.transport = transport
+            configs.compression = compression
+            conn = Connection()
+            conn.open('127.0.0.1', 3699, 3000, configs)
+            session_id = conn.authenticate('root', 'nebula')
+            resp = conn.execute(session_id, 'SHOW SPACES')
+            assert resp.error_code == ttypes.ErrorCode.SUCCEEDED, resp.error_msg
+            stmts = ['YIELD {}'.format(i) for i in range(20)]
+            resps = conn.execute_pipelined(session_id, stmts, max_in_flight=4)
+            for i, resp in enumerate(resps):
+                assert resp.data.rows[0].values[0].get_iVal() == i
+            conn.signout(session_id)
+            conn.close()
+
+        configs = Config()
+        configs.compression = 'zlib'
+        try:
+            Connection().open('127.0.0.1', 3699, 1000, configs)
+            assert False, 'the compression of the buffered transport should fail'
+        except RuntimeError:
+            assert True
 
+    def test_compressed_header(self):
+        out = TTransport.TMemoryBuffer()
+        trans = CompressedHeaderTransport(out, TRANSFORM.ZLIB)
+        # every request is compressed
+        for i in range(0, 2):
+            trans.write(b'x' * 1000)
+            trans.flush()
+        assert len(out.getvalue()) < 100
+        reader = THeaderTransport(TTransport.TMemoryBuffer(out.getvalue()))
+        for i in range(0, 2):
+            assert reader.read(10) == b'x' * 10
+            # the rest of the frame only
+            assert reader.read_buffered(2000) == b'x' * 990
+
+    def test_socket_options(self):
+        configs = Config()
+        configs.keepalive = True
+        configs.keepalive_idle = 30
+        configs.socket_recv_buffer = 256 * 1024
+        configs.connect_timeout = 500
+        conn = Connection()
+        conn.open('127.0.0.1', 3699, 2000, configs)
+        handle = conn._socket.handle
+        assert handle.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY) != 0
+        assert handle.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE) != 0
+        if hasattr(socket, 'TCP_KEEPIDLE'):
+            assert handle.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE) == 30
+        assert handle.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) >= 256 * 1024
+        # the read timeout is set after connecting
+        assert handle.gettimeout() == 2.0
+        session_id = conn.authenticate('root', 'nebula')
+        assert conn.is_alive()
+        conn.signout(session_id)
+        conn.close()
+        assert not conn.is_alive()
@@ -8,7 +8,7 @@
 
 import sys
 import os
-from datetime import date
+from datetime import date, time, datetime
 
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -26,7 +26,9 @@ from nebula2.data.DataObject import (
     Node,
     Relationship,
     PathWrapper,
-    TimeWrapper, DateTimeWrapper, DateWrapper, Null)
+    TimeWrapper, DateTimeWrapper, DateWrapper, Null,
+    PrimitiveColumn, StringColumn, ValueColumn, Record,
+    NodeTuple, EdgeTuple, PathTuple)
 
 
 class TestBaseCase(TestCase):
@@ -420,6 +422,22 @@ class TestPath(TestBaseCase):
         assert relationships == path.relationships()
 
 
+class TestRecord(TestBaseCase):
+    def test_record_api(self):
+        record = Record([Value(iVal=1), Value(sVal=b'Tom')], ['id', 'name'])
+        assert record.size() == 2
+        assert record.get_value(0).as_int() == 1
+        assert record.get_value_by_key('name').as_string() == 'Tom'
+        assert [value.as_int() for value in record if value.is_int()] == [1]
+        assert record == Record([Value(iVal=1), Value(sVal=b'Tom')], ['id', 'name'])
+        assert str(record) == '1\n"Tom"'
+        try:
+            record.get_value_by_key('age')
+            assert False
+        except InvalidKeyException:
+            assert True
+
+
 class TestResultset(TestBaseCase):
     def test_all_interface(self):
         result = self.get_result_set()
@@ -545,3 +563,94 @@ class TestResultset(TestBaseCase):
             record.size() == 15
         assert in_use
 
+
+    def test_to_columns(self):
+        resp = graphTtype.ExecutionResponse()
+        resp.error_code = graphTtype.ErrorCode.SUCCEEDED
+        data_set = ttypes.DataSet()
+        data_set.column_names = [b"col1_int", b"col2_double", b"col3_bool",
+                                 b"col4_string", b"col5_mixed"]
+        data_set.rows = []
+        for i in range(0, 3):
+            row = ttypes.Row()
+            if i == 1:
+                row.values = [Value(nVal=NullType.__NULL__), Value(),
+                              Value(nVal=NullType.__NULL__), Value(nVal=NullType.__NULL__),
+                              Value(sVal=b"mixed")]
+            else:
+                row.values = [Value(iVal=i), Value(fVal=i + 0.5), Value(bVal=i > 0),
+                              Value(sVal='name{}'.format(i).encode('utf-8')), Value(iVal=i)]
+            data_set.rows.append(row)
+        resp.data = data_set
+        columns = ResultSet(resp).to_columns()
+        assert list(columns.keys()) == ["col1_int", "col2_double", "col3_bool",
+                                        "col4_string", "col5_mixed"]
+
+        int_col = columns["col1_int"]
+        assert isinstance(int_col, PrimitiveColumn)
+        assert int_col.get_type() == ttypes.Value.IVAL
+        assert len(int_col) == 3
+        assert list(int_col.values()) == [0, 0, 2]
+        assert [bool(null) for null in int_col.null_mask()] == [False, True, False]
+        assert int_col.get(2) == 2
+        assert int_col.get(1) is None
+
+        assert columns["col2_double"].get_type() == ttypes.Value.FVAL
+        assert columns["col2_double"].get(2) == 2.5
+        assert columns["col2_double"].is_null(1)
+        assert columns["col3_bool"].get_type() == ttypes.Value.BVAL
+        assert columns["col3_bool"].get(0) is False
+        assert columns["col3_bool"].get(2) is True
+
+        str_col = columns["col4_string"]
+        assert isinstance(str_col, StringColumn)
+        assert str_col.data() == b"name0name2"
+        assert list(str_col.offsets()) == [0, 5, 5, 10]
+        assert str_col.get(0) == "name0"
+        assert str_col.get(1) is None
+        assert str_col.get_bytes(2) == b"name2"
+
+        mixed_col = columns["col5_mixed"]
+        assert isinstance(mixed_col, ValueColumn)
+        assert mixed_col.get(1).as_string() == "mixed"
+        assert mixed_col.get(2).as_int() == 2
+
+        # the result without data
+        resp.data = None
+        assert ResultSet(resp).to_columns() == {}
+
+    def test_as_python(self):
+        result = self.get_result_set()
+        rows = result.as_python()
+        assert len(rows) == 1
+        assert list(result.iter_tuples()) == rows
+        row = rows[0]
+        assert len(row) == 15
+        assert row[0] is None
+        assert row[1] is None
+        assert row[2] is False
+        assert row[3] == 100
+        assert row[4] == 10.01
+        assert row[5] == "hello world"
+        assert row[6] == ["word", "car"]
+        assert row[7] == {"word", "car"}
+        assert row[8] == {"a": "word", "b": "car"}
+        assert row[9] == time(10, 10, 10, 10000)
+        assert row[10] == date(2020, 10, 1)
+        assert row[11] == datetime(2020, 10, 1, 10, 10, 10, 10000)
+
+        node = row[12]
+        assert isinstance(node, NodeTuple)
+        assert node.vid == "Tom"
+        assert sorted(node.tags.keys()) == ["tag0", "tag1", "tag2"]
+        assert node.tags["tag2"] == {"prop0": 0, "prop1": 1, "prop2": 2, "prop3": 3, "prop4": 4}
+
+        edge = row[13]
+        assert edge == EdgeTuple("Tom", "Lily", "classmate", 100,
+                                 {"prop0": 0, "prop1": 1, "prop2": 2, "prop3": 3, "prop4": 4})
+
+        path = row[14]
+        assert isinstance(path, PathTuple)
+        assert [node.vid for node in path.nodes] == ["Tom", "vertex0", "vertex1", "vertex2"]
+        assert [(edge.src, edge.dst) for edge in path.relationships] == \
+            [("Tom", "vertex0"), ("vertex1", "vertex0"), ("vertex1", "vertex2")]
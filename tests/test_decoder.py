@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.join(current_dir, '..')
+sys.path.insert(0, root_dir)
+sys.path.insert(0, current_dir)
+
+from unittest import TestCase
+
+from thrift.Thrift import TMessageType, TApplicationException
+from thrift.protocol import TBinaryProtocol
+from thrift.transport import TTransport
+
+from nebula2.common import ttypes
+from nebula2.graph import GraphService
+from nebula2.gclient import Decoder
+from nebula2.gclient.Decoder import (
+    MessageScanner,
+    decode_reply,
+    decode_struct,
+    stream_execute_reply
+)
+
+from test_fastproto import get_response
+
+
+def get_message(result, mtype=TMessageType.REPLY, seqid=1):
+    buf = TTransport.TMemoryBuffer()
+    protocol = TBinaryProtocol.TBinaryProtocol(buf)
+    protocol.writeMessageBegin('execute', mtype, seqid)
+    result.write(protocol)
+    protocol.writeMessageEnd()
+    return buf.getvalue()
+
+
+class TestDecoder(TestCase):
+    def setUp(self):
+        # always test the pure python decoder
+        self._fastproto = Decoder.fastproto
+        Decoder.fastproto = None
+
+    def tearDown(self):
+        Decoder.fastproto = self._fastproto
+
+    def test_scan_messages(self):
+        resp = get_response()
+        data = get_message(GraphService.execute_result(success=resp), seqid=1) + \
+            get_message(GraphService.execute_result(success=resp), seqid=2)
+        for chunk_size in (1, 5, 4096, len(data)):
+            scanner = MessageScanner()
+            messages = []
+            for i in range(0, len(data), chunk_size):
+                scanner.feed(data[i:i + chunk_size])
+                message = scanner.next_message()
+                while message is not None:
+                    messages.append(message)
+                    message = scanner.next_message()
+            assert [seqid for seqid, _ in messages] == [1, 2]
+            assert b''.join(message for _, message in messages) == data
+
+    def test_decode_reply(self):
+        resp = get_response()
+        data = get_message(GraphService.execute_result(success=resp))
+        assert decode_reply(data, 'execute', GraphService.execute_result) == resp
+
+    def test_decode_exception(self):
+        data = get_message(TApplicationException(TApplicationException.INTERNAL_ERROR, 'error'),
+                           mtype=TMessageType.EXCEPTION)
+        try:
+            decode_reply(data, 'execute', GraphService.execute_result)
+            assert False, 'expect to raise exception'
+        except TApplicationException as ex:
+            assert ex.message == 'error'
+
+        data = get_message(GraphService.execute_result())
+        try:
+            decode_reply(data, 'execute', GraphService.execute_result)
+            assert False, 'expect to raise exception'
+        except TApplicationException as ex:
+            assert ex.type == TApplicationException.MISSING_RESULT
+
+    def test_decode_struct(self):
+        value = ttypes.Value(lVal=ttypes.List([ttypes.Value(sVal=b'a'),
+                                               ttypes.Value(uVal=ttypes.Set({ttypes.Value(iVal=1)}))]))
+        buf = TTransport.TMemoryBuffer()
+        value.write(TBinaryProtocol.TBinaryProtocol(buf))
+        data = buf.getvalue()
+        result, pos = decode_struct(memoryview(data), 0, ttypes.Value)
+        assert pos == len(data)
+        assert result == value
+        try:
+            decode_struct(memoryview(data[:-3]), 0, ttypes.Value)
+            assert False, 'expect to raise exception'
+        except EOFError:
+            pass
+
+    def test_stream_execute_reply(self):
+        resp = get_response()
+        data = get_message(GraphService.execute_result(success=resp))
+        for batch_size in (1, 3, 20, 100):
+            buf = TTransport.TMemoryBuffer(data)
+            batches = list(stream_execute_reply(buf.read, batch_size, read_size=7))
+            assert len(batches) == (len(resp.data.rows) + batch_size - 1) // batch_size
+            rows = []
+            for batch in batches:
+                assert batch.error_code == resp.error_code
+                assert batch.data.column_names == resp.data.column_names
+                assert 0 < len(batch.data.rows) <= batch_size
+                rows.extend(batch.data.rows)
+            assert rows == resp.data.rows
+            # the fields after the rows are only in the last one
+            assert batches[-1].space_name == resp.space_name
+            assert batches[-1].comment == resp.comment
+
+        resp.data = None
+        data = get_message(GraphService.execute_result(success=resp))
+        batches = list(stream_execute_reply(TTransport.TMemoryBuffer(data).read, 10))
+        assert batches == [resp]
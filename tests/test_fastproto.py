@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+import sys
+import os
+import socket
+import threading
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.join(current_dir, '..')
+sys.path.insert(0, root_dir)
+
+from unittest import TestCase, skipIf
+
+from thrift.protocol import TBinaryProtocol
+from thrift.protocol import TCompactProtocol
+from thrift.transport import TSocket
+from thrift.transport import TTransport
+
+from nebula2.common import ttypes
+from nebula2.graph import ttypes as graphTtype
+
+try:
+    from thrift.protocol import fastproto
+except ImportError:
+    fastproto = None
+
+
+def encode(obj, protocol):
+    buf = TTransport.TMemoryBuffer()
+    obj.write(protocol(buf))
+    return buf.getvalue()
+
+
+def decode(data, protocol, buffer_size=None):
+    trans = TTransport.TMemoryBuffer(data)
+    if buffer_size is not None:
+        trans = TTransport.TBufferedTransport(trans, buffer_size)
+    resp = graphTtype.ExecutionResponse()
+    resp.read(protocol(trans))
+    return resp
+
+
+def get_response():
+    vertex = ttypes.Vertex(vid=b'vid', tags=[
+        ttypes.Tag(name=b'tag', props={b'p': ttypes.Value(iVal=1)})])
+    edge = ttypes.Edge(src=b'a', dst=b'b', type=1, name=b'like',
+                       ranking=-1, props={b'w': ttypes.Value(fVal=0.5)})
+    row = ttypes.Row([
+        ttypes.Value(),
+        ttypes.Value(nVal=ttypes.NullType.__NULL__),
+        ttypes.Value(bVal=True),
+        ttypes.Value(bVal=False),
+        ttypes.Value(iVal=-(2 ** 63)),
+        ttypes.Value(fVal=-1.25),
+        ttypes.Value(sVal=b'x' * 3000),
+        ttypes.Value(dVal=ttypes.Date(2020, 10, 1)),
+        ttypes.Value(tVal=ttypes.Time(10, 30, 0, 10)),
+        ttypes.Value(dtVal=ttypes.DateTime(2020, 10, 1, 10, 30, 0, 10)),
+        ttypes.Value(vVal=vertex),
+        ttypes.Value(eVal=edge),
+        ttypes.Value(pVal=ttypes.Path(src=vertex, steps=[
+            ttypes.Step(dst=vertex, type=1, name=b'like', ranking=0)])),
+        ttypes.Value(lVal=ttypes.List([ttypes.Value(iVal=1)])),
+        ttypes.Value(mVal=ttypes.Map({b'k': ttypes.Value(sVal=b'v')})),
+    ])
+    data_set = ttypes.DataSet([b'col%d' % i for i in range(len(row.values))],
+                              [row] * 20)
+    return graphTtype.ExecutionResponse(error_code=graphTtype.ErrorCode.SUCCEEDED,
+                                        latency_in_us=100,
+                                        data=data_set,
+                                        space_name=b'test',
+                                        comment=b'comment')
+
+
+@skipIf(fastproto is None, 'fastproto is not built')
+class TestFastProto(TestCase):
+    PROTOCOLS = ((TBinaryProtocol.TBinaryProtocol,
+                  TBinaryProtocol.TBinaryProtocolAccelerated),
+                 (TCompactProtocol.TCompactProtocol,
+                  TCompactProtocol.TCompactProtocolAccelerated))
+
+    def test_encode(self):
+        resp = get_response()
+        for plain, accelerated in self.PROTOCOLS:
+            assert encode(resp, plain) == encode(resp, accelerated)
+
+    def test_decode(self):
+        resp = get_response()
+        for plain, accelerated in self.PROTOCOLS:
+            data = encode(resp, plain)
+            assert decode(data, plain) == resp
+            assert decode(data, accelerated) == resp
+            # small buffers force the decoder to refill from the transport
+            for buffer_size in (1, 7, 4096):
+                assert decode(data, accelerated, buffer_size) == resp
+
+    def test_decode_leaves_remaining_data(self):
+        resp = get_response()
+        data = encode(resp, TBinaryProtocol.TBinaryProtocol)
+        protocol = TBinaryProtocol.TBinaryProtocolAccelerated(
+            TTransport.TMemoryBuffer(data + data))
+        for _ in range(2):
+            result = graphTtype.ExecutionResponse()
+            result.read(protocol)
+            assert result == resp
+
+    def test_decode_truncated(self):
+        data = encode(get_response(), TBinaryProtocol.TBinaryProtocol)
+        try:
+            decode(data[:-10], TBinaryProtocol.TBinaryProtocolAccelerated, 64)
+            assert False, 'expect to raise exception'
+        except (EOFError, TTransport.TTransportException):
+            pass
+
+
+class TestRecvBufferTransport(TestCase):
+    @staticmethod
+    def _transport(data):
+        reader, writer = socket.socketpair()
+
+        def send():
+            writer.sendall(data)
+            writer.close()
+        thread = threading.Thread(target=send)
+        thread.daemon = True
+        thread.start()
+        sock = TSocket.TSocket()
+        sock.setHandle(reader)
+        return TTransport.TRecvBufferTransport(sock, 4096)
+
+    def test_decode(self):
+        resp = get_response()
+        data = encode(resp, TBinaryProtocol.TBinaryProtocol)
+        for protocol in (TBinaryProtocol.TBinaryProtocol,
+                         TBinaryProtocol.TBinaryProtocolAccelerated):
+            trans = self._transport(data * 3)
+            for _ in range(3):
+                result = graphTtype.ExecutionResponse()
+                result.read(protocol(trans))
+                assert result == resp
+            try:
+                trans.read(1)
+                assert False, 'expect to raise exception'
+            except TTransport.TTransportException as e:
+                assert e.type == TTransport.TTransportException.END_OF_FILE
+            trans.close()
+
+    def test_read(self):
+        data = bytes(bytearray(range(256))) * 4096
+        trans = self._transport(data)
+        received = bytearray()
+        sizes = [1, 100, 70000, 5000, 300000]
+        i = 0
+        while len(received) < len(data):
+            size = min(sizes[i % len(sizes)], len(data) - len(received))
+            if i % 3 == 0:
+                received += trans.readAll(size)
+            elif i % 3 == 1:
+                received += trans.read(size)
+            else:
+                received += trans.read_view(size)
+            i = i + 1
+        assert bytes(received) == data
+        # the receive size grows for the big reads
+        assert trans._recv_size > 4096
+        trans.close()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.join(current_dir, '..')
+sys.path.insert(0, root_dir)
+sys.path.insert(0, current_dir)
+
+from unittest import TestCase
+
+from nebula2.mclient import MetaCache
+from nebula2.sclient.IndexLookupClient import IndexLookupClient
+
+from nebula2.Exception import InvalidKeyException
+
+from storage_helper import execute, graph_session, prepare_space, rebuild_index, storage_test
+
+
+@storage_test
+class TestIndexLookupClient(TestCase):
+    @classmethod
+    def setup_class(cls):
+        prepare_space()
+        with graph_session() as session:
+            for stmt in ['USE scan_test',
+                         'CREATE TAG INDEX IF NOT EXISTS person_age_index ON person(age)',
+                         'CREATE EDGE INDEX IF NOT EXISTS like_index ON like(likeness)']:
+                execute(session, stmt)
+            # the data is inserted before the indexes are created
+            rebuild_index(session, 'TAG', 'person_age_index')
+            rebuild_index(session, 'EDGE', 'like_index')
+
+        cls.meta_cache = MetaCache([('127.0.0.1', 45500)], 3000)
+        cls.client = IndexLookupClient(cls.meta_cache, concurrency=4)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.close()
+        cls.meta_cache.close()
+
+    def test_lookup_tag(self):
+        records = list(self.client.lookup_tag('scan_test', 'person_age_index', [('age', 10, 20)], ['name', 'age']))
+        assert sorted(record.get_value(2).as_int() for record in records) == list(range(10, 20))
+        for record in records:
+            age = record.get_value(2).as_int()
+            assert record.get_value(0).as_string() == 'p{}'.format(age)
+            assert record.get_value(1).as_string() == 'name{}'.format(age)
+
+        records = list(self.client.lookup_tag('scan_test', 'person_age_index', [('age', 5)]))
+        assert [record.get_value(0).as_string() for record in records] == ['p5']
+
+    def test_lookup_edge(self):
+        records = list(self.client.lookup_edge('scan_test', 'like_index', [('likeness', 0.0, 2.0)], ['likeness']))
+        edges = sorted((record.get_value(0).as_string(), record.get_value(2).as_string()) for record in records)
+        assert edges == [('p0', 'p1'), ('p1', 'p2'), ('p2', 'p3'), ('p3', 'p4')]
+
+    def test_limit(self):
+        records = list(self.client.lookup_tag('scan_test', 'person_age_index', [('age', 0, 100)], limit=7))
+        assert len(records) == 7
+        assert len(set(record.get_value(0).as_string() for record in records)) == 7
+
+        # stop reading, the client still works
+        for record in self.client.lookup_tag('scan_test', 'person_age_index'):
+            break
+        assert len(list(self.client.lookup_tag('scan_test', 'person_age_index'))) == 100
+
+    def test_invalid_hint(self):
+        self.assertRaises(InvalidKeyException, self.client.lookup_tag,
+                          'scan_test', 'person_age_index', [('name', 'x')])
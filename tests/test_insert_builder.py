@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+import sys
+import os
+import datetime
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.join(current_dir, '..')
+sys.path.insert(0, root_dir)
+
+from unittest import TestCase
+
+from nebula2.common import ttypes
+from nebula2.Exception import InvalidValueTypeException
+from nebula2.data.InsertBuilder import InsertBuilder, format_value
+
+
+class TestInsertBuilder(TestCase):
+    def test_format_value(self):
+        assert format_value(None) == 'NULL'
+        assert format_value(True) == 'true'
+        assert format_value(-12) == '-12'
+        assert format_value(-2 ** 63) == '(-9223372036854775807-1)'
+        assert format_value(1.5) == '1.5'
+        assert format_value(1e20) == '1.0e+20'
+        assert format_value('a"b\\c\nd\te') == '"a\\"b\\\\c\\nd\\te"'
+        assert format_value(b'\xe4\xb8\xad') == '"中"'
+        assert format_value(datetime.date(2020, 1, 2)) == 'date("2020-01-02")'
+        assert format_value(datetime.time(1, 2, 3, 4)) == 'time("01:02:03.000004")'
+        assert format_value(datetime.datetime(2020, 1, 2, 3, 4, 5)) == 'datetime("2020-01-02T03:04:05")'
+        assert format_value([1, 'a']) == '[1, "a"]'
+        assert format_value({'k': [None]}) == '{`k`: [NULL]}'
+        assert format_value({1}) == '{1}'
+        self.assertRaises(InvalidValueTypeException, format_value, float('nan'))
+        self.assertRaises(InvalidValueTypeException, format_value, set())
+        self.assertRaises(InvalidValueTypeException, format_value, object())
+
+    def test_format_ttypes_value(self):
+        value = ttypes.Value(nVal=ttypes.NullType.__NULL__)
+        assert format_value(value) == 'NULL'
+        assert format_value(ttypes.Value()) == 'NULL'
+        assert format_value(ttypes.Value(sVal=b'"x"')) == '"\\"x\\""'
+        assert format_value(ttypes.Value(fVal=2.0)) == '2.0'
+        assert format_value(ttypes.Value(tVal=ttypes.Time(1, 2, 3, 0))) == 'time("01:02:03")'
+        value = ttypes.Value(dtVal=ttypes.DateTime(2020, 1, 2, 3, 4, 5, 6))
+        assert format_value(value) == 'datetime("2020-01-02T03:04:05.000006")'
+        value = ttypes.Value(lVal=ttypes.List([ttypes.Value(iVal=1), ttypes.Value(bVal=False)]))
+        assert format_value(value) == '[1, false]'
+        value = ttypes.Value(mVal=ttypes.Map({b'a': ttypes.Value(dVal=ttypes.Date(2020, 1, 2))}))
+        assert format_value(value) == '{`a`: date("2020-01-02")}'
+        value = ttypes.Value(uVal=ttypes.Set(set()))
+        self.assertRaises(InvalidValueTypeException, format_value, value)
+        value = ttypes.Value(vVal=ttypes.Vertex(vid=ttypes.Value(sVal=b'a'), tags=[]))
+        self.assertRaises(InvalidValueTypeException, format_value, value)
+
+    def test_insert_vertices(self):
+        rows = [('v{}'.format(i), 'name{}'.format(i), i) for i in range(0, 10)]
+        stmts = list(InsertBuilder(max_rows=4).insert_vertices('person', ['name', 'age'], rows))
+        assert len(stmts) == 3
+        assert stmts[0] == 'INSERT VERTEX `person`(`name`, `age`) VALUES ' \
+                           '"v0":("name0", 0), "v1":("name1", 1), "v2":("name2", 2), "v3":("name3", 3)'
+        assert stmts[2].count(':(') == 2
+
+        # split by the bytes, one long row is still given
+        builder = InsertBuilder(max_bytes=100)
+        rows = [('a', 'x' * 10, 1), ('b', 'y' * 200, 2), ('c', 'z', 3), ('d', '中' * 20, 4)]
+        stmts = list(builder.insert_vertices('person', ['name', 'age'], rows))
+        assert len(stmts) == 4
+        for stmt in stmts:
+            assert stmt.count(':(') == 1 or len(stmt.encode('utf-8')) <= 100
+
+    def test_insert_edges(self):
+        rows = [('a', 'b', 80.0), ('b', 'c', 70.5)]
+        stmts = list(InsertBuilder().insert_edges('like', ['likeness'], rows))
+        assert stmts == ['INSERT EDGE `like`(`likeness`) VALUES "a"->"b":(80.0), "b"->"c":(70.5)']
+
+        rows = [(1, 2, 3, 80.0)]
+        stmts = list(InsertBuilder().insert_edges('like', ['likeness'], rows, with_rank=True))
+        assert stmts == ['INSERT EDGE `like`(`likeness`) VALUES 1->2@3:(80.0)']
+        rows = [(1, 2, -2 ** 63 + 1, 80.0)]
+        stmts = list(InsertBuilder().insert_edges('like', ['likeness'], rows, with_rank=True))
+        assert stmts == ['INSERT EDGE `like`(`likeness`) VALUES 1->2@-9223372036854775807:(80.0)']
+        # the min int64 is not a literal
+        rows = [(1, 2, -2 ** 63, 80.0)]
+        self.assertRaises(InvalidValueTypeException, list,
+                          InsertBuilder().insert_edges('like', ['likeness'], rows, with_rank=True))
+        assert list(InsertBuilder().insert_edges('like', ['likeness'], [])) == []
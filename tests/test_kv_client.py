@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.join(current_dir, '..')
+sys.path.insert(0, root_dir)
+sys.path.insert(0, current_dir)
+
+from unittest import SkipTest, TestCase
+
+from nebula2.mclient import MetaCache
+from nebula2.sclient.KVClient import KVClient
+
+from storage_helper import prepare_space, reachable, storage_test
+
+
+@storage_test
+class TestKVClient(TestCase):
+    @classmethod
+    def setup_class(cls):
+        prepare_space()
+        cls.meta_cache = MetaCache([('127.0.0.1', 45500)], 3000)
+        # the port of the kv service is not given by metad
+        for host, port in cls.meta_cache.get_storage_addrs():
+            if not reachable((host, port + KVClient.DEFAULT_PORT_OFFSET)):
+                cls.meta_cache.close()
+                raise SkipTest('No kv service at the port {} of storaged {}:{}'.format(
+                    KVClient.DEFAULT_PORT_OFFSET, host, port))
+        cls.client = KVClient(cls.meta_cache, batch_size=64, concurrency=4)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.close()
+        cls.meta_cache.close()
+
+    def test_put_get(self):
+        key_values = {'key_{}'.format(i): 'value_{}'.format(i) for i in range(500)}
+        self.client.put('scan_test', key_values)
+        result = self.client.get('scan_test', list(key_values.keys()))
+        assert len(result) == 500
+        for i in range(500):
+            assert result[b'key_%d' % i] == b'value_%d' % i
+
+        self.client.put('scan_test', [(b'key_0', b'new_value')])
+        assert self.client.get('scan_test', ['key_0']) == {b'key_0': b'new_value'}
+
+    def test_return_partly(self):
+        self.client.put('scan_test', {'partly_1': 'a', 'partly_2': 'b'})
+        keys = ['partly_1', 'partly_2', 'partly_not_exist']
+        result = self.client.get('scan_test', keys, return_partly=True)
+        assert result == {b'partly_1': b'a', b'partly_2': b'b'}
+        self.assertRaises(RuntimeError, self.client.get, 'scan_test', keys)
+
+    def test_remove(self):
+        keys = ['remove_{}'.format(i) for i in range(100)]
+        self.client.put('scan_test', [(key, key) for key in keys])
+        self.client.remove('scan_test', keys[:50])
+        result = self.client.get('scan_test', keys, return_partly=True)
+        assert sorted(result.keys()) == sorted(key.encode('utf-8') for key in keys[50:])
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+import sys
+import os
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.join(current_dir, '..')
+sys.path.insert(0, root_dir)
+
+from unittest import TestCase
+
+from nebula2.gclient.LoadBalancer import (
+    ServerStats,
+    make_balancer,
+    ROUND_ROBIN,
+    LEAST_IN_FLIGHT,
+    EWMA_LATENCY,
+    POWER_OF_TWO
+)
+
+ADDRESSES = [('127.0.0.1', 3699), ('127.0.0.1', 3700), ('127.0.0.1', 3701)]
+
+
+def pick(balancer, stats, times=30):
+    counts = {addr: 0 for addr in ADDRESSES}
+    for i in range(times):
+        counts[balancer.order(ADDRESSES, stats)[0]] += 1
+    return counts
+
+
+class TestLoadBalancer(TestCase):
+    def test_round_robin(self):
+        stats = {addr: ServerStats() for addr in ADDRESSES}
+        stats[ADDRESSES[1]].begin(10)
+        balancer = make_balancer(ROUND_ROBIN)
+        assert list(pick(balancer, stats).values()) == [10, 10, 10]
+        assert sorted(balancer.order(ADDRESSES, stats)) == ADDRESSES
+
+    def test_least_in_flight(self):
+        stats = {addr: ServerStats() for addr in ADDRESSES}
+        stats[ADDRESSES[1]].begin(2)
+        counts = pick(make_balancer(LEAST_IN_FLIGHT), stats)
+        assert counts == {ADDRESSES[0]: 15, ADDRESSES[1]: 0, ADDRESSES[2]: 15}
+        stats[ADDRESSES[1]].end(2)
+        stats[ADDRESSES[2]].begin()
+        assert make_balancer(LEAST_IN_FLIGHT).order(ADDRESSES, stats)[-1] == ADDRESSES[2]
+
+    def test_ewma_latency(self):
+        stats = {addr: ServerStats(decay_time=0.1) for addr in ADDRESSES}
+        for addr in ADDRESSES:
+            stats[addr].add_latency(0.002)
+        # the slow sample is taken at once
+        stats[ADDRESSES[0]].add_latency(0.5)
+        assert stats[ADDRESSES[0]].latency() > 0.4
+        balancer = make_balancer(EWMA_LATENCY)
+        assert pick(balancer, stats)[ADDRESSES[0]] == 0
+        # the latency decays, then the server is tried again
+        time.sleep(0.8)
+        assert stats[ADDRESSES[0]].latency() < 0.001
+        assert pick(balancer, stats)[ADDRESSES[0]] > 0
+
+    def test_power_of_two(self):
+        stats = {addr: ServerStats() for addr in ADDRESSES}
+        stats[ADDRESSES[0]].begin(5)
+        balancer = make_balancer(POWER_OF_TWO)
+        # the busy server is chosen only if it is not one of the two picked
+        assert pick(balancer, stats, 300)[ADDRESSES[0]] == 0
+        stats[ADDRESSES[0]].end(5)
+        stats[ADDRESSES[0]].add_latency(1)
+        assert pick(balancer, stats, 300)[ADDRESSES[0]] == 0
+
+    def test_unsupported(self):
+        try:
+            make_balancer('random')
+            assert False, 'expect to raise exception'
+        except RuntimeError:
+            assert True
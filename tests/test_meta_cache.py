@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.join(current_dir, '..')
+sys.path.insert(0, root_dir)
+sys.path.insert(0, current_dir)
+
+from unittest import TestCase
+
+from nebula2.mclient import MetaCache
+
+from nebula2.Exception import (
+    SpaceNotFoundException,
+    TagNotFoundException,
+    EdgeNotFoundException,
+    IndexNotFoundException
+)
+
+from storage_helper import prepare_space, storage_test, wait_until
+
+
+@storage_test
+class TestMetaCache(TestCase):
+    @classmethod
+    def setup_class(cls):
+        prepare_space()
+        cls.meta_cache = MetaCache([('127.0.0.1', 45500)], 3000, load_period=1)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.meta_cache.close()
+
+    def test_get_schema(self):
+        space_id = self.meta_cache.get_space_id('scan_test')
+        meta_client = self.meta_cache.get_meta_client()
+        assert space_id == meta_client.get_space('scan_test').space_id
+        assert self.meta_cache.get_space_desc('scan_test').partition_num == 10
+
+        tag = self.meta_cache.get_tag('scan_test', 'person')
+        assert tag.tag_id == self.meta_cache.get_tag_id('scan_test', 'person')
+        assert [col.name for col in self.meta_cache.get_tag_schema('scan_test', 'person').columns] == \
+            [b'name', b'age']
+        edge = self.meta_cache.get_edge('scan_test', 'like')
+        assert edge.edge_type == self.meta_cache.get_edge_type('scan_test', 'like')
+        assert [col.name for col in edge.schema.columns] == [b'likeness']
+
+        # the unchanged versions are kept after reloaded
+        self.meta_cache.load()
+        assert self.meta_cache.get_tag('scan_test', 'person') is tag
+        # the older version than required is reloaded
+        assert self.meta_cache.get_tag('scan_test', 'person', tag.version).version == tag.version
+
+    def test_get_parts(self):
+        parts_alloc = self.meta_cache.get_parts_alloc('scan_test')
+        assert sorted(parts_alloc.keys()) == list(range(1, 11))
+        leaders = self.meta_cache.get_part_leaders('scan_test')
+        storage_addrs = self.meta_cache.get_storage_addrs()
+        assert len(storage_addrs) > 0
+        for part_id, leader in leaders.items():
+            assert leader in parts_alloc[part_id]
+            assert leader in storage_addrs
+
+    def test_refresh(self):
+        leader = self.meta_cache.get_part_leaders('scan_test')[1]
+        self.meta_cache.update_part_leader('scan_test', 1, ('127.0.0.1', 1))
+        assert self.meta_cache.get_part_leaders('scan_test')[1] == ('127.0.0.1', 1)
+        # refreshed by the background thread
+        assert wait_until(lambda: self.meta_cache.get_part_leaders('scan_test')[1] == leader, timeout=10)
+
+    def test_not_found(self):
+        try:
+            self.meta_cache.get_space_id('not_exist_space')
+            assert False, 'expect to raise exception'
+        except SpaceNotFoundException:
+            pass
+        try:
+            self.meta_cache.get_tag('scan_test', 'not_exist_tag')
+            assert False, 'expect to raise exception'
+        except TagNotFoundException:
+            pass
+        try:
+            self.meta_cache.get_edge('scan_test', 'not_exist_edge')
+            assert False, 'expect to raise exception'
+        except EdgeNotFoundException:
+            pass
+        try:
+            self.meta_cache.get_tag_index('scan_test', 'not_exist_index')
+            assert False, 'expect to raise exception'
+        except IndexNotFoundException:
+            pass
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.join(current_dir, '..')
+sys.path.insert(0, root_dir)
+sys.path.insert(0, current_dir)
+
+from unittest import TestCase, skipIf
+
+from nebula2.mclient import MetaCache
+from nebula2.sclient import Partitioner
+from nebula2.sclient.StorageScanClient import StorageScanClient
+
+from storage_helper import prepare_space, storage_test
+
+
+class TestPartitioner(TestCase):
+    VIDS = [b'', b'a', b'p0', b'abcdefgh', b'abcdefghi', b'x' * 16, b'x' * 23,
+            b'a\0b', b'1234567\0x', u'中文'.encode('utf-8'), u'vertex']
+
+    def test_part_id(self):
+        # the int ids and the 8 bytes ids are not hashed
+        assert Partitioner.part_id(0, 10) == 1
+        assert Partitioner.part_id(25, 10) == 6
+        assert Partitioner.part_id(-1, 10) == (2 ** 64 - 1) % 10 + 1
+        assert Partitioner.part_id(b'\x19\0\0\0\0\0\0\0', 10) == 6
+        # the bytes after the first zero byte are not hashed
+        assert Partitioner.part_id(b'a\0b', 100) == Partitioner.part_id(b'a', 100)
+        assert Partitioner.part_id(u'vertex', 100) == Partitioner.part_id(b'vertex', 100)
+        for vid in self.VIDS:
+            assert 1 <= Partitioner.part_id(vid, 7) <= 7
+
+    @skipIf(Partitioner.np is None, 'numpy is not installed')
+    def test_part_ids(self):
+        np = Partitioner.np
+        vids = self.VIDS + [b'vertex_%d' % i for i in range(1000)]
+        for num_parts in (1, 7, 100):
+            expected = [Partitioner.part_id(vid, num_parts) for vid in vids]
+            assert Partitioner.part_ids(vids, num_parts).tolist() == expected
+
+        ints = [0, 1, -1, 2 ** 63 - 1, -2 ** 63] + list(range(-500, 500, 7))
+        expected = [Partitioner.part_id(vid, 13) for vid in ints]
+        assert Partitioner.part_ids(ints, 13).tolist() == expected
+        assert Partitioner.part_ids(np.array(ints, dtype=np.int64), 13).tolist() == expected
+        assert len(Partitioner.part_ids([], 13)) == 0
+
+    def test_bucket(self):
+        vids = [b'vertex_%d' % i for i in range(1000)]
+        buckets = Partitioner.bucket(vids, Partitioner.part_ids(vids, 10))
+        assert sorted(buckets.keys()) == list(range(1, 11))
+        assert sorted(vid for part_vids in buckets.values() for vid in part_vids) == sorted(vids)
+        for part, part_vids in buckets.items():
+            # the order of the ids is kept in the part
+            assert list(part_vids) == [vid for vid in vids if Partitioner.part_id(vid, 10) == part]
+
+
+@storage_test
+class TestSpacePartitioner(TestCase):
+    @classmethod
+    def setup_class(cls):
+        prepare_space()
+        cls.meta_cache = MetaCache([('127.0.0.1', 45500)], 3000, load_period=0)
+        cls.partitioner = Partitioner.Partitioner(cls.meta_cache)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.meta_cache.close()
+
+    def test_same_as_server(self):
+        with StorageScanClient(self.meta_cache) as client:
+            for part_id in range(1, 11):
+                vids = [record.get_value(0).as_string().encode('utf-8')
+                        for record in client.scan_vertex('scan_test', 'person', [], parts=[part_id])]
+                assert list(self.partitioner.part_ids('scan_test', vids)) == [part_id] * len(vids)
+
+    def test_group_by_leader(self):
+        vids = [b'p%d' % i for i in range(100)]
+        groups = self.partitioner.group_by_leader('scan_test', vids)
+        leaders = self.meta_cache.get_part_leaders('scan_test')
+        count = 0
+        for address, parts in groups.items():
+            for part_id, part_vids in parts.items():
+                assert leaders[part_id] == address
+                count = count + len(part_vids)
+        assert count == len(vids)
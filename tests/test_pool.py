@@ -8,6 +8,7 @@
 
 import sys
 import os
+import socket
 import threading
 import time
 
@@ -115,6 +116,148 @@ class TestConnectionPool(TestCase):
 
         assert self.pool.in_used_connects() == 3
 
+    def test_check_server(self):
+        # the check is done by the background health checker
+        start = time.time()
+        self.pool.check_server(('127.0.0.1', 3699))
+        assert time.time() - start < 0.5
+        time.sleep(1)
+        assert self.pool.get_ok_servers_num() == 2
+
+        self.pool.update_servers_status()
+        assert self.pool.get_ok_servers_num() == 2
+
+    def test_health_check_errors(self):
+        configs = Config()
+        configs.min_connection_pool_size = 1
+        pool = ConnectionPool()
+        address = ('127.0.0.1', 3699)
+        assert pool.init([address], configs)
+        conn = pool._idle_connections[address][-1]
+
+        def ping():
+            raise socket.timeout('timed out')
+        conn.ping = ping
+        # the connection failed to ping is dropped, the server is pinged by a new one
+        assert pool._probe(address)
+        assert pool.connnects() == 0
+        assert pool.in_used_connects() == 0
+
+        # the health checker is stopped by close
+        assert pool._check_thread.is_alive()
+        pool.close()
+        assert not pool._check_thread.is_alive()
+
+    def test_return_connection(self):
+        conn = self.pool.get_connection()
+        assert conn is not None
+        assert conn.is_used
+        self.pool.return_connection(conn)
+        assert not conn.is_used
+
+        # the returned connections are reused
+        connects = self.pool.connnects()
+        for i in range(0, 10):
+            conn = self.pool.get_connection()
+            assert conn is not None
+            self.pool.return_connection(conn)
+        assert self.pool.connnects() == connects
+
+        percentiles = self.pool.checkout_wait_percentiles()
+        assert sorted(percentiles.keys()) == [50, 90, 99]
+        assert 0 <= percentiles[50] <= percentiles[90] <= percentiles[99]
+
+    def test_dead_idle_connections(self):
+        configs = Config()
+        configs.min_connection_pool_size = 4
+        configs.ping_idle_time = 0
+        pool = ConnectionPool()
+        assert pool.init([('127.0.0.1', 3699)], configs)
+        assert pool.connnects() == 4
+        # e.g. graphd was restarted, all the idle connections are dead
+        for conn in list(pool._idle_connections[('127.0.0.1', 3699)]):
+            conn._socket.handle.shutdown(socket.SHUT_RDWR)
+        conn = pool.get_connection()
+        assert conn is not None
+        assert conn.ping()
+        assert pool.connnects() == 1
+        pool.return_connection(conn)
+        pool.close()
+
+    def test_execute_stream(self):
+        pool = ConnectionPool()
+        assert pool.init([('127.0.0.1', 3699)], self.configs)
+        session = pool.get_session('root', 'nebula')
+        expected = session.execute('SHOW HOSTS')
+        assert expected.is_succeeded()
+        rows = list()
+        for result in session.execute_stream('SHOW HOSTS', batch_size=2):
+            assert result.is_succeeded()
+            assert result.keys() == expected.keys()
+            assert 0 < result.row_size() <= 2
+            rows.extend(result.rows())
+        assert rows == expected.rows()
+
+        # stop reading the stream, the session still works
+        for result in session.execute_stream('SHOW HOSTS', batch_size=1):
+            break
+        assert session.execute('SHOW HOSTS').is_succeeded()
+        session.release()
+        pool.close()
+
+    def test_execute_many(self):
+        pool = ConnectionPool()
+        assert pool.init([('127.0.0.1', 3699)], self.configs)
+        session = pool.get_session('root', 'nebula')
+        stmts = ['YIELD {}'.format(i) for i in range(0, 20)]
+        results = session.execute_many(stmts, concurrency=3)
+        assert len(results) == 20
+        for i, result in enumerate(results):
+            assert result.is_succeeded()
+            assert result.row_values(0)[0].as_int() == i
+        # the borrowed connections are given back
+        assert pool.in_used_connects() == 1
+        session.release()
+        pool.close()
+
+    def test_execute_pipelined(self):
+        pool = ConnectionPool()
+        assert pool.init([('127.0.0.1', 3699)], self.configs)
+        session = pool.get_session('root', 'nebula')
+        results = session.execute_pipelined(['USE test', 'YIELD 1', 'YIELD 2'])
+        assert [result.is_succeeded() for result in results] == [True, True, True]
+        assert results[2].row_values(0)[0].as_int() == 2
+        assert session.space_name() == 'test'
+        session.release()
+        pool.close()
+
+    def test_load_balancer(self):
+        configs = Config()
+        configs.load_balancer = 'least_in_flight'
+        pool = ConnectionPool()
+        assert pool.init(self.addresses, configs)
+        session = pool.get_session('root', 'nebula')
+        address = session._connection.get_address()
+        for i in range(5):
+            assert session.execute('YIELD 1').is_succeeded()
+        in_flight, latency = pool.server_stats()[address]
+        assert in_flight == 0
+        assert latency > 0
+        # the requests of the session are in flight until replied
+        thread = threading.Thread(target=session.execute, args=('SLEEP 0.5',))
+        thread.start()
+        time.sleep(0.2)
+        assert pool.server_stats()[address][0] == 1
+        thread.join()
+        assert pool.server_stats()[address][0] == 0
+        # the new connections are spread over the servers
+        connections = [pool.get_connection() for _ in range(len(self.addresses))]
+        assert len(set(conn.get_address() for conn in connections)) == len(self.addresses)
+        for conn in connections:
+            pool.return_connection(conn)
+        session.release()
+        pool.close()
+
     def test_stop_close(self):
         session = self.pool.get_session('root', 'nebula')
         assert session is not None
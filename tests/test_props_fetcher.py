@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+import sys
+import os
+import threading
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.join(current_dir, '..')
+sys.path.insert(0, root_dir)
+sys.path.insert(0, current_dir)
+
+from unittest import TestCase
+
+from nebula2.mclient import MetaCache
+from nebula2.sclient.PropsFetcher import PropsFetcher
+
+from storage_helper import prepare_space, storage_test
+
+
+@storage_test
+class TestPropsFetcher(TestCase):
+    @classmethod
+    def setup_class(cls):
+        prepare_space()
+        cls.meta_cache = MetaCache([('127.0.0.1', 45500)], 3000)
+        cls.fetcher = PropsFetcher(cls.meta_cache, window=20, max_batch_size=64)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.fetcher.close()
+        cls.meta_cache.close()
+
+    def test_fetch_vertices(self):
+        records = self.fetcher.fetch_vertices('scan_test', 'person', ['p1', b'p2', 'not_exist'])
+        assert sorted(records.keys()) == [b'p1', b'p2']
+        assert records[b'p1'].get_value(1).as_string() == 'name1'
+        assert records[b'p2'].get_value(2).as_int() == 2
+
+        records = self.fetcher.fetch_vertices('scan_test', 'person', ['p3'], ['age'])
+        assert records[b'p3'].size() == 2
+        assert records[b'p3'].get_value(1).as_int() == 3
+
+    def test_fetch_edges(self):
+        records = self.fetcher.fetch_edges('scan_test', 'like', [('p1', 'p2'), ('p5', 'p6', 0), ('p1', 'p3')])
+        assert sorted(records.keys()) == [(b'p1', b'p2', 0), (b'p5', b'p6', 0)]
+        assert records[(b'p5', b'p6', 0)].get_value(4).as_double() == 2.5
+
+    def test_coalesce(self):
+        calls = list()
+        fetch_vertices = self.fetcher.fetch_vertices
+
+        def count_fetch(space_name, tag_name, vids, prop_names=None, dedup=False, limit=None):
+            calls.append(len(vids))
+            return fetch_vertices(space_name, tag_name, vids, prop_names, dedup, limit)
+
+        self.fetcher.fetch_vertices = count_fetch
+        try:
+            results = dict()
+            barrier = threading.Barrier(100)
+
+            def run(i):
+                barrier.wait()
+                results[i] = self.fetcher.fetch_vertex('scan_test', 'person', 'p{}'.format(i % 50))
+
+            threads = [threading.Thread(target=run, args=(i,)) for i in range(100)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            del self.fetcher.fetch_vertices
+
+        for i in range(100):
+            assert results[i].get_value(0).as_string() == 'p{}'.format(i % 50)
+            assert results[i].get_value(2).as_int() == i % 50
+        # the full batches are sent at once, the rest wait for the window
+        assert len(calls) < 10
+        assert max(calls) <= 64
+
+        assert self.fetcher.fetch_vertex('scan_test', 'person', 'not_exist') is None
+        future = self.fetcher.fetch_vertex_async('scan_test', 'person', 'p7', ['name'])
+        assert future.result().get_value(1).as_string() == 'name7'
+
+    def test_close(self):
+        fetcher = PropsFetcher(self.meta_cache, window=1000, max_batch_size=2)
+        future = fetcher.fetch_vertex_async('scan_test', 'person', 'p1')
+        # the waiting fetch is sent by close
+        fetcher.close()
+        assert future.result(timeout=10).get_value(0).as_string() == 'p1'
+        self.assertRaises(RuntimeError, fetcher.fetch_vertex_async, 'scan_test', 'person', 'p2')
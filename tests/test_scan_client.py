@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.join(current_dir, '..')
+sys.path.insert(0, root_dir)
+sys.path.insert(0, current_dir)
+
+from unittest import TestCase
+
+from nebula2.mclient import MetaCache
+from nebula2.sclient.StorageScanClient import StorageScanClient
+
+from nebula2.Exception import (
+    SpaceNotFoundException,
+    TagNotFoundException
+)
+
+from storage_helper import prepare_space, storage_test
+
+
+@storage_test
+class TestStorageScanClient(TestCase):
+    @classmethod
+    def setup_class(cls):
+        prepare_space()
+        cls.meta_cache = MetaCache([('127.0.0.1', 45500)], 3000)
+        cls.client = StorageScanClient(cls.meta_cache, concurrency=4, queue_size=2)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.close()
+        cls.meta_cache.close()
+
+    def test_scan_vertex(self):
+        # the small limit makes every part scanned by several requests
+        records = list(self.client.scan_vertex('scan_test', 'person', limit=3))
+        assert len(records) == 100
+        assert [name.split('.')[-1] for name in records[0].keys()] == ['_vid', 'name', 'age']
+        vids = sorted(record.get_value(0).as_string() for record in records)
+        assert vids == sorted('p{}'.format(i) for i in range(100))
+        for record in records:
+            vid = record.get_value(0).as_string()
+            assert record.get_value(1).as_string() == 'name' + vid[1:]
+            assert record.get_value(2).as_int() == int(vid[1:])
+
+        records = list(self.client.scan_vertex('scan_test', 'person', ['age'], parts=[1]))
+        assert 0 < len(records) < 100
+        assert records[0].size() == 2
+
+    def test_scan_edge(self):
+        records = list(self.client.scan_edge('scan_test', 'like', limit=7))
+        assert len(records) == 100
+        assert [name.split('.')[-1] for name in records[0].keys()] == \
+            ['_src', '_type', '_rank', '_dst', 'likeness']
+        for record in records:
+            src = int(record.get_value(0).as_string()[1:])
+            assert record.get_value(3).as_string() == 'p{}'.format((src + 1) % 100)
+            assert record.get_value(4).as_double() == src * 0.5
+
+    def test_stop_reading(self):
+        for record in self.client.scan_vertex('scan_test', 'person', limit=1):
+            break
+        assert len(list(self.client.scan_vertex('scan_test', 'person'))) == 100
+
+    def test_not_found(self):
+        try:
+            self.client.scan_vertex('not_exist_space', 'person')
+            assert False, 'expect to raise exception'
+        except SpaceNotFoundException:
+            pass
+        try:
+            self.client.scan_vertex('scan_test', 'not_exist_tag')
+            assert False, 'expect to raise exception'
+        except TagNotFoundException:
+            pass
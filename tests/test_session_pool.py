@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+import sys
+import os
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.join(current_dir, '..')
+sys.path.insert(0, root_dir)
+
+from unittest import TestCase
+
+from nebula2.gclient.net import ConnectionPool, SessionPool
+
+from nebula2.Config import Config
+
+
+class TestSessionPool(TestCase):
+    @classmethod
+    def setup_class(self):
+        self.configs = Config()
+        self.configs.max_connection_pool_size = 4
+        self.pool = ConnectionPool()
+        assert self.pool.init([('127.0.0.1', 3699), ('127.0.0.1', 3700)], self.configs)
+        session = self.pool.get_session('root', 'nebula')
+        resp = session.execute('CREATE SPACE IF NOT EXISTS session_pool_test')
+        assert resp.is_succeeded(), resp.error_msg()
+        session.release()
+        time.sleep(3)
+
+    def test_reuse_session(self):
+        session_pool = SessionPool(self.pool, max_idle_sessions=1)
+        session = session_pool.get_session('root', 'nebula')
+        session_id = session.session_id
+        assert session.execute('SHOW SPACES').is_succeeded()
+        session_pool.return_session(session)
+        assert session_pool.idle_sessions() == 1
+        assert self.pool.in_used_connects() == 1
+
+        # the idle session is reused
+        session = session_pool.get_session('root', 'nebula')
+        assert session.session_id == session_id
+        assert session_pool.idle_sessions() == 0
+
+        # only max_idle_sessions are kept
+        session2 = session_pool.get_session('root', 'nebula')
+        assert session2.session_id != session_id
+        session_pool.return_session(session)
+        session_pool.return_session(session2)
+        assert session_pool.idle_sessions() == 1
+        assert self.pool.in_used_connects() == 1
+
+        session_pool.close()
+        assert session_pool.idle_sessions() == 0
+        assert self.pool.in_used_connects() == 0
+
+    def test_use_space(self):
+        session_pool = SessionPool(self.pool)
+        session = session_pool.get_session('root', 'nebula', 'session_pool_test')
+        assert session.space_name() == 'session_pool_test'
+        session_id = session.session_id
+        session_pool.return_session(session)
+
+        session = session_pool.get_session('root', 'nebula', 'session_pool_test')
+        assert session.session_id == session_id
+        assert session.space_name() == 'session_pool_test'
+        session_pool.return_session(session)
+
+        # the password is not the same
+        try:
+            session_pool.get_session('root', 'wrong password', 'session_pool_test')
+            assert False
+        except Exception:
+            assert True
+        session_pool.close()
+
+    def test_expired_idle_session(self):
+        session_pool = SessionPool(self.pool)
+        session = session_pool.get_session('root', 'nebula')
+        session_id = session.session_id
+        session_pool.return_session(session)
+        assert session_pool.idle_sessions() == 1
+
+        # the idle session is signed out on graphd, a new one replaces it
+        session._connection.signout(session_id)
+        session = session_pool.get_session('root', 'nebula', 'session_pool_test')
+        assert session.session_id != session_id
+        assert session.space_name() == 'session_pool_test'
+        assert session_pool.idle_sessions() == 0
+        session_pool.return_session(session)
+        session_pool.close()
+
+    def test_free_idle_sessions(self):
+        session_pool = SessionPool(self.pool)
+        sessions = [session_pool.get_session('root', 'nebula')
+                    for _ in range(self.configs.max_connection_pool_size)]
+        for session in sessions:
+            session_pool.return_session(session)
+        assert session_pool.idle_sessions() == self.configs.max_connection_pool_size
+        # the password is not kept in the pool
+        for key in session_pool._idle_sessions.keys():
+            assert 'nebula' not in key
+
+        # all the connections are held by the idle sessions, one of them is freed
+        session = session_pool.get_session('other', 'nebula')
+        assert session.execute('SHOW SPACES').is_succeeded()
+        assert session_pool.idle_sessions() == self.configs.max_connection_pool_size - 1
+        session_pool.return_session(session)
+        session_pool.close()
+        assert self.pool.in_used_connects() == 0
+
+    def test_no_space(self):
+        session_pool = SessionPool(self.pool)
+        session = session_pool.get_session('root', 'nebula', 'session_pool_test')
+        session_id = session.session_id
+        session_pool.return_session(session)
+
+        # the session using a space is not given when no space is asked for
+        session = session_pool.get_session('root', 'nebula')
+        assert session.session_id != session_id
+        assert session.space_name() == ''
+        session_pool.return_session(session)
+        session_pool.close()
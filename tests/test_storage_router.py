@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.join(current_dir, '..')
+sys.path.insert(0, root_dir)
+sys.path.insert(0, current_dir)
+
+from unittest import TestCase
+
+from nebula2.mclient import MetaCache
+from nebula2.sclient.net import StorageRouter
+from nebula2.storage import ttypes
+
+from storage_helper import prepare_space, storage_test
+
+
+@storage_test
+class TestStorageRouter(TestCase):
+    @classmethod
+    def setup_class(cls):
+        prepare_space()
+        cls.meta_cache = MetaCache([('127.0.0.1', 45500)], 3000, load_period=0)
+        cls.router = StorageRouter(cls.meta_cache, 3000)
+        space_id = cls.meta_cache.get_space_id('scan_test')
+        tag_id = cls.meta_cache.get_tag_id('scan_test', 'person')
+
+        def make_req(parts):
+            (part_id, cursor), = parts.items()
+            return ttypes.ScanVertexRequest(space_id=space_id,
+                                            part_id=part_id,
+                                            cursor=cursor,
+                                            return_columns=ttypes.VertexProp(tag=tag_id, props=[b'_vid']),
+                                            limit=1000,
+                                            enable_read_from_follower=False)
+        cls.make_req = staticmethod(make_req)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.router.close()
+        cls.meta_cache.close()
+
+    def test_group_by_leader(self):
+        groups = self.router.group_by_leader('scan_test', range(1, 11))
+        assert sorted(part_id for part_ids in groups.values() for part_id in part_ids) == list(range(1, 11))
+        leaders = self.meta_cache.get_part_leaders('scan_test')
+        for address, part_ids in groups.items():
+            for part_id in part_ids:
+                assert leaders[part_id] == address
+
+    def test_execute(self):
+        vids = list()
+        for part_id in range(1, 11):
+            result = self.router.execute('scan_test', 'scan_vertex', {part_id: None}, self.make_req)
+            assert result.is_succeeded(), result.error_msg()
+            assert len(result.responses) == 1
+            vids.extend(row.values[0].get_sVal() for row in result.responses[0].vertex_data.rows)
+        assert sorted(vids) == sorted(b'p%d' % i for i in range(100))
+
+    def test_leader_changed(self):
+        parts_alloc = self.meta_cache.get_parts_alloc('scan_test')
+        for part_id in range(1, 11):
+            leader = self.meta_cache.get_part_leaders('scan_test')[part_id]
+            followers = [host for host in parts_alloc[part_id] if host != leader]
+            if len(followers) == 0:
+                continue
+            # the follower replies the leader changed, then the part is retried on the leader
+            self.meta_cache.update_part_leader('scan_test', part_id, followers[0])
+            result = self.router.execute('scan_test', 'scan_vertex', {part_id: None}, self.make_req)
+            assert result.is_succeeded(), result.error_msg()
+            assert self.meta_cache.get_part_leaders('scan_test')[part_id] == leader
+
+    def test_connect_failed(self):
+        leader = self.meta_cache.get_part_leaders('scan_test')[1]
+        self.meta_cache.update_part_leader('scan_test', 1, ('127.0.0.1', 1))
+        result = self.router.execute('scan_test', 'scan_vertex', {1: None}, self.make_req)
+        assert result.is_succeeded(), result.error_msg()
+        assert self.meta_cache.get_part_leaders('scan_test')[1] == leader
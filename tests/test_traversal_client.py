@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2020 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License,
+# attached with Common Clause Condition 1.0, found in the LICENSES directory.
+
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.join(current_dir, '..')
+sys.path.insert(0, root_dir)
+sys.path.insert(0, current_dir)
+
+from unittest import TestCase
+
+from nebula2.mclient import MetaCache
+from nebula2.sclient.BulkWriter import BulkWriter
+from nebula2.sclient.TraversalClient import TraversalClient
+from nebula2.storage.ttypes import EdgeDirection
+
+from storage_helper import create_space, graph_session, prepare_space, storage_test
+
+
+@storage_test
+class TestTraversalClient(TestCase):
+    @classmethod
+    def setup_class(cls):
+        prepare_space()
+        with graph_session() as session:
+            # the fetch fails until storaged has the edge
+            create_space(session, 'int_test', 'INT64',
+                         ['CREATE EDGE IF NOT EXISTS like(likeness double)'],
+                         ['FETCH PROP ON like 0->0'])
+
+        cls.meta_cache = MetaCache([('127.0.0.1', 45500)], 3000)
+        cls.client = TraversalClient(cls.meta_cache, concurrency=4)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.client.close()
+        cls.meta_cache.close()
+
+    def test_get_neighbors(self):
+        # the edges of scan_test are p0 -> p1 -> ... -> p99 -> p0
+        srcs, dsts = self.client.get_neighbors('scan_test', ['p0', 'p5', 'p9'], ['like'])
+        assert sorted(zip(srcs, dsts)) == [(b'p0', b'p1'), (b'p5', b'p6'), (b'p9', b'p10')]
+
+        srcs, dsts = self.client.get_neighbors('scan_test', [b'p5'], ['like'], EdgeDirection.IN_EDGE)
+        assert list(zip(srcs, dsts)) == [(b'p5', b'p4')]
+
+        srcs, dsts = self.client.get_neighbors('scan_test', [b'p5'], ['like'], EdgeDirection.BOTH)
+        assert sorted(dsts) == [b'p4', b'p6']
+        assert self.client.get_neighbors('scan_test', [], ['like']) == ([], [])
+
+    def test_k_hop(self):
+        frontiers = self.client.k_hop('scan_test', ['p0'], ['like'], 3)
+        assert frontiers == [[b'p1'], [b'p2'], [b'p3']]
+
+        # the visited vertices are not expanded again
+        frontiers = self.client.k_hop('scan_test', ['p0', 'p1'], ['like'], 2, EdgeDirection.BOTH)
+        assert frontiers == [[b'p2', b'p99'], [b'p3', b'p98']]
+
+    def test_int_vid(self):
+        with BulkWriter(self.meta_cache) as writer:
+            rows = [(1000, 1001, 0.1), (1000, 1002, 0.2), (1001, 1002, 0.3), (1002, 1003, 0.4), (1003, 1000, 0.5)]
+            assert writer.add_edges('int_test', 'like', rows, ['likeness']) == 5
+        srcs, dsts = self.client.get_neighbors('int_test', [1000], ['like'])
+        assert sorted(dsts.tolist() if hasattr(dsts, 'tolist') else dsts) == [1001, 1002]
+
+        frontiers = self.client.k_hop('int_test', [1000], ['like'], 3)
+        frontiers = [list(frontier) for frontier in frontiers]
+        assert frontiers == [[1001, 1002], [1003], []]
@@ -0,0 +1,1475 @@
+/*
+ * Licensed to the Apache Software Foundation (ASF) under one
+ * or more contributor license agreements. See the NOTICE file
+ * distributed with this work for additional information
+ * regarding copyright ownership. The ASF licenses this file
+ * to you under the Apache License, Version 2.0 (the
+ * "License"); you may not use this file except in compliance
+ * with the License. You may obtain a copy of the License at
+ *
+ *   http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing,
+ * software distributed under the License is distributed on an
+ * "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+ * KIND, either express or implied. See the License for the
+ * specific language governing permissions and limitations
+ * under the License.
+ */
+
+/*
+ * C accelerator for the generated thrift structs.
+ *
+ * The generated read()/write() methods call into this module when the
+ * protocol is TBinaryProtocolAccelerated (protoid=0) or
+ * TCompactProtocolAccelerated (protoid=2) and the transport is a
+ * CReadableTransport:
+ *
+ *   fastproto.decode(obj, trans, [cls, spec, is_union],
+ *                    utf8strings=..., protoid=...)
+ *   fastproto.encode(obj, [cls, spec, is_union],
+ *                    utf8strings=..., protoid=...) -> bytes
+ *
+ * Everything is driven by the thrift_spec tuples, so no per-struct code
+ * is needed.  If this module is not built the generated pure-python code
+ * is used instead.
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <stdint.h>
+#include <string.h>
+
+#define PROTO_BINARY 0
+#define PROTO_COMPACT 2
+
+#define MAX_DEPTH 256
+
+/* TType values, see thrift/Thrift.py */
+enum {
+    T_STOP = 0,
+    T_VOID = 1,
+    T_BOOL = 2,
+    T_BYTE = 3,
+    T_DOUBLE = 4,
+    T_I16 = 6,
+    T_I32 = 8,
+    T_U64 = 9,
+    T_I64 = 10,
+    T_STRING = 11,
+    T_STRUCT = 12,
+    T_MAP = 13,
+    T_SET = 14,
+    T_LIST = 15,
+    T_UTF8 = 16,
+    T_UTF16 = 17,
+    T_FLOAT = 19
+};
+
+/* CompactType values, see thrift/protocol/TCompactProtocol.py */
+enum {
+    C_STOP = 0x00,
+    C_TRUE = 0x01,
+    C_FALSE = 0x02,
+    C_BYTE = 0x03,
+    C_I16 = 0x04,
+    C_I32 = 0x05,
+    C_I64 = 0x06,
+    C_DOUBLE = 0x07,
+    C_BINARY = 0x08,
+    C_LIST = 0x09,
+    C_SET = 0x0A,
+    C_MAP = 0x0B,
+    C_STRUCT = 0x0C,
+    C_FLOAT = 0x0D
+};
+
+static PyObject *str_cstringio_buf;
+static PyObject *str_read;
+static PyObject *str_tell;
+static PyObject *str_field;
+static PyObject *str_value;
+static PyObject *empty_tuple;
+static PyObject *int_zero;
+
+/* ------------------------------------------------------------------ */
+/* spec helpers                                                        */
+/* ------------------------------------------------------------------ */
+
+typedef struct {
+    int ttype;
+    PyObject *name;      /* borrowed */
+    PyObject *typeargs;  /* borrowed */
+} FieldSpec;
+
+/* Look up the spec entry for fid.  The generated thrift_spec tuples are
+ * indexed by field id, but fall back to a scan for sparse or negative
+ * ids.  Returns 1 if found, 0 otherwise. */
+static int
+find_field(PyObject *spec, long fid, FieldSpec *out)
+{
+    Py_ssize_t n = PyTuple_GET_SIZE(spec);
+    PyObject *entry = NULL;
+    Py_ssize_t i;
+
+    if (fid >= 0 && fid < n) {
+        entry = PyTuple_GET_ITEM(spec, fid);
+        if (entry != Py_None && PyTuple_Check(entry)
+                && PyTuple_GET_SIZE(entry) >= 4
+                && PyLong_AsLong(PyTuple_GET_ITEM(entry, 0)) == fid) {
+            goto found;
+        }
+    }
+    for (i = 0; i < n; i++) {
+        entry = PyTuple_GET_ITEM(spec, i);
+        if (entry == Py_None || !PyTuple_Check(entry)
+                || PyTuple_GET_SIZE(entry) < 4) {
+            continue;
+        }
+        if (PyLong_AsLong(PyTuple_GET_ITEM(entry, 0)) == fid) {
+            goto found;
+        }
+    }
+    if (PyErr_Occurred()) {
+        PyErr_Clear();
+    }
+    return 0;
+
+found:
+    out->ttype = (int)PyLong_AsLong(PyTuple_GET_ITEM(entry, 1));
+    out->name = PyTuple_GET_ITEM(entry, 2);
+    out->typeargs = PyTuple_GET_ITEM(entry, 3);
+    return 1;
+}
+
+static int
+parse_struct_args(PyObject *args, PyObject **cls, PyObject **spec,
+                  int *is_union)
+{
+    if (!PySequence_Check(args) || PySequence_Size(args) != 3) {
+        PyErr_SetString(PyExc_TypeError,
+                        "expected [cls, thrift_spec, is_union]");
+        return -1;
+    }
+    /* borrowed from a list or tuple owned by the caller */
+    if (PyList_Check(args)) {
+        *cls = PyList_GET_ITEM(args, 0);
+        *spec = PyList_GET_ITEM(args, 1);
+        *is_union = PyObject_IsTrue(PyList_GET_ITEM(args, 2));
+    } else if (PyTuple_Check(args)) {
+        *cls = PyTuple_GET_ITEM(args, 0);
+        *spec = PyTuple_GET_ITEM(args, 1);
+        *is_union = PyObject_IsTrue(PyTuple_GET_ITEM(args, 2));
+    } else {
+        PyErr_SetString(PyExc_TypeError,
+                        "expected [cls, thrift_spec, is_union]");
+        return -1;
+    }
+    if (!PyTuple_Check(*spec)) {
+        PyErr_SetString(PyExc_TypeError, "thrift_spec must be a tuple");
+        return -1;
+    }
+    return *is_union < 0 ? -1 : 0;
+}
+
+static int
+parse_container_args(PyObject *args, Py_ssize_t n, PyObject **items)
+{
+    Py_ssize_t i;
+
+    if (!PyTuple_Check(args) || PyTuple_GET_SIZE(args) != n) {
+        PyErr_SetString(PyExc_TypeError, "malformed container type args");
+        return -1;
+    }
+    for (i = 0; i < n; i++) {
+        items[i] = PyTuple_GET_ITEM(args, i);
+    }
+    return 0;
+}
+
+/* ------------------------------------------------------------------ */
+/* decoding                                                            */
+/* ------------------------------------------------------------------ */
+
+typedef struct {
+    PyObject *trans;     /* the CReadableTransport */
+    PyObject *stringio;  /* its current cstringio_buf */
+    PyObject *data;      /* bytes-like object read from stringio */
+    Py_buffer view;      /* the buffer of data when it is not bytes */
+    int has_view;
+    const char *buf;
+    Py_ssize_t len;
+    Py_ssize_t pos;
+    Py_ssize_t base;     /* position of data[0] inside stringio */
+    int protoid;
+    int utf8strings;
+    int depth;
+    /* compact protocol state */
+    long last_fid;
+    int bool_value;      /* -1 when no bool field header is pending */
+} DecodeBuffer;
+
+/* Takes over the reference to stringio and reads its unconsumed bytes. */
+static int
+decode_load(DecodeBuffer *db, PyObject *stringio)
+{
+    PyObject *tell, *data;
+
+    Py_XSETREF(db->stringio, stringio);
+    tell = PyObject_CallMethodObjArgs(stringio, str_tell, NULL);
+    if (tell == NULL) {
+        return -1;
+    }
+    db->base = PyLong_AsSsize_t(tell);
+    Py_DECREF(tell);
+    if (db->base == -1 && PyErr_Occurred()) {
+        return -1;
+    }
+    data = PyObject_CallMethodObjArgs(stringio, str_read, NULL);
+    if (data == NULL) {
+        return -1;
+    }
+    if (db->has_view) {
+        PyBuffer_Release(&db->view);
+        db->has_view = 0;
+    }
+    if (PyBytes_Check(data)) {
+        db->buf = PyBytes_AS_STRING(data);
+        db->len = PyBytes_GET_SIZE(data);
+    } else {
+        /* a memoryview of the transport buffer is read without a copy */
+        if (PyObject_GetBuffer(data, &db->view, PyBUF_SIMPLE) < 0) {
+            Py_DECREF(data);
+            PyErr_SetString(PyExc_TypeError,
+                            "cstringio_buf.read() must return a bytes-like object");
+            return -1;
+        }
+        db->has_view = 1;
+        db->buf = (const char *)db->view.buf;
+        db->len = db->view.len;
+    }
+    Py_XSETREF(db->data, data);
+    db->pos = 0;
+    return 0;
+}
+
+static int
+decode_init(DecodeBuffer *db, PyObject *trans, int protoid, int utf8strings)
+{
+    PyObject *stringio;
+
+    memset(db, 0, sizeof(*db));
+    db->trans = trans;
+    db->protoid = protoid;
+    db->utf8strings = utf8strings;
+    db->bool_value = -1;
+    stringio = PyObject_GetAttr(trans, str_cstringio_buf);
+    if (stringio == NULL) {
+        return -1;
+    }
+    return decode_load(db, stringio);
+}
+
+/* Leave the transport buffer positioned right after what was consumed. */
+static int
+decode_finish(DecodeBuffer *db)
+{
+    PyObject *res;
+
+    res = PyObject_CallMethod(db->stringio, "seek", "n", db->base + db->pos);
+    if (res == NULL) {
+        return -1;
+    }
+    Py_DECREF(res);
+    return 0;
+}
+
+static void
+decode_free(DecodeBuffer *db)
+{
+    if (db->has_view) {
+        PyBuffer_Release(&db->view);
+        db->has_view = 0;
+    }
+    Py_CLEAR(db->stringio);
+    Py_CLEAR(db->data);
+}
+
+/* Make sure at least n bytes are available, refilling from the transport
+ * with the unconsumed tail when the current chunk runs dry. */
+static int
+decode_need(DecodeBuffer *db, Py_ssize_t n)
+{
+    PyObject *partial, *stringio;
+
+    if (db->len - db->pos >= n) {
+        return 0;
+    }
+    partial = PyBytes_FromStringAndSize(db->buf + db->pos,
+                                        db->len - db->pos);
+    if (partial == NULL) {
+        return -1;
+    }
+    /* the old chunk is fully handed back to the transport */
+    db->pos = db->len;
+    stringio = PyObject_CallMethod(db->trans, "cstringio_refill", "On",
+                                   partial, n);
+    Py_DECREF(partial);
+    if (stringio == NULL) {
+        return -1;
+    }
+    if (decode_load(db, stringio) < 0) {
+        return -1;
+    }
+    if (db->len < n) {
+        PyErr_SetString(PyExc_EOFError, "not enough data to decode");
+        return -1;
+    }
+    return 0;
+}
+
+static inline const unsigned char *
+decode_take(DecodeBuffer *db, Py_ssize_t n)
+{
+    const unsigned char *p;
+
+    if (decode_need(db, n) < 0) {
+        return NULL;
+    }
+    p = (const unsigned char *)db->buf + db->pos;
+    db->pos += n;
+    return p;
+}
+
+static int
+read_u8(DecodeBuffer *db, uint8_t *out)
+{
+    const unsigned char *p = decode_take(db, 1);
+
+    if (p == NULL) {
+        return -1;
+    }
+    *out = p[0];
+    return 0;
+}
+
+static int
+read_be(DecodeBuffer *db, int size, uint64_t *out)
+{
+    const unsigned char *p = decode_take(db, size);
+    uint64_t v = 0;
+    int i;
+
+    if (p == NULL) {
+        return -1;
+    }
+    for (i = 0; i < size; i++) {
+        v = (v << 8) | p[i];
+    }
+    *out = v;
+    return 0;
+}
+
+static int
+read_varint(DecodeBuffer *db, uint64_t *out)
+{
+    uint64_t v = 0;
+    int shift = 0;
+    uint8_t b;
+
+    for (;;) {
+        if (read_u8(db, &b) < 0) {
+            return -1;
+        }
+        if (shift >= 64) {
+            PyErr_SetString(PyExc_ValueError, "varint is too long");
+            return -1;
+        }
+        v |= (uint64_t)(b & 0x7f) << shift;
+        if (!(b & 0x80)) {
+            break;
+        }
+        shift += 7;
+    }
+    *out = v;
+    return 0;
+}
+
+static int
+read_zigzag(DecodeBuffer *db, int64_t *out)
+{
+    uint64_t v;
+
+    if (read_varint(db, &v) < 0) {
+        return -1;
+    }
+    *out = (int64_t)(v >> 1) ^ -(int64_t)(v & 1);
+    return 0;
+}
+
+static int
+read_int(DecodeBuffer *db, int size, int64_t *out)
+{
+    uint64_t v;
+
+    if (db->protoid == PROTO_COMPACT && size > 1) {
+        return read_zigzag(db, out);
+    }
+    if (read_be(db, size, &v) < 0) {
+        return -1;
+    }
+    switch (size) {
+    case 1: *out = (int8_t)v; break;
+    case 2: *out = (int16_t)v; break;
+    case 4: *out = (int32_t)v; break;
+    default: *out = (int64_t)v; break;
+    }
+    return 0;
+}
+
+static int
+read_size(DecodeBuffer *db, Py_ssize_t *out)
+{
+    int64_t size;
+
+    if (db->protoid == PROTO_COMPACT) {
+        uint64_t v;
+        if (read_varint(db, &v) < 0) {
+            return -1;
+        }
+        size = (int64_t)v;
+    } else if (read_int(db, 4, &size) < 0) {
+        return -1;
+    }
+    if (size < 0 || size > PY_SSIZE_T_MAX) {
+        PyErr_Format(PyExc_ValueError, "negative or oversized length %lld",
+                     (long long)size);
+        return -1;
+    }
+    *out = (Py_ssize_t)size;
+    return 0;
+}
+
+static int
+compact_to_ttype(int ctype)
+{
+    switch (ctype) {
+    case C_STOP: return T_STOP;
+    case C_TRUE:
+    case C_FALSE: return T_BOOL;
+    case C_BYTE: return T_BYTE;
+    case C_I16: return T_I16;
+    case C_I32: return T_I32;
+    case C_I64: return T_I64;
+    case C_DOUBLE: return T_DOUBLE;
+    case C_BINARY: return T_STRING;
+    case C_LIST: return T_LIST;
+    case C_SET: return T_SET;
+    case C_MAP: return T_MAP;
+    case C_STRUCT: return T_STRUCT;
+    case C_FLOAT: return T_FLOAT;
+    }
+    PyErr_Format(PyExc_ValueError, "unknown compact type %d", ctype);
+    return -1;
+}
+
+static int
+ttype_to_compact(int ttype)
+{
+    switch (ttype) {
+    case T_BOOL: return C_TRUE;
+    case T_BYTE: return C_BYTE;
+    case T_I16: return C_I16;
+    case T_I32: return C_I32;
+    case T_I64: return C_I64;
+    case T_DOUBLE: return C_DOUBLE;
+    case T_FLOAT: return C_FLOAT;
+    case T_STRING:
+    case T_UTF8:
+    case T_UTF16: return C_BINARY;
+    case T_STRUCT: return C_STRUCT;
+    case T_LIST: return C_LIST;
+    case T_SET: return C_SET;
+    case T_MAP: return C_MAP;
+    }
+    PyErr_Format(PyExc_ValueError, "unsupported thrift type %d", ttype);
+    return -1;
+}
+
+/* Reads a list/set header, returning the element ttype and size. */
+static int
+read_collection_begin(DecodeBuffer *db, int *etype, Py_ssize_t *size)
+{
+    uint8_t b;
+
+    if (db->protoid == PROTO_COMPACT) {
+        if (read_u8(db, &b) < 0) {
+            return -1;
+        }
+        if ((*etype = compact_to_ttype(b & 0x0f)) < 0) {
+            return -1;
+        }
+        *size = b >> 4;
+        if (*size == 15) {
+            return read_size(db, size);
+        }
+        return 0;
+    }
+    if (read_u8(db, &b) < 0) {
+        return -1;
+    }
+    *etype = b;
+    return read_size(db, size);
+}
+
+static int
+read_map_begin(DecodeBuffer *db, int *ktype, int *vtype, Py_ssize_t *size)
+{
+    uint8_t b;
+
+    if (db->protoid == PROTO_COMPACT) {
+        if (read_size(db, size) < 0) {
+            return -1;
+        }
+        if (*size == 0) {
+            *ktype = *vtype = T_STOP;
+            return 0;
+        }
+        if (read_u8(db, &b) < 0) {
+            return -1;
+        }
+        if ((*ktype = compact_to_ttype(b >> 4)) < 0
+                || (*vtype = compact_to_ttype(b & 0x0f)) < 0) {
+            return -1;
+        }
+        return 0;
+    }
+    if (read_u8(db, &b) < 0) {
+        return -1;
+    }
+    *ktype = b;
+    if (read_u8(db, &b) < 0) {
+        return -1;
+    }
+    *vtype = b;
+    return read_size(db, size);
+}
+
+/* Reads a field header.  Returns the wire ttype (T_STOP at the end). */
+static int
+read_field_begin(DecodeBuffer *db, long *fid)
+{
+    uint8_t b;
+    int64_t v;
+
+    if (read_u8(db, &b) < 0) {
+        return -1;
+    }
+    if (db->protoid == PROTO_COMPACT) {
+        int ctype = b & 0x0f;
+        int delta = b >> 4;
+
+        if (ctype == C_STOP) {
+            return T_STOP;
+        }
+        if (delta == 0) {
+            if (read_zigzag(db, &v) < 0) {
+                return -1;
+            }
+            *fid = (long)v;
+        } else {
+            *fid = db->last_fid + delta;
+        }
+        db->last_fid = *fid;
+        if (ctype == C_TRUE || ctype == C_FALSE) {
+            db->bool_value = ctype == C_TRUE;
+        }
+        return compact_to_ttype(ctype);
+    }
+    if (b == T_STOP) {
+        return T_STOP;
+    }
+    if (read_int(db, 2, &v) < 0) {
+        return -1;
+    }
+    *fid = (long)v;
+    return b;
+}
+
+static int
+read_bool(DecodeBuffer *db, int *out)
+{
+    uint8_t b;
+
+    if (db->bool_value >= 0) {
+        *out = db->bool_value;
+        db->bool_value = -1;
+        return 0;
+    }
+    if (read_u8(db, &b) < 0) {
+        return -1;
+    }
+    *out = db->protoid == PROTO_COMPACT ? b == C_TRUE : b != 0;
+    return 0;
+}
+
+static int skip_value(DecodeBuffer *db, int ttype);
+
+static int
+skip_struct(DecodeBuffer *db)
+{
+    long fid = 0, saved_fid = db->last_fid;
+    int ttype;
+
+    if (++db->depth > MAX_DEPTH) {
+        PyErr_SetString(PyExc_ValueError, "struct nesting is too deep");
+        return -1;
+    }
+    db->last_fid = 0;
+    for (;;) {
+        if ((ttype = read_field_begin(db, &fid)) < 0) {
+            return -1;
+        }
+        if (ttype == T_STOP) {
+            break;
+        }
+        if (skip_value(db, ttype) < 0) {
+            return -1;
+        }
+    }
+    db->last_fid = saved_fid;
+    db->depth--;
+    return 0;
+}
+
+static int
+skip_value(DecodeBuffer *db, int ttype)
+{
+    Py_ssize_t size, i;
+    int64_t iv;
+    int etype, ktype, b;
+
+    switch (ttype) {
+    case T_BOOL:
+        return read_bool(db, &b);
+    case T_BYTE:
+        return decode_take(db, 1) == NULL ? -1 : 0;
+    case T_I16:
+        return read_int(db, 2, &iv);
+    case T_I32:
+        return read_int(db, 4, &iv);
+    case T_I64:
+    case T_U64:
+        return read_int(db, 8, &iv);
+    case T_DOUBLE:
+        return decode_take(db, 8) == NULL ? -1 : 0;
+    case T_FLOAT:
+        return decode_take(db, 4) == NULL ? -1 : 0;
+    case T_STRING:
+    case T_UTF8:
+    case T_UTF16:
+        if (read_size(db, &size) < 0) {
+            return -1;
+        }
+        return decode_take(db, size) == NULL ? -1 : 0;
+    case T_STRUCT:
+        return skip_struct(db);
+    case T_LIST:
+    case T_SET:
+        if (read_collection_begin(db, &etype, &size) < 0) {
+            return -1;
+        }
+        for (i = 0; i < size; i++) {
+            if (skip_value(db, etype) < 0) {
+                return -1;
+            }
+        }
+        return 0;
+    case T_MAP:
+        if (read_map_begin(db, &ktype, &etype, &size) < 0) {
+            return -1;
+        }
+        for (i = 0; i < size; i++) {
+            if (skip_value(db, ktype) < 0 || skip_value(db, etype) < 0) {
+                return -1;
+            }
+        }
+        return 0;
+    }
+    PyErr_Format(PyExc_ValueError, "cannot skip thrift type %d", ttype);
+    return -1;
+}
+
+/* Creates an empty instance of a generated struct without running its
+ * python __init__, which only assigns the spec defaults.  Falls back to
+ * calling cls() when a default is mutable and has to be copied. */
+static PyObject *
+new_instance(PyObject *cls, PyObject *spec, int is_union)
+{
+    Py_ssize_t n = PyTuple_GET_SIZE(spec), i;
+    PyTypeObject *tp;
+    PyObject *obj, *entry, *dflt;
+
+    if (!PyType_Check(cls)) {
+        return PyObject_CallObject(cls, NULL);
+    }
+    if (!is_union) {
+        for (i = 0; i < n; i++) {
+            entry = PyTuple_GET_ITEM(spec, i);
+            if (entry == Py_None || !PyTuple_Check(entry)
+                    || PyTuple_GET_SIZE(entry) < 5) {
+                continue;
+            }
+            dflt = PyTuple_GET_ITEM(entry, 4);
+            if (dflt != Py_None && !PyLong_Check(dflt)
+                    && !PyFloat_Check(dflt) && !PyUnicode_Check(dflt)
+                    && !PyBytes_Check(dflt)) {
+                return PyObject_CallObject(cls, NULL);
+            }
+        }
+    }
+    tp = (PyTypeObject *)cls;
+    if ((obj = tp->tp_new(tp, empty_tuple, NULL)) == NULL) {
+        return NULL;
+    }
+    if (is_union) {
+        if (PyObject_SetAttr(obj, str_field, int_zero) < 0
+                || PyObject_SetAttr(obj, str_value, Py_None) < 0) {
+            Py_DECREF(obj);
+            return NULL;
+        }
+        return obj;
+    }
+    for (i = 0; i < n; i++) {
+        entry = PyTuple_GET_ITEM(spec, i);
+        if (entry == Py_None || !PyTuple_Check(entry)
+                || PyTuple_GET_SIZE(entry) < 5) {
+            continue;
+        }
+        if (PyObject_SetAttr(obj, PyTuple_GET_ITEM(entry, 2),
+                             PyTuple_GET_ITEM(entry, 4)) < 0) {
+            Py_DECREF(obj);
+            return NULL;
+        }
+    }
+    return obj;
+}
+
+static PyObject *decode_val(DecodeBuffer *db, int ttype, PyObject *typeargs);
+
+static int
+decode_struct_into(DecodeBuffer *db, PyObject *obj, PyObject *spec,
+                   int is_union)
+{
+    FieldSpec fs;
+    PyObject *val;
+    long fid = 0, saved_fid = db->last_fid;
+    int ttype, rc;
+
+    if (++db->depth > MAX_DEPTH) {
+        PyErr_SetString(PyExc_ValueError, "struct nesting is too deep");
+        return -1;
+    }
+    db->last_fid = 0;
+    for (;;) {
+        if ((ttype = read_field_begin(db, &fid)) < 0) {
+            return -1;
+        }
+        if (ttype == T_STOP) {
+            break;
+        }
+        if (!find_field(spec, fid, &fs) || fs.ttype != ttype) {
+            if (skip_value(db, ttype) < 0) {
+                return -1;
+            }
+            continue;
+        }
+        if ((val = decode_val(db, ttype, fs.typeargs)) == NULL) {
+            return -1;
+        }
+        if (is_union) {
+            PyObject *pyfid = PyLong_FromLong(fid);
+            if (pyfid == NULL) {
+                Py_DECREF(val);
+                return -1;
+            }
+            rc = PyObject_SetAttr(obj, str_field, pyfid);
+            Py_DECREF(pyfid);
+            if (rc == 0) {
+                rc = PyObject_SetAttr(obj, str_value, val);
+            }
+        } else {
+            rc = PyObject_SetAttr(obj, fs.name, val);
+        }
+        Py_DECREF(val);
+        if (rc < 0) {
+            return -1;
+        }
+    }
+    db->last_fid = saved_fid;
+    db->depth--;
+    return 0;
+}
+
+static PyObject *
+decode_string(DecodeBuffer *db, PyObject *typeargs)
+{
+    const unsigned char *p;
+    Py_ssize_t size;
+
+    if (read_size(db, &size) < 0 || (p = decode_take(db, size)) == NULL) {
+        return NULL;
+    }
+    if (db->utf8strings && typeargs == Py_True) {
+        return PyUnicode_DecodeUTF8((const char *)p, size, NULL);
+    }
+    return PyBytes_FromStringAndSize((const char *)p, size);
+}
+
+static PyObject *
+decode_val(DecodeBuffer *db, int ttype, PyObject *typeargs)
+{
+    PyObject *items[4];
+    PyObject *res, *item, *key;
+    Py_ssize_t size, i;
+    uint64_t raw;
+    int64_t iv;
+    int etype, ktype, vtype, b;
+
+    switch (ttype) {
+    case T_BOOL:
+        if (read_bool(db, &b) < 0) {
+            return NULL;
+        }
+        return PyBool_FromLong(b);
+    case T_BYTE:
+        if (read_int(db, 1, &iv) < 0) {
+            return NULL;
+        }
+        return PyLong_FromLongLong(iv);
+    case T_I16:
+        if (read_int(db, 2, &iv) < 0) {
+            return NULL;
+        }
+        return PyLong_FromLongLong(iv);
+    case T_I32:
+        if (read_int(db, 4, &iv) < 0) {
+            return NULL;
+        }
+        return PyLong_FromLongLong(iv);
+    case T_I64:
+        if (read_int(db, 8, &iv) < 0) {
+            return NULL;
+        }
+        return PyLong_FromLongLong(iv);
+    case T_DOUBLE: {
+        union { uint64_t u; double d; } conv;
+        if (read_be(db, 8, &raw) < 0) {
+            return NULL;
+        }
+        conv.u = raw;
+        return PyFloat_FromDouble(conv.d);
+    }
+    case T_FLOAT: {
+        union { uint32_t u; float f; } conv;
+        if (read_be(db, 4, &raw) < 0) {
+            return NULL;
+        }
+        conv.u = (uint32_t)raw;
+        return PyFloat_FromDouble(conv.f);
+    }
+    case T_STRING:
+    case T_UTF8:
+    case T_UTF16:
+        return decode_string(db, typeargs);
+    case T_STRUCT: {
+        PyObject *cls, *spec;
+        int is_union;
+        if (parse_struct_args(typeargs, &cls, &spec, &is_union) < 0) {
+            return NULL;
+        }
+        if ((res = new_instance(cls, spec, is_union)) == NULL) {
+            return NULL;
+        }
+        if (decode_struct_into(db, res, spec, is_union) < 0) {
+            Py_DECREF(res);
+            return NULL;
+        }
+        return res;
+    }
+    case T_LIST:
+    case T_SET:
+        if (parse_container_args(typeargs, 2, items) < 0
+                || read_collection_begin(db, &etype, &size) < 0) {
+            return NULL;
+        }
+        etype = (int)PyLong_AsLong(items[0]);
+        if (ttype == T_LIST) {
+            if ((res = PyList_New(size)) == NULL) {
+                return NULL;
+            }
+        } else if ((res = PySet_New(NULL)) == NULL) {
+            return NULL;
+        }
+        for (i = 0; i < size; i++) {
+            if ((item = decode_val(db, etype, items[1])) == NULL) {
+                Py_DECREF(res);
+                return NULL;
+            }
+            if (ttype == T_LIST) {
+                PyList_SET_ITEM(res, i, item);
+            } else {
+                b = PySet_Add(res, item);
+                Py_DECREF(item);
+                if (b < 0) {
+                    Py_DECREF(res);
+                    return NULL;
+                }
+            }
+        }
+        return res;
+    case T_MAP:
+        if (parse_container_args(typeargs, 4, items) < 0
+                || read_map_begin(db, &ktype, &vtype, &size) < 0) {
+            return NULL;
+        }
+        ktype = (int)PyLong_AsLong(items[0]);
+        vtype = (int)PyLong_AsLong(items[2]);
+        if ((res = PyDict_New()) == NULL) {
+            return NULL;
+        }
+        for (i = 0; i < size; i++) {
+            if ((key = decode_val(db, ktype, items[1])) == NULL) {
+                Py_DECREF(res);
+                return NULL;
+            }
+            if ((item = decode_val(db, vtype, items[3])) == NULL) {
+                Py_DECREF(key);
+                Py_DECREF(res);
+                return NULL;
+            }
+            b = PyDict_SetItem(res, key, item);
+            Py_DECREF(key);
+            Py_DECREF(item);
+            if (b < 0) {
+                Py_DECREF(res);
+                return NULL;
+            }
+        }
+        return res;
+    }
+    PyErr_Format(PyExc_ValueError, "cannot decode thrift type %d", ttype);
+    return NULL;
+}
+
+static int
+check_protoid(int protoid)
+{
+    if (protoid != PROTO_BINARY && protoid != PROTO_COMPACT) {
+        PyErr_Format(PyExc_ValueError, "unsupported protocol id %d",
+                     protoid);
+        return -1;
+    }
+    return 0;
+}
+
+static PyObject *
+fastproto_decode(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    static char *kwlist[] = {"obj", "trans", "spec_args", "utf8strings",
+                             "protoid", NULL};
+    PyObject *obj, *trans, *spec_args, *cls, *spec;
+    int utf8strings = 0, protoid = PROTO_BINARY, is_union, rc;
+    DecodeBuffer db;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "OOO|ii", kwlist,
+                                     &obj, &trans, &spec_args,
+                                     &utf8strings, &protoid)) {
+        return NULL;
+    }
+    if (check_protoid(protoid) < 0
+            || parse_struct_args(spec_args, &cls, &spec, &is_union) < 0) {
+        return NULL;
+    }
+    if (decode_init(&db, trans, protoid, utf8strings) < 0) {
+        decode_free(&db);
+        return NULL;
+    }
+    rc = decode_struct_into(&db, obj, spec, is_union);
+    if (rc == 0) {
+        rc = decode_finish(&db);
+    }
+    decode_free(&db);
+    if (rc < 0) {
+        return NULL;
+    }
+    Py_RETURN_NONE;
+}
+
+/* ------------------------------------------------------------------ */
+/* encoding                                                            */
+/* ------------------------------------------------------------------ */
+
+typedef struct {
+    char *buf;
+    Py_ssize_t len;
+    Py_ssize_t cap;
+    int protoid;
+    int utf8strings;
+    int depth;
+    long last_fid;
+} EncodeBuffer;
+
+static int
+encode_reserve(EncodeBuffer *eb, Py_ssize_t n)
+{
+    Py_ssize_t cap;
+    char *buf;
+
+    if (eb->len + n <= eb->cap) {
+        return 0;
+    }
+    cap = eb->cap ? eb->cap : 256;
+    while (cap < eb->len + n) {
+        cap *= 2;
+    }
+    if ((buf = PyMem_Realloc(eb->buf, cap)) == NULL) {
+        PyErr_NoMemory();
+        return -1;
+    }
+    eb->buf = buf;
+    eb->cap = cap;
+    return 0;
+}
+
+static int
+write_bytes(EncodeBuffer *eb, const void *data, Py_ssize_t n)
+{
+    if (encode_reserve(eb, n) < 0) {
+        return -1;
+    }
+    memcpy(eb->buf + eb->len, data, n);
+    eb->len += n;
+    return 0;
+}
+
+static int
+write_u8(EncodeBuffer *eb, uint8_t b)
+{
+    if (encode_reserve(eb, 1) < 0) {
+        return -1;
+    }
+    eb->buf[eb->len++] = (char)b;
+    return 0;
+}
+
+static int
+write_be(EncodeBuffer *eb, int size, uint64_t v)
+{
+    int i;
+
+    if (encode_reserve(eb, size) < 0) {
+        return -1;
+    }
+    for (i = size - 1; i >= 0; i--) {
+        eb->buf[eb->len + i] = (char)(v & 0xff);
+        v >>= 8;
+    }
+    eb->len += size;
+    return 0;
+}
+
+static int
+write_varint(EncodeBuffer *eb, uint64_t v)
+{
+    if (encode_reserve(eb, 10) < 0) {
+        return -1;
+    }
+    while (v >= 0x80) {
+        eb->buf[eb->len++] = (char)((v & 0x7f) | 0x80);
+        v >>= 7;
+    }
+    eb->buf[eb->len++] = (char)v;
+    return 0;
+}
+
+static int
+write_int(EncodeBuffer *eb, int size, int64_t v)
+{
+    if (eb->protoid == PROTO_COMPACT && size > 1) {
+        return write_varint(eb, ((uint64_t)v << 1) ^ (uint64_t)(v >> 63));
+    }
+    return write_be(eb, size, (uint64_t)v);
+}
+
+static int
+write_size(EncodeBuffer *eb, Py_ssize_t size)
+{
+    if (size > INT32_MAX) {
+        PyErr_SetString(PyExc_OverflowError, "container is too large");
+        return -1;
+    }
+    if (eb->protoid == PROTO_COMPACT) {
+        return write_varint(eb, (uint64_t)size);
+    }
+    return write_be(eb, 4, (uint64_t)size);
+}
+
+static int
+write_field_begin(EncodeBuffer *eb, int ttype, long fid, PyObject *val)
+{
+    if (eb->protoid == PROTO_COMPACT) {
+        int ctype = ttype_to_compact(ttype);
+        long delta = fid - eb->last_fid;
+
+        if (ctype < 0) {
+            return -1;
+        }
+        if (ttype == T_BOOL) {
+            int truth = PyObject_IsTrue(val);
+            if (truth < 0) {
+                return -1;
+            }
+            ctype = truth ? C_TRUE : C_FALSE;
+        }
+        if (delta > 0 && delta <= 15) {
+            if (write_u8(eb, (uint8_t)(delta << 4 | ctype)) < 0) {
+                return -1;
+            }
+        } else if (write_u8(eb, (uint8_t)ctype) < 0
+                || write_int(eb, 2, fid) < 0) {
+            return -1;
+        }
+        eb->last_fid = fid;
+        return 0;
+    }
+    if (write_u8(eb, (uint8_t)ttype) < 0) {
+        return -1;
+    }
+    return write_be(eb, 2, (uint64_t)fid);
+}
+
+static int
+write_collection_begin(EncodeBuffer *eb, int etype, Py_ssize_t size)
+{
+    if (eb->protoid == PROTO_COMPACT) {
+        int ctype = ttype_to_compact(etype);
+        if (ctype < 0) {
+            return -1;
+        }
+        if (size <= 14) {
+            return write_u8(eb, (uint8_t)(size << 4 | ctype));
+        }
+        if (write_u8(eb, (uint8_t)(0xf0 | ctype)) < 0) {
+            return -1;
+        }
+        return write_size(eb, size);
+    }
+    if (write_u8(eb, (uint8_t)etype) < 0) {
+        return -1;
+    }
+    return write_size(eb, size);
+}
+
+static int
+write_map_begin(EncodeBuffer *eb, int ktype, int vtype, Py_ssize_t size)
+{
+    if (eb->protoid == PROTO_COMPACT) {
+        int kc = ttype_to_compact(ktype), vc = ttype_to_compact(vtype);
+        if (kc < 0 || vc < 0) {
+            return -1;
+        }
+        if (size == 0) {
+            return write_u8(eb, 0);
+        }
+        if (write_size(eb, size) < 0) {
+            return -1;
+        }
+        return write_u8(eb, (uint8_t)(kc << 4 | vc));
+    }
+    if (write_u8(eb, (uint8_t)ktype) < 0 || write_u8(eb, (uint8_t)vtype) < 0) {
+        return -1;
+    }
+    return write_size(eb, size);
+}
+
+static int encode_val(EncodeBuffer *eb, int ttype, PyObject *typeargs,
+                      PyObject *val, int in_field);
+
+static int
+encode_field(EncodeBuffer *eb, long fid, FieldSpec *fs, PyObject *val)
+{
+    if (write_field_begin(eb, fs->ttype, fid, val) < 0) {
+        return -1;
+    }
+    return encode_val(eb, fs->ttype, fs->typeargs, val, 1);
+}
+
+static int
+encode_struct(EncodeBuffer *eb, PyObject *obj, PyObject *spec, int is_union)
+{
+    Py_ssize_t n = PyTuple_GET_SIZE(spec), i;
+    PyObject *entry, *val;
+    FieldSpec fs;
+    long fid, saved_fid = eb->last_fid;
+    int rc = 0;
+
+    if (++eb->depth > MAX_DEPTH) {
+        PyErr_SetString(PyExc_ValueError, "struct nesting is too deep");
+        return -1;
+    }
+    eb->last_fid = 0;
+    if (is_union) {
+        PyObject *pyfid = PyObject_GetAttr(obj, str_field);
+        if (pyfid == NULL) {
+            return -1;
+        }
+        fid = PyLong_AsLong(pyfid);
+        Py_DECREF(pyfid);
+        if (fid == -1 && PyErr_Occurred()) {
+            return -1;
+        }
+        if (fid != 0 && find_field(spec, fid, &fs)) {
+            if ((val = PyObject_GetAttr(obj, str_value)) == NULL) {
+                return -1;
+            }
+            if (val != Py_None) {
+                rc = encode_field(eb, fid, &fs, val);
+            }
+            Py_DECREF(val);
+        }
+    } else {
+        for (i = 0; i < n && rc == 0; i++) {
+            entry = PyTuple_GET_ITEM(spec, i);
+            if (entry == Py_None || !PyTuple_Check(entry)
+                    || PyTuple_GET_SIZE(entry) < 4) {
+                continue;
+            }
+            fid = PyLong_AsLong(PyTuple_GET_ITEM(entry, 0));
+            fs.ttype = (int)PyLong_AsLong(PyTuple_GET_ITEM(entry, 1));
+            fs.name = PyTuple_GET_ITEM(entry, 2);
+            fs.typeargs = PyTuple_GET_ITEM(entry, 3);
+            if (PyErr_Occurred()) {
+                return -1;
+            }
+            if ((val = PyObject_GetAttr(obj, fs.name)) == NULL) {
+                return -1;
+            }
+            if (val != Py_None) {
+                rc = encode_field(eb, fid, &fs, val);
+            }
+            Py_DECREF(val);
+        }
+    }
+    if (rc < 0) {
+        return -1;
+    }
+    eb->last_fid = saved_fid;
+    eb->depth--;
+    return write_u8(eb, T_STOP);
+}
+
+static int
+encode_string(EncodeBuffer *eb, PyObject *val)
+{
+    const char *data;
+    Py_ssize_t size;
+
+    if (PyUnicode_Check(val)) {
+        if ((data = PyUnicode_AsUTF8AndSize(val, &size)) == NULL) {
+            return -1;
+        }
+    } else if (PyBytes_Check(val)) {
+        data = PyBytes_AS_STRING(val);
+        size = PyBytes_GET_SIZE(val);
+    } else {
+        PyErr_Format(PyExc_TypeError, "expected str or bytes, got %s",
+                     Py_TYPE(val)->tp_name);
+        return -1;
+    }
+    if (write_size(eb, size) < 0) {
+        return -1;
+    }
+    return write_bytes(eb, data, size);
+}
+
+static int
+encode_int(EncodeBuffer *eb, int size, PyObject *val)
+{
+    long long v = PyLong_AsLongLong(val);
+
+    if (v == -1 && PyErr_Occurred()) {
+        return -1;
+    }
+    return write_int(eb, size, (int64_t)v);
+}
+
+static int
+encode_val(EncodeBuffer *eb, int ttype, PyObject *typeargs, PyObject *val,
+           int in_field)
+{
+    PyObject *items[4];
+    PyObject *it, *item, *key;
+    Py_ssize_t pos, size;
+    int etype, ktype, vtype, truth, rc;
+
+    switch (ttype) {
+    case T_BOOL:
+        if ((truth = PyObject_IsTrue(val)) < 0) {
+            return -1;
+        }
+        if (eb->protoid == PROTO_COMPACT) {
+            /* a bool field is folded into the field header */
+            if (in_field) {
+                return 0;
+            }
+            return write_u8(eb, truth ? C_TRUE : C_FALSE);
+        }
+        return write_u8(eb, truth ? 1 : 0);
+    case T_BYTE:
+        return encode_int(eb, 1, val);
+    case T_I16:
+        return encode_int(eb, 2, val);
+    case T_I32:
+        return encode_int(eb, 4, val);
+    case T_I64:
+        return encode_int(eb, 8, val);
+    case T_DOUBLE: {
+        union { uint64_t u; double d; } conv;
+        conv.d = PyFloat_AsDouble(val);
+        if (conv.d == -1.0 && PyErr_Occurred()) {
+            return -1;
+        }
+        return write_be(eb, 8, conv.u);
+    }
+    case T_FLOAT: {
+        union { uint32_t u; float f; } conv;
+        double d = PyFloat_AsDouble(val);
+        if (d == -1.0 && PyErr_Occurred()) {
+            return -1;
+        }
+        conv.f = (float)d;
+        return write_be(eb, 4, conv.u);
+    }
+    case T_STRING:
+    case T_UTF8:
+    case T_UTF16:
+        return encode_string(eb, val);
+    case T_STRUCT: {
+        PyObject *cls, *spec;
+        int is_union;
+        if (parse_struct_args(typeargs, &cls, &spec, &is_union) < 0) {
+            return -1;
+        }
+        return encode_struct(eb, val, spec, is_union);
+    }
+    case T_LIST:
+    case T_SET:
+        if (parse_container_args(typeargs, 2, items) < 0) {
+            return -1;
+        }
+        etype = (int)PyLong_AsLong(items[0]);
+        if ((size = PyObject_Size(val)) < 0
+                || write_collection_begin(eb, etype, size) < 0) {
+            return -1;
+        }
+        if ((it = PyObject_GetIter(val)) == NULL) {
+            return -1;
+        }
+        rc = 0;
+        while (rc == 0 && (item = PyIter_Next(it)) != NULL) {
+            rc = encode_val(eb, etype, items[1], item, 0);
+            Py_DECREF(item);
+        }
+        Py_DECREF(it);
+        return rc < 0 || PyErr_Occurred() ? -1 : 0;
+    case T_MAP:
+        if (parse_container_args(typeargs, 4, items) < 0) {
+            return -1;
+        }
+        if (!PyDict_Check(val)) {
+            PyErr_Format(PyExc_TypeError, "expected dict, got %s",
+                         Py_TYPE(val)->tp_name);
+            return -1;
+        }
+        ktype = (int)PyLong_AsLong(items[0]);
+        vtype = (int)PyLong_AsLong(items[2]);
+        if (write_map_begin(eb, ktype, vtype, PyDict_GET_SIZE(val)) < 0) {
+            return -1;
+        }
+        pos = 0;
+        while (PyDict_Next(val, &pos, &key, &item)) {
+            if (encode_val(eb, ktype, items[1], key, 0) < 0
+                    || encode_val(eb, vtype, items[3], item, 0) < 0) {
+                return -1;
+            }
+        }
+        return 0;
+    }
+    PyErr_Format(PyExc_ValueError, "cannot encode thrift type %d", ttype);
+    return -1;
+}
+
+static PyObject *
+fastproto_encode(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    static char *kwlist[] = {"obj", "spec_args", "utf8strings", "protoid",
+                             NULL};
+    PyObject *obj, *spec_args, *cls, *spec, *res = NULL;
+    int utf8strings = 0, protoid = PROTO_BINARY, is_union;
+    EncodeBuffer eb;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "OO|ii", kwlist,
+                                     &obj, &spec_args, &utf8strings,
+                                     &protoid)) {
+        return NULL;
+    }
+    if (check_protoid(protoid) < 0
+            || parse_struct_args(spec_args, &cls, &spec, &is_union) < 0) {
+        return NULL;
+    }
+    memset(&eb, 0, sizeof(eb));
+    eb.protoid = protoid;
+    eb.utf8strings = utf8strings;
+    if (encode_struct(&eb, obj, spec, is_union) == 0) {
+        res = PyBytes_FromStringAndSize(eb.buf, eb.len);
+    }
+    PyMem_Free(eb.buf);
+    return res;
+}
+
+static PyMethodDef fastproto_methods[] = {
+    {"decode", (PyCFunction)(void (*)(void))fastproto_decode,
+     METH_VARARGS | METH_KEYWORDS,
+     "decode(obj, trans, [cls, spec, is_union], utf8strings=0, protoid=0)"},
+    {"encode", (PyCFunction)(void (*)(void))fastproto_encode,
+     METH_VARARGS | METH_KEYWORDS,
+     "encode(obj, [cls, spec, is_union], utf8strings=0, protoid=0)"},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef fastproto_module = {
+    PyModuleDef_HEAD_INIT,
+    "fastproto",
+    "C accelerated thrift binary and compact protocols",
+    -1,
+    fastproto_methods
+};
+
+PyMODINIT_FUNC
+PyInit_fastproto(void)
+{
+#define INTERN(var, s) \
+    if ((var = PyUnicode_InternFromString(s)) == NULL) return NULL
+    INTERN(str_cstringio_buf, "cstringio_buf");
+    INTERN(str_read, "read");
+    INTERN(str_tell, "tell");
+    INTERN(str_field, "field");
+    INTERN(str_value, "value");
+#undef INTERN
+    if ((empty_tuple = PyTuple_New(0)) == NULL
+            || (int_zero = PyLong_FromLong(0)) == NULL) {
+        return NULL;
+    }
+    return PyModule_Create(&fastproto_module);
+}
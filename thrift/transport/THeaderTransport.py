@@ -248,6 +248,11 @@ class THeaderTransport(TTransportBase, CReadableTransport):
 
     readAll = read  # TTransportBase.readAll does a needless copy here.
 
+    def read_buffered(self, sz):
+        """Read at most sz bytes left in the current frame, without
+        waiting for the next frame."""
+        return self.__rbuf.read(sz)
+
     def readFrame(self, req_sz):
         self.__rbuf_frame = True
         word1 = self.getTransport().readAll(4)
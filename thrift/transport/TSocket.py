@@ -223,6 +223,8 @@ class TSocket(TSocketBase):
         self.family = family
         self._unix_socket = unix_socket
         self._timeout = None
+        self._connect_timeout = None
+        self._socket_options = []
         self.close_on_exec = True
         if not unix_socket:
             self.port = int(self.port)
@@ -259,6 +261,20 @@ class TSocket(TSocketBase):
         if self.handle is not None:
             self.handle.settimeout(self._timeout)
 
+    def setConnectTimeout(self, ms):
+        """Set the timeout of connecting, None means the timeout of setTimeout."""
+        if ms is None:
+            self._connect_timeout = None
+        else:
+            self._connect_timeout = ms / 1000.0
+
+    def setSocketOptions(self, options):
+        """Set the socket options applied before connecting.
+
+        @param options([(level, optname, value)])  The setsockopt arguments.
+        """
+        self._socket_options = list(options)
+
     def getPeerName(self):
         if not self.handle:
             raise TTransportException(TTransportException.NOT_OPEN,
@@ -273,10 +289,16 @@ class TSocket(TSocketBase):
                 address = res[4]
                 handle = socket.socket(res[0], res[1])
                 self.setHandle(handle)
-                handle.settimeout(self._timeout)
                 self.setCloseOnExec(self.close_on_exec)
                 try:
+                    for level, optname, value in self._socket_options:
+                        handle.setsockopt(level, optname, value)
+                    if self._connect_timeout is not None:
+                        handle.settimeout(self._connect_timeout)
+                    else:
+                        handle.settimeout(self._timeout)
                     handle.connect(address)
+                    handle.settimeout(self._timeout)
                 except socket.error as e:
                     self.close()
                     if res is not res0[-1]:
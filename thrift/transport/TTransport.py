@@ -22,6 +22,7 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import socket
 import sys
 if sys.version_info[0] >= 3:
     from io import BytesIO
@@ -215,6 +216,183 @@ class TBufferedTransport(TTransportBase, CReadableTransport):
         return self.__rbuf
 
 
+class _RecvBufferReader(object):
+
+    """The cstringio_buf of TRecvBufferTransport.
+
+    read() gives a memoryview of the unread bytes instead of a copy, it is
+    valid until the next read of the transport.
+    """
+
+    def __init__(self, trans):
+        self._trans = trans
+
+    def tell(self):
+        return self._trans._rpos
+
+    def seek(self, pos):
+        self._trans._rpos = pos
+
+    def read(self, sz=-1):
+        trans = self._trans
+        start = trans._rpos
+        end = trans._rend if sz < 0 else min(trans._rend, start + sz)
+        trans._rpos = end
+        return trans._rview[start:end]
+
+
+class TRecvBufferTransport(TTransportBase, CReadableTransport):
+
+    """Class that wraps a TSocket and buffers its I/O.
+
+    The bytes are received by socket.recv_into into one reusable bytearray,
+    so a big reply costs no allocation per refill. The size of one receive
+    grows while the receives fill it and shrinks while they are mostly
+    empty. The accelerated protocol reads memoryview slices of the buffer,
+    read() gives bytes which are safe to keep.
+    """
+
+    MIN_RECV_SIZE = 4096
+    MAX_RECV_SIZE = 4 * 1024 * 1024
+    # the receives much smaller than the receive size before it shrinks
+    SHRINK_COUNT = 16
+
+    def __init__(self, trans, recv_size=65536):
+        self.__trans = trans
+        self.__wbuf = StringIO()
+        self._recv_size = max(self.MIN_RECV_SIZE, min(recv_size, self.MAX_RECV_SIZE))
+        self._small_recvs = 0
+        self._rbuf = bytearray(self._recv_size)
+        self._rview = memoryview(self._rbuf)
+        # the unread bytes are self._rbuf[self._rpos:self._rend]
+        self._rpos = 0
+        self._rend = 0
+        self._reader = _RecvBufferReader(self)
+
+    def getTransport(self):
+        return self.__trans
+
+    def isOpen(self):
+        return self.__trans.isOpen()
+
+    def open(self):
+        return self.__trans.open()
+
+    def close(self):
+        self._rpos = self._rend = 0
+        return self.__trans.close()
+
+    def read(self, sz):
+        if self._rpos == self._rend:
+            self._fill(1)
+        end = min(self._rend, self._rpos + sz)
+        ret = bytes(self._rview[self._rpos:end])
+        self._rpos = end
+        return ret
+
+    def readAll(self, sz):
+        self._fill(sz)
+        ret = bytes(self._rview[self._rpos:self._rpos + sz])
+        self._rpos += sz
+        return ret
+
+    def read_view(self, sz):
+        """Like read, but gives a memoryview which is valid until the next
+        read of the transport, so the bytes are not copied."""
+        if self._rpos == self._rend:
+            self._fill(1)
+        end = min(self._rend, self._rpos + sz)
+        ret = self._rview[self._rpos:end]
+        self._rpos = end
+        return ret
+
+    def write(self, buf):
+        self.__wbuf.write(buf)
+
+    def flush(self):
+        out = self.__wbuf.getvalue()
+        # reset wbuf before write/flush to preserve state on underlying failure
+        self.__wbuf = StringIO()
+        self.__trans.write(out)
+        self.__trans.flush()
+
+    def _fill(self, need):
+        """Receive until at least need bytes are unread."""
+        avail = self._rend - self._rpos
+        if avail >= need:
+            return
+        if avail == 0:
+            self._rpos = self._rend = 0
+            if len(self._rbuf) > 4 * max(need, self._recv_size):
+                # give back the memory of a big reply
+                self._new_buffer(max(need, self._recv_size))
+        size = max(need, self._recv_size)
+        if self._rpos + size > len(self._rbuf):
+            # move the unread bytes to the front
+            if size > len(self._rbuf):
+                self._new_buffer(size)
+            else:
+                self._rbuf[:avail] = bytes(self._rview[self._rpos:self._rend])
+                self._rpos = 0
+                self._rend = avail
+        while self._rend - self._rpos < need:
+            wanted = min(len(self._rbuf) - self._rend, self._recv_size)
+            n = self._recv_into(self._rview[self._rend:self._rend + wanted])
+            self._rend += n
+            self._adapt(n, wanted)
+
+    def _new_buffer(self, size):
+        # the memoryviews given out keep the old buffer alive
+        avail = self._rend - self._rpos
+        rbuf = bytearray(size)
+        rbuf[:avail] = self._rview[self._rpos:self._rend]
+        self._rbuf = rbuf
+        self._rview = memoryview(rbuf)
+        self._rpos = 0
+        self._rend = avail
+
+    def _recv_into(self, view):
+        handle = getattr(self.__trans, 'handle', None)
+        if handle is None or not hasattr(handle, 'recv_into'):
+            # not a TSocket, read from the transport and copy
+            data = self.__trans.read(len(view))
+            view[:len(data)] = data
+            return len(data)
+        try:
+            n = handle.recv_into(view)
+        except socket.error as e:
+            raise TTransportException(
+                type=TTransportException.END_OF_FILE,
+                message='Socket read failed: {}'.format(str(e))
+            )
+        if n == 0:
+            raise TTransportException(type=TTransportException.END_OF_FILE,
+                                      message='TSocket read 0 bytes')
+        return n
+
+    def _adapt(self, n, wanted):
+        if n >= wanted:
+            self._recv_size = min(self._recv_size * 2, self.MAX_RECV_SIZE)
+            self._small_recvs = 0
+        elif n < wanted // 4:
+            self._small_recvs += 1
+            if self._small_recvs >= self.SHRINK_COUNT:
+                self._recv_size = max(self._recv_size // 2, self.MIN_RECV_SIZE)
+                self._small_recvs = 0
+
+    # Implement the CReadableTransport interface.
+    @property
+    def cstringio_buf(self):
+        return self._reader
+
+    def cstringio_refill(self, partialread, reqlen):
+        # partialread is the unread tail of the last cstringio_buf.read(),
+        # it is still in the buffer right before the end
+        self._rpos = self._rend - len(partialread)
+        self._fill(reqlen)
+        return self._reader
+
+
 class TMemoryBuffer(TTransportBase, CReadableTransport):
     """Wraps a cStringIO object as a TTransport.
 